@@ -117,6 +117,8 @@ function App() {
   ])
   const [input, setInput] = useState('')
   const [isLoading, setIsLoading] = useState(false)
+  // Server keeps the conversation; we only send the new message plus this id
+  const sessionIdRef = useRef(sessionStorage.getItem('andy-os-session'))
   const [status, setStatus] = useState({ 
     cpu: 0, 
     memory: 0, 
@@ -168,30 +170,57 @@ function App() {
     setIsLoading(true)
 
     try {
-      const history = messages.map(m => ({ role: m.role, content: m.content }))
       const payload = {
         message: userMsg.content,
-        history: [...history, userMsg]
+        session_id: sessionIdRef.current
       }
 
-      const response = await fetch('/api/chat', {
+      const response = await fetch('/api/chat/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify(payload)
       })
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         throw new Error('Network response was not ok')
       }
 
-      const data = await response.json()
-      
-      const agentMsg = { 
-        role: 'assistant', 
-        content: data.response,
-        tool_output: data.tool_output 
+      // Append an empty assistant message and grow it as tokens arrive
+      setMessages(prev => [...prev, { role: 'assistant', content: '' }])
+
+      const updateLast = (patch) => setMessages(prev => {
+        const next = [...prev]
+        next[next.length - 1] = { ...next[next.length - 1], ...patch(next[next.length - 1]) }
+        return next
+      })
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+        for (const line of lines) {
+          if (!line.trim()) continue
+          const event = JSON.parse(line)
+          if (event.type === 'token') {
+            updateLast(last => ({ content: last.content + event.content }))
+          } else if (event.type === 'tool_output') {
+            updateLast(last => ({ live_output: (last.live_output || '') + event.content }))
+          } else if (event.type === 'done') {
+            sessionIdRef.current = event.session_id
+            sessionStorage.setItem('andy-os-session', event.session_id)
+            updateLast(() => ({ content: event.response, tool_output: event.tool_output }))
+          } else if (event.type === 'error') {
+            throw new Error(event.detail)
+          }
+        }
       }
-      setMessages(prev => [...prev, agentMsg])
 
     } catch (error) {
       console.error('Error:', error)
@@ -216,6 +245,12 @@ function App() {
           <div key={index} className={`message ${msg.role}`}>
             <div className="message-content">
               {msg.content}
+              {msg.live_output && !msg.tool_output && (
+                  <div className="tool-output">
+                      <div className="tool-label">Running…</div>
+                      <pre>{msg.live_output}</pre>
+                  </div>
+              )}
               {msg.tool_output && (
                   <div className="tool-output">
                       <div className="tool-label">Tool Result</div>
@@ -225,7 +260,7 @@ function App() {
             </div>
           </div>
         ))}
-        {isLoading && (
+        {isLoading && messages[messages.length - 1]?.role !== 'assistant' && (
           <div className="message assistant loading">
             <span className="dot"></span><span className="dot"></span><span className="dot"></span>
           </div>
@@ -0,0 +1,230 @@
+"""
+Benchmark the agent pipeline offline against the fake Ollama server.
+
+Replays a request trace through the async graph (--mode graph) or the FastAPI
+app in-process (--mode api, no sockets besides the local fake Ollama) at a
+fixed concurrency, and reports latency percentiles, throughput and a per-stage
+breakdown (graph nodes, tools and Ollama calls, from src.core.telemetry).
+Reports are JSON and record the git commit, so runs can be compared across
+commits with --compare.
+
+Usage:
+    python scripts/benchmark.py                              # replay trace, graph mode
+    python scripts/benchmark.py --mode api --concurrency 8
+    python scripts/benchmark.py --synthetic 200 --token-ms 5 --json bench.json
+    python scripts/benchmark.py --json new.json --compare old.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from scripts.fake_ollama import FakeOllama
+
+DEFAULT_TRACE = os.path.join(ROOT, "scripts", "data", "router_replay.jsonl")
+
+SYNTHETIC = [
+    "hi",
+    "thanks, that helps",
+    "what is a python decorator",
+    "explain why the raft consensus algorithm needs a leader and how elections work",
+    "list the files in this directory",
+    "run echo benchmark",
+    "compare postgres and sqlite for a small home server",
+]
+
+def load_trace(path):
+    with open(path) as f:
+        return [json.loads(line)["input"] for line in f if line.strip()]
+
+def synthetic_trace(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(SYNTHETIC) for _ in range(count)]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(values):
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p95": round(percentile(values, 95), 1),
+        "p99": round(percentile(values, 99), 1),
+        "mean": round(sum(values) / len(values), 1) if values else 0.0,
+        "max": round(max(values), 1) if values else 0.0
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+async def run_graph(inputs, concurrency):
+    """Drive the shared async graph directly. Returns per-request records."""
+    from src.app import get_app
+    from src.core import telemetry
+
+    graph = get_app().graph(use_async=True)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(text):
+        async with limit:
+            started = time.perf_counter()
+            try:
+                with telemetry.trace() as current:
+                    result = await graph.ainvoke({"user_input": text, "messages": [{"role": "user", "content": text}]})
+                error = None
+            except Exception as e:
+                result, error = {}, str(e)
+            return {
+                "ms": (time.perf_counter() - started) * 1000,
+                "model": result.get("model_override"),
+                "spans": current.spans,
+                "error": error
+            }
+
+    return await asyncio.gather(*(one(text) for text in inputs))
+
+async def run_api(inputs, concurrency):
+    """Drive the FastAPI app through httpx's ASGI transport. Returns per-request records."""
+    import httpx
+    from src.interface.server import app
+
+    limit = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport doesn't send lifespan events; run the hook that builds the graph ourselves
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as http:
+        async def one(text):
+            async with limit:
+                started = time.perf_counter()
+                response = await http.post("/api/chat", json={"message": text, "timings": True})
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    return {"ms": elapsed, "model": None, "spans": [], "error": f"HTTP {response.status_code}"}
+                body = response.json()
+                return {"ms": elapsed, "model": body["model_used"], "spans": body["timings"]["spans"], "error": None}
+
+        return await asyncio.gather(*(one(text) for text in inputs))
+
+def stage_breakdown(records):
+    """Latency per (kind, name) span across all requests; Ollama calls are keyed by call and model."""
+    stages = defaultdict(list)
+    for record in records:
+        for span in record["spans"]:
+            key = f"{span['kind']}:{span['name']}"
+            if span["kind"] == "ollama":
+                key += f"@{span['model']}"
+            stages[key].append(span["ms"])
+    return {key: {"count": len(values), **summarize(values)} for key, values in sorted(stages.items())}
+
+def compare(report, baseline):
+    """Print relative change against a previous report (positive = slower / fewer rps)."""
+    print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}):")
+    for key in ("p50", "p95", "p99"):
+        old, new = baseline["latency_ms"][key], report["latency_ms"][key]
+        print(f"  latency {key}: {old} -> {new} ms ({(new - old) / old:+.1%})" if old else f"  latency {key}: {new} ms")
+    old, new = baseline["throughput_rps"], report["throughput_rps"]
+    print(f"  throughput: {old} -> {new} req/s ({(new - old) / old:+.1%})" if old else f"  throughput: {new} req/s")
+    for stage, stats in report["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if previous and previous["p50"]:
+            print(f"  {stage} p50: {previous['p50']} -> {stats['p50']} ms ({(stats['p50'] - previous['p50']) / previous['p50']:+.1%})")
+
+def benchmark(inputs, mode="graph", concurrency=4, fake_options=None, warmup=1):
+    """
+    Run the trace against a fresh fake Ollama and return the report. Call before
+    anything from src is imported: the client singletons read OLLAMA_HOST then.
+    """
+    fake_options = fake_options or {}
+    fake = FakeOllama(**fake_options).start()
+    os.environ["OLLAMA_HOST"] = fake.url
+    # Keep sessions and memory out of the real home directory
+    os.environ["HOME"] = tempfile.mkdtemp(prefix="andy-os-bench-")
+    os.environ.setdefault("ANDY_OS_PRELOAD_MODELS", "0")
+    runner = run_api if mode == "api" else run_graph
+
+    from src.core.llm import OllamaClient
+    for model in (OllamaClient.LIGHT_MODEL, OllamaClient.HEAVY_MODEL):
+        fake.complete({"model": model}, "generate")  # pay model loads before the clock starts
+
+    async def measure():
+        # One event loop for both: the Ollama async client is bound to the loop it first ran on
+        if warmup:
+            await runner(inputs[:warmup], 1)
+        started = time.perf_counter()
+        records = await runner(inputs, concurrency)
+        return records, time.perf_counter() - started
+
+    try:
+        records, wall = asyncio.run(measure())
+    finally:
+        fake.stop()
+
+    ok = [r for r in records if r["error"] is None]
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "mode": mode,
+            "concurrency": concurrency,
+            "requests": len(records),
+            "fake_ollama": fake_options
+        },
+        "latency_ms": summarize([r["ms"] for r in ok]),
+        "throughput_rps": round(len(ok) / wall, 2) if wall else 0.0,
+        "errors": len(records) - len(ok),
+        "models": dict(Counter(r["model"] for r in ok)),
+        "stages": stage_breakdown(ok)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["graph", "api"], default="graph")
+    parser.add_argument("--trace", default=DEFAULT_TRACE, help="JSONL with an \"input\" per line")
+    parser.add_argument("--synthetic", type=int, help="use N synthetic requests instead of --trace")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--token-ms", type=float, default=10.0)
+    parser.add_argument("--load-ms", type=float, default=500.0)
+    parser.add_argument("--prompt-ms", type=float, default=0.2)
+    parser.add_argument("--reply-tokens", type=int, default=48)
+    parser.add_argument("--parallel", type=int, default=1, help="fake Ollama concurrent requests per model")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--compare", help="previous report to diff against")
+    args = parser.parse_args()
+
+    inputs = synthetic_trace(args.synthetic) if args.synthetic else load_trace(args.trace)
+    fake_options = {"token_ms": args.token_ms, "load_ms": args.load_ms, "prompt_ms": args.prompt_ms,
+                    "reply_tokens": args.reply_tokens, "parallel": args.parallel}
+    report = benchmark(inputs, args.mode, args.concurrency, fake_options)
+
+    latency = report["latency_ms"]
+    print(f"{report['meta']['requests']} requests ({args.mode}, concurrency {args.concurrency}): "
+          f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+          f"{report['throughput_rps']} req/s, {report['errors']} errors")
+    for stage, stats in report["stages"].items():
+        print(f"  {stage:<45} n={stats['count']:<5} p50={stats['p50']}ms p95={stats['p95']}ms")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Replay labeled requests through the pre-router (and optionally the LLM classifier)
+and report coverage, accuracy and latency. Samples marked "fallthrough" must not
+be fast-routed at all.
+
+Usage:
+    python scripts/evaluate_router.py                    # pre-router only
+    python scripts/evaluate_router.py --sweep            # accuracy/coverage per threshold
+    python scripts/evaluate_router.py --llm              # also time OllamaClient.route (needs Ollama)
+    python scripts/evaluate_router.py --json report.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.prerouter import PreRouter
+from src.tools.registry import ToolRegistry
+
+DEFAULT_REPLAY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "router_replay.jsonl")
+
+def load_replay(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def evaluate_prerouter(router, samples):
+    routed, correct, latencies = 0, 0, []
+    per_label = defaultdict(lambda: {"total": 0, "routed": 0, "correct": 0})
+    mistakes = []
+    for sample in samples:
+        start = time.perf_counter()
+        decision = router.route(sample["input"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        stats = per_label[sample["label"]]
+        stats["total"] += 1
+        if decision is None:
+            continue
+        routed += 1
+        stats["routed"] += 1
+        if sample.get("fallthrough"):
+            # Must reach the LLM classifier: the fast path can't extract correct arguments
+            mistakes.append({"input": sample["input"], "expected": "fallthrough", "got": decision.label})
+        elif decision.label == sample["label"]:
+            correct += 1
+            stats["correct"] += 1
+        else:
+            mistakes.append({"input": sample["input"], "expected": sample["label"], "got": decision.label})
+
+    return {
+        "threshold": router.threshold,
+        "samples": len(samples),
+        "coverage": round(routed / len(samples), 3),
+        "accuracy_when_routed": round(correct / routed, 3) if routed else None,
+        "latency_ms": {"p50": round(percentile(latencies, 50), 3), "p95": round(percentile(latencies, 95), 3)},
+        "per_label": dict(per_label),
+        "mistakes": mistakes
+    }
+
+def evaluate_llm(samples, tools):
+    from src.core.llm import OllamaClient
+    client = OllamaClient()
+    correct, latencies = 0, []
+    for sample in samples:
+        start = time.perf_counter()
+        result = client.route(sample["input"], tools) or {}
+        latencies.append((time.perf_counter() - start) * 1000)
+        label = result.get("tool") if result.get("intent") == "tool_use" else "conversational"
+        correct += label == sample["label"]
+    return {
+        "accuracy": round(correct / len(samples), 3),
+        "latency_ms": {"p50": round(percentile(latencies, 50), 1), "p95": round(percentile(latencies, 95), 1)}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replay", default=DEFAULT_REPLAY)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--sweep", action="store_true", help="report thresholds 0.3..0.9")
+    parser.add_argument("--llm", action="store_true", help="also evaluate the LLM classifier")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    samples = load_replay(args.replay)
+    tools = ToolRegistry().get_tool_names()
+    thresholds = [round(0.3 + 0.1 * i, 1) for i in range(7)] if args.sweep else [args.threshold]
+
+    report = {"prerouter": [evaluate_prerouter(PreRouter(tools, threshold=t), samples) for t in thresholds]}
+    for result in report["prerouter"]:
+        print(f"threshold={result['threshold']:.2f} coverage={result['coverage']:.0%} "
+              f"accuracy={result['accuracy_when_routed']} p50={result['latency_ms']['p50']}ms")
+        for mistake in result["mistakes"]:
+            print(f"    MISROUTE {mistake['input']!r}: expected {mistake['expected']}, got {mistake['got']}")
+
+    if args.llm:
+        report["llm"] = evaluate_llm(samples, tools)
+        print(f"llm classifier accuracy={report['llm']['accuracy']} p50={report['llm']['latency_ms']['p50']}ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Deterministic stand-in for the Ollama HTTP API, for benchmarks and tests that
+must run with no network and no model.
+
+Implements /api/generate, /api/chat (streaming and not), /api/embed, /api/ps,
+/api/tags and /api/version. Latency is synthetic but shaped like the real
+thing: a one-off load time per model, prompt evaluation per prompt token and
+generation per output token, with at most `parallel` requests per model
+running at once (OLLAMA_NUM_PARALLEL). Responses carry the usual
+*_duration / *_count fields so client-side timing and telemetry work.
+
+JSON-format generate calls (routing) get a classification derived from
+keywords in the request, so the same trace always routes the same way.
+With `models`, /api/tags advertises just those and requests for any other
+model get a 404, like a host that hasn't pulled them (for backend-pool tests).
+
+Usage:
+    python scripts/fake_ollama.py --port 11434 --token-ms 20 --load-ms 1500
+"""
+
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLEX_WORDS = {"explain", "why", "design", "compare", "analyze", "architecture", "tradeoffs", "debug"}
+
+def classify(text: str) -> dict:
+    """Keyword routing decision with every key the router/classifier prompts ask for."""
+    lowered = text.lower()
+    words = re.findall(r"[a-z']+", lowered)
+    complexity = "complex" if len(words) > 14 or COMPLEX_WORDS & set(words) else "simple"
+    if re.search(r"\b(list|show) (the )?(files|directory|folder)|\bls\b", lowered):
+        return {"complexity": complexity, "intent": "tool_use", "tool": "list_dir", "args": {"path": "."}}
+    if re.search(r"\b(run|execute|uptime|disk)\b", lowered):
+        return {"complexity": complexity, "intent": "tool_use", "tool": "run_command",
+                "args": {"command": "echo benchmark"}}
+    return {"complexity": complexity, "intent": "conversational", "tool": None, "args": {}}
+
+def count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+class FakeOllama:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token_ms: float = 10.0, load_ms: float = 500.0,
+                 prompt_ms: float = 0.2, reply_tokens: int = 48, parallel: int = 1, models=None):
+        self.token_s = token_ms / 1000
+        self.load_s = load_ms / 1000
+        self.prompt_s = prompt_ms / 1000
+        self.reply_tokens = reply_tokens
+        self.parallel = parallel
+        # Advertised by /api/tags (plus whatever has been loaded); None serves any model
+        self.models = list(models) if models else None
+        self._loaded = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # --- Simulated model ---
+
+    def _slot(self, model: str) -> threading.Semaphore:
+        with self._lock:
+            self.requests += 1
+            if model not in self._slots:
+                self._slots[model] = threading.Semaphore(self.parallel)
+            return self._slots[model]
+
+    def _load(self, model: str) -> float:
+        """Seconds spent loading model for this call (only the first call per model pays)."""
+        with self._lock:
+            if model in self._loaded:
+                return 0.0
+            self._loaded[model] = time.time()
+        time.sleep(self.load_s)
+        return self.load_s
+
+    def _reply(self, prompt: str, limit: int = None) -> list:
+        seed = hashlib.sha1(prompt.encode()).hexdigest()
+        count = self.reply_tokens if not limit or limit < 0 else min(limit, self.reply_tokens)
+        return [f"{seed[i % len(seed)]}{i} " for i in range(count)]
+
+    def _metadata(self, model: str, load: float, prompt_tokens: int, prompt_s: float,
+                  tokens: int, eval_s: float) -> dict:
+        return {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((load + prompt_s + eval_s) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_s * 1e9),
+            "eval_count": tokens,
+            "eval_duration": int(eval_s * 1e9)
+        }
+
+    def complete(self, body: dict, kind: str, emit=None) -> dict:
+        """Run one generate/chat request. With emit, partial chunks are passed to it as they're produced."""
+        model = body.get("model", "")
+        if kind == "chat":
+            prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages") or [])
+        else:
+            prompt = f"{body.get('system', '')}\n{body.get('prompt', '')}"
+        limit = (body.get("options") or {}).get("num_predict")
+
+        with self._slot(model):
+            load = self._load(model)
+            if kind == "generate" and not body.get("prompt"):
+                # Empty prompt: Ollama just loads the model
+                return {**self._metadata(model, load, 0, 0.0, 0, 0.0), "response": ""}
+            prompt_tokens = count_tokens(prompt)
+            prompt_s = prompt_tokens * self.prompt_s
+            time.sleep(prompt_s)
+
+            if body.get("format") == "json":
+                request = prompt.rsplit("Request:", 1)[-1]
+                tokens = [json.dumps(classify(request))]
+            else:
+                tokens = self._reply(prompt, limit)
+            started = time.monotonic()
+            for token in tokens:
+                time.sleep(self.token_s)
+                if emit is not None:
+                    emit(self._chunk(model, kind, token))
+            eval_s = time.monotonic() - started
+
+        final = self._metadata(model, load, prompt_tokens, prompt_s, len(tokens), eval_s)
+        if emit is not None:
+            return {**self._chunk(model, kind, ""), **final}
+        text = "".join(tokens)
+        if kind == "chat":
+            return {**final, "message": {"role": "assistant", "content": text}}
+        return {**final, "response": text}
+
+    def _chunk(self, model: str, kind: str, token: str) -> dict:
+        chunk = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": False}
+        if kind == "chat":
+            chunk["message"] = {"role": "assistant", "content": token}
+        else:
+            chunk["response"] = token
+        return chunk
+
+    def embed(self, body: dict) -> dict:
+        inputs = body.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        vectors = []
+        for text in inputs:
+            digest = hashlib.sha1(text.encode()).digest()
+            vectors.append([b / 255 for b in digest[:16]])
+        return {"model": body.get("model", ""), "embeddings": vectors}
+
+    def ps(self) -> dict:
+        with self._lock:
+            loaded = list(self._loaded)
+        # Nothing is really resident, so report no memory and keep the power controller out of it
+        return {"models": [
+            {"name": m, "model": m, "size": 0, "size_vram": 0, "digest": "fake",
+             "expires_at": "2099-01-01T00:00:00Z"}
+            for m in loaded
+        ]}
+
+    def tags(self) -> dict:
+        with self._lock:
+            names = sorted(set(self.models or []) | set(self._loaded))
+        return {"models": [
+            {"name": m, "model": m, "size": 0, "digest": "fake", "modified_at": "2024-01-01T00:00:00Z"}
+            for m in names
+        ]}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _json(self, payload: dict, status: int = 200):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/ps":
+                    self._json(fake.ps())
+                elif self.path == "/api/tags":
+                    self._json(fake.tags())
+                elif self.path == "/api/version":
+                    self._json({"version": "0.0.0-fake"})
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                kind = self.path.rsplit("/", 1)[-1]
+                if fake.models is not None and body.get("model") not in fake.models:
+                    self._json({"error": f"model '{body.get('model')}' not found"}, 404)
+                elif kind == "embed":
+                    self._json(fake.embed(body))
+                elif kind not in ("generate", "chat"):
+                    self._json({"error": "not found"}, 404)
+                elif not body.get("stream", True):
+                    self._json(fake.complete(body, kind))
+                else:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    final = fake.complete(body, kind, emit=self._send_chunk)
+                    self._send_chunk(final)
+                    self.wfile.write(b"0\r\n\r\n")
+
+            def _send_chunk(self, payload: dict):
+                data = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--token-ms", type=float, default=10.0, help="latency per generated token")
+    parser.add_argument("--load-ms", type=float, default=500.0, help="one-off load time per model")
+    parser.add_argument("--prompt-ms", type=float, default=0.2, help="prompt evaluation per prompt token")
+    parser.add_argument("--reply-tokens", type=int, default=48)
+    parser.add_argument("--parallel", type=int, default=1, help="concurrent requests per model")
+    parser.add_argument("--models", nargs="*", help="models advertised by /api/tags")
+    args = parser.parse_args()
+
+    fake = FakeOllama(args.host, args.port, args.token_ms, args.load_ms, args.prompt_ms,
+                      args.reply_tokens, args.parallel, args.models)
+    print(f"Fake Ollama listening on {fake.url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
+
+if __name__ == "__main__":
+    main()
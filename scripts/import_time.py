@@ -0,0 +1,70 @@
+"""
+Cold-start check for the entry points.
+
+Imports each interface module in a fresh interpreter (best of --runs) and
+reports the import time and which heavy dependencies it pulled in. The graph,
+Ollama client and resource monitor are built by the application context on
+first use, so importing the server or the REPL must not load langgraph, ollama
+or psutil; --check exits non-zero when an entry point does or is slower than
+its budget.
+
+Usage:
+    python scripts/import_time.py
+    python scripts/import_time.py --runs 5 --check
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("langgraph", "ollama", "psutil")
+
+# Seconds; generous so slow CI machines pass, tight enough to catch an eager graph build
+ENTRY_POINTS = {
+    "src.interface.repl": 0.5,
+    "src.interface.server": 2.0,
+}
+
+PROBE = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str, runs: int = 3) -> dict:
+    """Best-of-`runs` import time for `module` in a fresh interpreter, plus the heavy modules it loaded."""
+    best = None
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True, timeout=120, check=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="fail on heavy imports or a blown budget")
+    args = parser.parse_args()
+
+    failed = False
+    for module, budget in ENTRY_POINTS.items():
+        result = measure(module, args.runs)
+        over = result["seconds"] > budget
+        failed |= over or bool(result["heavy"])
+        heavy = ", ".join(result["heavy"]) or "none"
+        print(f"{module:<24} {result['seconds'] * 1000:7.1f} ms (budget {budget * 1000:.0f} ms)  heavy imports: {heavy}")
+    if args.check and failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
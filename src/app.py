@@ -0,0 +1,165 @@
+"""
+andy-os Application Context
+
+One place that builds the process-wide objects - the Ollama client, tool
+registry, memory store, resource monitor, power controller, sessions and the
+compiled agent graphs - on first use, and shares them between the graph nodes,
+the API server and the REPL. Nothing here imports langgraph, ollama or psutil
+until the object that needs them is asked for, so importing the interfaces
+stays cheap and tests only pay for what they touch.
+
+The server builds its context in the FastAPI lifespan hook; the REPL when it
+starts. Modules that used to hold these singletons at import time (the graph
+nodes) refer to them through `shared("name")`, which resolves against the
+current context on each access and can still be replaced with mock.patch.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class AppContext:
+    def __init__(self):
+        self._objects: Dict[str, Any] = {}
+        self._graphs: Dict[bool, Any] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name: str, build):
+        # RLock: building one object may ask for another (the client needs the monitor)
+        with self._lock:
+            if name not in self._objects:
+                self._objects[name] = build()
+            return self._objects[name]
+
+    @property
+    def client(self):
+        def build():
+            from .core.llm import OllamaClient
+            client = OllamaClient()
+            # Admission control reads the same smoothed status instead of sampling on its own
+            client.scheduler.monitor = self.monitor
+            return client
+        return self._get("client", build)
+
+    @property
+    def registry(self):
+        def build():
+            from .tools.registry import ToolRegistry
+            return ToolRegistry()
+        return self._get("registry", build)
+
+    @property
+    def memory(self):
+        def build():
+            from .core.memory import MemoryStore
+            return MemoryStore()
+        return self._get("memory", build)
+
+    @property
+    def monitor(self):
+        def build():
+            from .core.resources import ResourceMonitor
+            # Sampled resource metrics shared by the scheduler, power controller and status endpoint
+            return ResourceMonitor(
+                cpu_threshold_critical=85.0,
+                mem_threshold_critical=90.0,
+                interval=float(os.getenv("ANDY_OS_MONITOR_INTERVAL", "2"))
+            )
+        return self._get("monitor", build)
+
+    @property
+    def pressure(self):
+        def build():
+            from .core.pressure import PressureController
+            # Power mode derived from the monitor (with hysteresis)
+            return PressureController(self.monitor, min_dwell=float(os.getenv("ANDY_OS_POWER_MIN_DWELL", "30")))
+        return self._get("pressure", build)
+
+    @property
+    def sessions(self):
+        def build():
+            from .core.sessions import SessionStore
+
+            def fold_evicted(conversation_id, evicted, window):
+                # Turns leaving the window still count: fold them into the summary
+                from .engine.nodes import context_manager
+                context_manager.schedule_summary(conversation_id, evicted, window)
+
+            # Server-side sessions: clients send a session_id and only the new message
+            return SessionStore(
+                self.memory,
+                max_sessions=int(os.getenv("ANDY_OS_MAX_SESSIONS", "256")),
+                window=int(os.getenv("ANDY_OS_SESSION_WINDOW", "50")),
+                on_evict=fold_evicted
+            )
+        return self._get("sessions", build)
+
+    @property
+    def model_manager(self):
+        def build():
+            from .core.models import ModelManager
+            # Keeps both model tiers resident so tier switches don't pay a cold load
+            return ModelManager(
+                self.client,
+                monitor=self.monitor,
+                interval=float(os.getenv("ANDY_OS_WARM_INTERVAL", "600"))
+            )
+        return self._get("model_manager", build)
+
+    def graph(self, use_async: bool = False):
+        """Compiled agent graph, built once per flavour (sync for the REPL, async for the API)."""
+        with self._lock:
+            if use_async not in self._graphs:
+                from .engine.graph import create_agent_graph
+                self._graphs[use_async] = create_agent_graph(use_async=use_async)
+                logger.info(f"Agent Graph initialized ({'async' if use_async else 'sync'})")
+            return self._graphs[use_async]
+
+_app: Optional[AppContext] = None
+_app_lock = threading.Lock()
+
+def get_app() -> AppContext:
+    """The process-wide context, created on first call."""
+    global _app
+    with _app_lock:
+        if _app is None:
+            _app = AppContext()
+        return _app
+
+def set_app(app: Optional[AppContext]) -> Optional[AppContext]:
+    """Install `app` as the current context (None resets to a fresh one on next use). Returns the previous one."""
+    global _app
+    with _app_lock:
+        previous, _app = _app, app
+        return previous
+
+class Shared:
+    """
+    Stand-in for one AppContext object: attribute reads, writes and deletes go
+    to get_app().<name>, so the object is only built when first used.
+    """
+    __slots__ = ("_shared_name",)
+
+    def __init__(self, name: str):
+        object.__setattr__(self, "_shared_name", name)
+
+    def _resolve(self):
+        return getattr(get_app(), object.__getattribute__(self, "_shared_name"))
+
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+    def __setattr__(self, item, value):
+        setattr(self._resolve(), item, value)
+
+    def __delattr__(self, item):
+        delattr(self._resolve(), item)
+
+    def __repr__(self):
+        return f"<shared {object.__getattribute__(self, '_shared_name')}>"
+
+def shared(name: str) -> Shared:
+    return Shared(name)
@@ -0,0 +1,345 @@
+"""
+andy-os Ollama Backends
+
+Spreads Ollama calls over one or more hosts. Each Backend has its own pooled
+transport and circuit breaker (src.core.transport) and advertises the models
+it serves: a fixed list from configuration, or what the health check finds
+in its /api/tags, plus which of them are loaded right now (/api/ps).
+
+A call goes to the backends that serve its model - so the light and heavy
+tiers chosen by classifier_node each map onto their own group of hosts -
+preferring healthy backends that already have the model loaded, then the one
+with the fewest outstanding requests for that model. If a backend can't be
+reached the call fails over to the next candidate; once Ollama has started
+answering, errors are returned as-is.
+
+Configured with ANDY_OS_OLLAMA_BACKENDS, space-separated `url[=model,model]`
+entries, e.g. "http://main:11434=llama3 http://laptop:11434=qwen2.5-coder:1.5b".
+Without it the pool is the single OLLAMA_HOST backend.
+
+Only a backend on this machine (a loopback or own-hostname URL) counts towards
+the power controller's Ollama memory share; models other hosts hold don't use
+this box's RAM.
+"""
+
+import os
+import socket
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+from urllib.parse import urlsplit
+
+import ollama
+
+from .transport import CircuitBreaker, OllamaUnavailable, TransportConfig, RETRYABLE
+
+logger = logging.getLogger(__name__)
+
+# The request never got an answer from this backend, so another one may take it
+# (ollama raises the builtin ConnectionError for refused connections)
+FAILOVER = (ConnectionError, OllamaUnavailable) + RETRYABLE
+
+LOOPBACK = {"localhost", "127.0.0.1", "::1", "0.0.0.0"}
+
+def is_local(host: str) -> bool:
+    """Whether an Ollama URL (scheme optional, as OLLAMA_HOST allows) points at this machine."""
+    name = urlsplit(host if "://" in host else f"http://{host}").hostname or "localhost"
+    return name in LOOPBACK or name == socket.gethostname()
+
+class Backend:
+    def __init__(self, host: str, config: TransportConfig, models: Optional[List[str]] = None):
+        self.host = host
+        self.local = is_local(host)
+        self.models: Optional[Set[str]] = set(models) if models else None
+        self.breaker = CircuitBreaker(config.breaker_failures, config.breaker_cooldown)
+        sync_options = config.client_options(self.breaker)
+        async_options = config.client_options(self.breaker, asynchronous=True)
+        self._transports = (sync_options["transport"], async_options["transport"])
+        self.client = ollama.Client(host=host, **sync_options)
+        self.async_client = ollama.AsyncClient(host=host, **async_options)
+        self.healthy = True
+        self.available: Optional[Set[str]] = None  # from /api/tags once checked
+        self.loaded: Set[str] = set()               # from /api/ps once checked
+        self.outstanding: Dict[str, int] = defaultdict(int)
+
+    def serves(self, model: str) -> Optional[bool]:
+        """True/False when known from config or the last health check, None when unknown."""
+        if self.models is not None:
+            return model in self.models
+        if self.available:
+            return model in self.available
+        return None
+
+    @property
+    def retried(self) -> int:
+        return sum(t.retried for t in self._transports)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "local": self.local,
+            "healthy": self.healthy,
+            "models": sorted(self.models if self.models is not None else self.available or []),
+            "loaded": sorted(self.loaded),
+            "outstanding": {m: n for m, n in self.outstanding.items() if n},
+            "retries": self.retried,
+            "breaker": self.breaker.stats()
+        }
+
+class BackendPool:
+    def __init__(self, backends: List[Backend], check_interval: float = 15.0):
+        if not backends:
+            raise ValueError("BackendPool needs at least one backend")
+        self.backends = backends
+        self.check_interval = check_interval
+        self.failovers = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Drop-in stand-ins for ollama.Client / ollama.AsyncClient
+        self.client = PoolClient(self)
+        self.async_client = AsyncPoolClient(self)
+
+    @classmethod
+    def from_env(cls, host: str, config: TransportConfig) -> "BackendPool":
+        spec = os.getenv("ANDY_OS_OLLAMA_BACKENDS", "").split()
+        backends = []
+        for entry in spec or [host]:
+            url, _, models = entry.partition("=")
+            backends.append(Backend(url, config, [m for m in models.split(",") if m] or None))
+        return cls(backends, check_interval=float(os.getenv("ANDY_OS_BACKEND_CHECK_INTERVAL", "15")))
+
+    @property
+    def local(self) -> Optional[Backend]:
+        """The backend running on this machine, if any."""
+        return next((b for b in self.backends if b.local), None)
+
+    # --- Selection ---
+
+    def group(self, model: str) -> List[Backend]:
+        """Backends that serve `model`; backends with unknown models if none is known to; else all."""
+        known = [b for b in self.backends if b.serves(model)]
+        if known:
+            return known
+        unknown = [b for b in self.backends if b.serves(model) is None]
+        return unknown or list(self.backends)
+
+    def capacity(self, model: str) -> int:
+        """How many backends may serve `model` (scales the scheduler's per-model limit)."""
+        return len([b for b in self.backends if b.serves(model) is not False]) or 1
+
+    def candidates(self, model: str) -> List[Backend]:
+        """Reachable backends for `model`, best first. Raises OllamaUnavailable if all breakers are open."""
+        group = self.group(model)
+        reachable = [b for b in group if b.breaker.retry_after() == 0]
+        if not reachable:
+            raise OllamaUnavailable(min(b.breaker.retry_after() for b in group))
+        with self._lock:
+            return sorted(reachable, key=lambda b: (
+                not b.healthy,
+                model not in b.loaded,
+                b.outstanding[model],
+                sum(b.outstanding.values())
+            ))
+
+    def retry_after(self) -> float:
+        """0 while any backend accepts calls, else seconds until the first one probes again."""
+        return min(b.breaker.retry_after() for b in self.backends)
+
+    @contextmanager
+    def _tracked(self, backend: Backend, model: str):
+        with self._lock:
+            backend.outstanding[model] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                backend.outstanding[model] -= 1
+
+    def _succeeded(self, backend: Backend):
+        if not backend.healthy:
+            logger.info(f"Ollama backend {backend.host} answered again")
+            backend.healthy = True
+
+    def _failed(self, backend: Backend, model: str, error: Exception, last: bool):
+        backend.healthy = False
+        if not last:
+            self.failovers += 1
+            logger.warning(f"Ollama backend {backend.host} unreachable for {model} ({error}), failing over")
+
+    # --- Calls ---
+
+    def call(self, method: str, model: str, kwargs: Dict[str, Any]):
+        candidates = self.candidates(model)
+        for i, backend in enumerate(candidates):
+            last = i == len(candidates) - 1
+            with self._tracked(backend, model):
+                try:
+                    response = getattr(backend.client, method)(model=model, **kwargs)
+                except FAILOVER as e:
+                    self._failed(backend, model, e, last)
+                    if last:
+                        raise
+                    continue
+            self._succeeded(backend)
+            return response
+
+    def stream(self, method: str, model: str, kwargs: Dict[str, Any]) -> Iterator[Any]:
+        """Streaming call; fails over only until the first chunk arrives."""
+        candidates = self.candidates(model)
+        for i, backend in enumerate(candidates):
+            last = i == len(candidates) - 1
+            with self._tracked(backend, model):
+                chunks = iter(getattr(backend.client, method)(model=model, **kwargs))
+                try:
+                    first = next(chunks)
+                except StopIteration:
+                    return
+                except FAILOVER as e:
+                    self._failed(backend, model, e, last)
+                    if last:
+                        raise
+                    continue
+                self._succeeded(backend)
+                yield first
+                yield from chunks
+                return
+
+    async def acall(self, method: str, model: str, kwargs: Dict[str, Any]):
+        candidates = self.candidates(model)
+        for i, backend in enumerate(candidates):
+            last = i == len(candidates) - 1
+            with self._tracked(backend, model):
+                try:
+                    response = await getattr(backend.async_client, method)(model=model, **kwargs)
+                except FAILOVER as e:
+                    self._failed(backend, model, e, last)
+                    if last:
+                        raise
+                    continue
+            self._succeeded(backend)
+            return response
+
+    async def astream(self, method: str, model: str, kwargs: Dict[str, Any]):
+        """Async version of stream."""
+        candidates = self.candidates(model)
+        for i, backend in enumerate(candidates):
+            last = i == len(candidates) - 1
+            with self._tracked(backend, model):
+                try:
+                    chunks = (await getattr(backend.async_client, method)(model=model, **kwargs)).__aiter__()
+                    first = await chunks.__anext__()
+                except StopAsyncIteration:
+                    return
+                except FAILOVER as e:
+                    self._failed(backend, model, e, last)
+                    if last:
+                        raise
+                    continue
+                self._succeeded(backend)
+                yield first
+                async for chunk in chunks:
+                    yield chunk
+                return
+
+    async def ps(self) -> Dict[str, Any]:
+        """Loaded models across all reachable backends, in /api/ps shape (see `local` for this machine's)."""
+        results = await asyncio.gather(*(b.async_client.ps() for b in self.backends), return_exceptions=True)
+        if all(isinstance(r, BaseException) for r in results):
+            raise results[0]
+        return {"models": [m for r in results if not isinstance(r, BaseException) for m in r.get('models', [])]}
+
+    # --- Health checks ---
+
+    async def check_backend(self, backend: Backend, timeout: float = 2.0) -> bool:
+        try:
+            tags, ps = await asyncio.wait_for(
+                asyncio.gather(backend.async_client.list(), backend.async_client.ps()), timeout)
+        except Exception as e:
+            if backend.healthy:
+                logger.warning(f"Ollama backend {backend.host} failed its health check: {e}")
+            backend.healthy = False
+            return False
+        if not backend.healthy:
+            logger.info(f"Ollama backend {backend.host} is healthy again")
+        backend.available = {m.get('model') or m.get('name') for m in tags.get('models', [])}
+        backend.loaded = {m.get('model') or m.get('name') for m in ps.get('models', [])}
+        backend.healthy = True
+        return True
+
+    async def check(self) -> Dict[str, bool]:
+        results = await asyncio.gather(*(self.check_backend(b) for b in self.backends))
+        return {b.host: ok for b, ok in zip(self.backends, results)}
+
+    async def _loop(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self):
+        """Health-check every backend on a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            backends = [b.stats() for b in self.backends]
+        return {
+            "retry_after": round(self.retry_after(), 1),
+            "failovers": self.failovers,
+            "retries": sum(b["retries"] for b in backends),
+            "backends": backends
+        }
+
+class PoolClient:
+    """The subset of ollama.Client that OllamaClient uses, routed through the pool by model."""
+
+    def __init__(self, pool: BackendPool):
+        self.pool = pool
+
+    def generate(self, model: str = "", **kwargs):
+        if kwargs.get("stream"):
+            return self.pool.stream("generate", model, kwargs)
+        return self.pool.call("generate", model, kwargs)
+
+    def chat(self, model: str = "", **kwargs):
+        if kwargs.get("stream"):
+            return self.pool.stream("chat", model, kwargs)
+        return self.pool.call("chat", model, kwargs)
+
+    def embed(self, model: str = "", **kwargs):
+        return self.pool.call("embed", model, kwargs)
+
+class AsyncPoolClient:
+    """The subset of ollama.AsyncClient that OllamaClient uses, routed through the pool by model."""
+
+    def __init__(self, pool: BackendPool):
+        self.pool = pool
+
+    async def generate(self, model: str = "", **kwargs):
+        if kwargs.get("stream"):
+            return self.pool.astream("generate", model, kwargs)
+        return await self.pool.acall("generate", model, kwargs)
+
+    async def chat(self, model: str = "", **kwargs):
+        if kwargs.get("stream"):
+            return self.pool.astream("chat", model, kwargs)
+        return await self.pool.acall("chat", model, kwargs)
+
+    async def embed(self, model: str = "", **kwargs):
+        return await self.pool.acall("embed", model, kwargs)
+
+    async def ps(self):
+        return await self.pool.ps()
@@ -0,0 +1,163 @@
+"""
+andy-os Context Window Management
+
+Fits conversation history into a per-model token budget. Turns that no longer
+fit - or that slide out of the session's raw message window - are folded into
+a rolling summary (stored in conversations.summary) by the light model on a
+background thread, and the summary is sent in their place.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .llm import OllamaClient
+
+logger = logging.getLogger(__name__)
+
+# Per-model token budget for conversation history (system prompt and tool output excluded)
+CONTEXT_BUDGETS = {
+    OllamaClient.LIGHT_MODEL: int(os.getenv("ANDY_OS_LIGHT_CONTEXT_TOKENS", "2048")),
+    OllamaClient.HEAVY_MODEL: int(os.getenv("ANDY_OS_HEAVY_CONTEXT_TOKENS", "6144")),
+}
+DEFAULT_BUDGET = min(CONTEXT_BUDGETS.values())
+
+MESSAGE_OVERHEAD = 4  # role/template tokens per chat message
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token for llama/qwen tokenizers)."""
+    return len(text) // 4 + 1
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    """
+    estimate_tokens, cached per message content so re-budgeting the same history
+    each turn is cheap. The cache keeps its keys alive, so don't pass it raw tool
+    output - use estimate_tokens for text that won't be counted again.
+    """
+    return estimate_tokens(text)
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return count_tokens(message.get("content", "")) + MESSAGE_OVERHEAD
+
+def _fingerprint(message: Dict[str, str]) -> str:
+    return hashlib.sha1(f"{message.get('role')}:{message.get('content')}".encode('utf_8')).hexdigest()
+
+SummarizeFn = Callable[[str, List[Dict[str, str]]], str]
+
+class ContextManager:
+    def __init__(self, summarize: SummarizeFn, store=None, budgets: Dict[str, int] = None):
+        self.summarize = summarize
+        self._store = store
+        self.budgets = budgets or CONTEXT_BUDGETS
+        self._summaries: Dict[int, str] = {}
+        self._last_summarized: Dict[int, str] = {}  # conversation -> fingerprint of newest folded message
+        self._in_flight = set()
+        self._pending: Dict[int, Dict[str, Dict[str, str]]] = {}  # queued while a summary is in flight
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="andy-os-summary")
+
+    @property
+    def store(self):
+        if self._store is None:
+            from .memory import memory
+            self._store = memory
+        return self._store
+
+    def budget_for(self, model: Optional[str]) -> int:
+        return self.budgets.get(model, DEFAULT_BUDGET)
+
+    def get_summary(self, conversation_id: int) -> str:
+        with self._lock:
+            if conversation_id in self._summaries:
+                return self._summaries[conversation_id]
+        summary = self.store.get_summary(conversation_id) or ""
+        with self._lock:
+            return self._summaries.setdefault(conversation_id, summary)
+
+    def fit(self, messages: List[Dict[str, str]], model: Optional[str],
+            conversation_id: Optional[int] = None) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Return (kept, dropped): the newest messages that fit the model's budget,
+        preceded by the conversation summary when there is one (older turns were
+        dropped here or left the session window earlier). The latest message is
+        always kept.
+        """
+        budget = self.budget_for(model)
+        summary = self.get_summary(conversation_id) if conversation_id is not None else ""
+        summary_msg = {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+        if summary:
+            budget -= message_tokens(summary_msg)
+
+        used, start = 0, len(messages)
+        while start > 0:
+            cost = message_tokens(messages[start - 1])
+            if used + cost > budget and start < len(messages):
+                break
+            used += cost
+            start -= 1
+
+        kept, dropped = list(messages[start:]), list(messages[:start])
+        if summary:
+            kept.insert(0, summary_msg)
+        return kept, dropped
+
+    def _unfolded(self, conversation_id: int, messages: List[Dict[str, str]],
+                  newer: List[Dict[str, str]] = ()) -> List[Dict[str, str]]:
+        """The part of `messages` newer than the last one folded in (caller holds the lock)."""
+        marker = self._last_summarized.get(conversation_id)
+        if marker is None:
+            return messages
+        fingerprints = [_fingerprint(m) for m in messages]
+        if marker in fingerprints:
+            return messages[len(fingerprints) - fingerprints[::-1].index(marker):]
+        if any(_fingerprint(m) == marker for m in newer):
+            return []  # everything here is older than what was already folded
+        return messages
+
+    def schedule_summary(self, conversation_id: int, dropped: List[Dict[str, str]],
+                         newer: List[Dict[str, str]] = ()):
+        """
+        Fold newly dropped messages into the rolling summary in the background.
+        `newer` are the messages still held after them, used to tell whether
+        they were folded in already.
+        """
+        if not dropped:
+            return
+        with self._lock:
+            dropped = self._unfolded(conversation_id, dropped, newer)
+            if not dropped:
+                return
+            if conversation_id in self._in_flight:
+                # Evicted messages won't be offered again, so queue rather than skip
+                pending = self._pending.setdefault(conversation_id, {})
+                for message in dropped:
+                    pending.setdefault(_fingerprint(message), message)
+                return
+            self._in_flight.add(conversation_id)
+        self._executor.submit(self._summarize, conversation_id, dropped)
+
+    def _summarize(self, conversation_id: int, new_messages: List[Dict[str, str]]):
+        try:
+            previous = self.get_summary(conversation_id)
+            summary = self.summarize(previous, new_messages)
+            if not summary:
+                return
+            self.store.update_summary(conversation_id, summary)
+            with self._lock:
+                self._summaries[conversation_id] = summary
+                self._last_summarized[conversation_id] = _fingerprint(new_messages[-1])
+            logger.info(f"Updated summary for conversation {conversation_id} ({len(new_messages)} new messages)")
+        except Exception as e:
+            logger.warning(f"Summarization failed for conversation {conversation_id}: {e}")
+        finally:
+            with self._lock:
+                pending = self._unfolded(conversation_id, list(self._pending.pop(conversation_id, {}).values()))
+                if pending:
+                    self._executor.submit(self._summarize, conversation_id, pending)
+                else:
+                    self._in_flight.discard(conversation_id)
@@ -1,45 +1,286 @@
 import os
+import re
+import copy
+import time
+import asyncio
 import logging
 import json
-import ollama
-from typing import Dict, Any, List
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Iterator, AsyncIterator, Optional
 
-from .prompts import CLASSIFIER_PROMPT, SYSTEM_IDENTITY
+from .scheduler import ModelScheduler, Priority, SchedulerOverloaded
+from .transport import OllamaUnavailable, TransportConfig, read_timeout
+from .backends import BackendPool
+from . import telemetry
+from .prompts import CLASSIFIER_PROMPT, ROUTER_PROMPT, SUMMARY_PROMPT, SYSTEM_IDENTITY
 
 logger = logging.getLogger(__name__)
 
+COMPLEXITY_PROMPT = (
+    "Classify if this request is SIMPLE or COMPLEX.\n"
+    "SIMPLE: greetings, basic questions, single-step tasks, status checks, short answers.\n"
+    "COMPLEX: multi-step reasoning, code generation, detailed analysis, debugging.\n\n"
+    "Output ONLY valid JSON: {\"complexity\": \"simple\"} or {\"complexity\": \"complex\"}"
+)
+
+def normalize_input(text: str) -> str:
+    """Cache key form of a user message: lowercase, collapsed whitespace, no trailing punctuation."""
+    return re.sub(r"\s+", " ", text.lower()).strip().rstrip("?!. ")
+
+# Answers mentioning these depend on live system state or the clock and are never cached
+TIME_SENSITIVE_RE = re.compile(
+    r"\b(now|today|tonight|yesterday|tomorrow|time|date|current|currently|latest|status|"
+    r"uptime|cpu|memory|ram|disk|temp|temperature|load|running|weather)\b"
+)
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+class ResponseCache:
+    """
+    Opt-in cache for conversational answers (ANDY_OS_RESPONSE_CACHE=1).
+    Only consulted for turns without tool output; time-sensitive questions are skipped.
+    Keys include a digest of the prior conversation, so a follow-up like "why?"
+    only hits an answer given after the same history.
+    """
+
+    def __init__(self, enabled: bool = None, maxsize: int = 256, ttl: float = None):
+        if enabled is None:
+            enabled = os.getenv("ANDY_OS_RESPONSE_CACHE", "0") == "1"
+        if ttl is None:
+            ttl = float(os.getenv("ANDY_OS_RESPONSE_CACHE_TTL", "300"))
+        self.enabled = enabled
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def _key(self, user_input: str, model: Optional[str], history: List[Dict[str, str]] = ()) -> Optional[tuple]:
+        normalized = normalize_input(user_input)
+        if not self.enabled or not normalized or TIME_SENSITIVE_RE.search(normalized):
+            return None
+        if not history:
+            return (normalized, model, None)
+        turns = json.dumps([(m.get("role"), m.get("content")) for m in history])
+        return (normalized, model, hashlib.sha1(turns.encode()).hexdigest())
+
+    def get(self, user_input: str, model: Optional[str], history: List[Dict[str, str]] = ()) -> Optional[str]:
+        """Cached answer to `user_input` after the prior messages `history`."""
+        key = self._key(user_input, model, history)
+        return self.cache.get(key) if key else None
+
+    def set(self, user_input: str, model: Optional[str], response: str, history: List[Dict[str, str]] = ()):
+        key = self._key(user_input, model, history)
+        if key and not response.startswith("I encountered an error"):
+            self.cache.set(key, response)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.cache.stats()}
+
+class ModelTimings:
+    """
+    Aggregates Ollama's response metadata per model. A call whose load_duration
+    exceeds COLD_START_NS had to load the model into memory first.
+    """
+
+    COLD_START_NS = 500_000_000  # 0.5s
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, response, call: str = "generate"):
+        telemetry.record_ollama(call, response)
+        try:
+            load = response.get('load_duration')
+            evaluation = response.get('eval_duration')
+            model = response.get('model') or "unknown"
+        except Exception:
+            return
+        if not isinstance(load, (int, float)) or not isinstance(evaluation, (int, float)):
+            return
+
+        with self._lock:
+            stats = self._stats.setdefault(model, {
+                "calls": 0, "cold_starts": 0, "load_ms_total": 0.0, "eval_ms_total": 0.0,
+                "last_load_ms": 0.0, "last_cold_start": None
+            })
+            stats["calls"] += 1
+            stats["load_ms_total"] += load / 1e6
+            stats["eval_ms_total"] += evaluation / 1e6
+            stats["last_load_ms"] = round(load / 1e6, 1)
+            if load > self.COLD_START_NS:
+                stats["cold_starts"] += 1
+                stats["last_cold_start"] = time.time()
+                logger.info(f"Cold start for {model}: load took {load / 1e9:.2f}s")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                model: {
+                    "calls": s["calls"],
+                    "cold_starts": s["cold_starts"],
+                    "avg_load_ms": round(s["load_ms_total"] / s["calls"], 1),
+                    "avg_eval_ms": round(s["eval_ms_total"] / s["calls"], 1),
+                    "last_load_ms": s["last_load_ms"],
+                    "last_cold_start": s["last_cold_start"]
+                }
+                for model, s in self._stats.items()
+            }
+
 class OllamaClient:
     LIGHT_MODEL = "qwen2.5-coder:1.5b"
     HEAVY_MODEL = "llama3"
-    
+    EMBED_MODEL = os.getenv("ANDY_OS_EMBED_MODEL", "nomic-embed-text")
+
     def __init__(self, model: str = "llama3"):
         self.model = model
         self.host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-        self.client = ollama.Client(host=self.host)
+        # One or more Ollama hosts (ANDY_OS_OLLAMA_BACKENDS), each with a pooled, kept-alive
+        # transport, explicit timeouts, connection retries and its own circuit breaker;
+        # calls are routed to a backend serving their model
+        self.transport = TransportConfig.from_env()
+        self.backends = BackendPool.from_env(self.host, self.transport)
+        self.client = self.backends.client
+        self.async_client = self.backends.async_client
+        # keep_alive hint sent with every call so Ollama doesn't evict models between requests
+        self.keep_alive = os.getenv("ANDY_OS_KEEP_ALIVE", "30m")
+        # Load vs eval durations reported by Ollama, per model
+        self.timings = ModelTimings()
+        # Routing decisions keyed on normalized input + tool list
+        self.routing_cache = TTLCache(
+            maxsize=int(os.getenv("ANDY_OS_ROUTING_CACHE_SIZE", "512")),
+            ttl=float(os.getenv("ANDY_OS_ROUTING_CACHE_TTL", "600"))
+        )
+        # Per-model concurrency limits and a priority queue in front of Ollama
+        self.scheduler = ModelScheduler(
+            # Per backend, so a model served by two hosts gets twice the slots
+            limits={
+                self.LIGHT_MODEL: int(os.getenv("ANDY_OS_LIGHT_CONCURRENCY", "2")) * self.backends.capacity(self.LIGHT_MODEL),
+                self.HEAVY_MODEL: int(os.getenv("ANDY_OS_HEAVY_CONCURRENCY", "1")) * self.backends.capacity(self.HEAVY_MODEL)
+            },
+            max_queue=int(os.getenv("ANDY_OS_MAX_QUEUE", "32")),
+            max_wait=float(os.getenv("ANDY_OS_MAX_QUEUE_WAIT", "20"))
+        )
+
+    # --- Request builders / response parsers shared by the sync and async paths ---
+
+    def _json_request(self, model: str, system_prompt: str, user_input: str) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "prompt": f"Request: {user_input}",
+            "system": system_prompt,
+            "format": "json",
+            "stream": False,
+            "keep_alive": self.keep_alive
+        }
+
+    def _complexity_request(self, user_input: str) -> Dict[str, Any]:
+        return self._json_request(self.LIGHT_MODEL, COMPLEXITY_PROMPT, user_input)
+
+    def _parse_complexity(self, response, user_input: str) -> str:
+        result = json.loads(response['response'])
+        complexity = result.get("complexity", "simple")
+        logger.info(f"Complexity assessment: {complexity} for input: {user_input[:50]}...")
+        return complexity
+
+    def _intent_request(self, user_input: str, tools: List[str], model_override: str = None) -> Dict[str, Any]:
+        system_prompt = CLASSIFIER_PROMPT.format(tools=', '.join(tools))
+        return self._json_request(model_override or self.model, system_prompt, user_input)
+
+    def _route_request(self, user_input: str, tools: List[str]) -> Dict[str, Any]:
+        system_prompt = ROUTER_PROMPT.format(tools=', '.join(tools))
+        return self._json_request(self.LIGHT_MODEL, system_prompt, user_input)
+
+    def _parse_route(self, response, user_input: str) -> Optional[Dict[str, Any]]:
+        result = json.loads(response['response'])
+        if result.get("complexity") not in ("simple", "complex") or \
+                result.get("intent") not in ("tool_use", "conversational"):
+            logger.warning(f"Combined routing returned malformed result: {result}")
+            return None
+
+        logger.info(f"Routing: {result.get('complexity')}/{result.get('intent')} for input: {user_input[:50]}...")
+        return result
+
+    def _cache_key(self, kind: str, user_input: str, tools: List[str] = (), model: str = None) -> tuple:
+        return (kind, normalize_input(user_input), tuple(tools), model)
+
+    def _fallback(self, model: str) -> Optional[str]:
+        """Model to downgrade synthesis to when the requested tier is overloaded."""
+        return self.LIGHT_MODEL if model == self.HEAVY_MODEL else None
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.routing_cache.stats()
+
+    def transport_stats(self) -> Dict[str, Any]:
+        return self.backends.stats()
+
+    def _build_messages(self, messages: List[Dict[str, str]], context: str = "") -> List[Dict[str, str]]:
+        """
+        Prepend the andy-os identity (plus optional recent context) as a system message.
+        """
+        system_content = SYSTEM_IDENTITY
+        if context:
+            system_content += f"\n\n## Recent Context:\n{context}"
+
+        return [{"role": "system", "content": system_content}] + messages
+
+    # --- Synchronous API ---
 
     def assess_complexity(self, user_input: str) -> str:
         """
         Use a lightweight model to classify if the request is simple or complex.
         Returns: "simple" or "complex"
         """
-        system_prompt = (
-            "Classify if this request is SIMPLE or COMPLEX.\n"
-            "SIMPLE: greetings, basic questions, single-step tasks, status checks, short answers.\n"
-            "COMPLEX: multi-step reasoning, code generation, detailed analysis, debugging.\n\n"
-            "Output ONLY valid JSON: {\"complexity\": \"simple\"} or {\"complexity\": \"complex\"}"
-        )
-        
+        key = self._cache_key("complexity", user_input)
+        cached = self.routing_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.generate(
-                model=self.LIGHT_MODEL,
-                prompt=f"Request: {user_input}",
-                system=system_prompt,
-                format="json",
-                stream=False
-            )
-            result = json.loads(response['response'])
-            complexity = result.get("complexity", "simple")
-            logger.info(f"Complexity assessment: {complexity} for input: {user_input[:50]}...")
+            request = self._complexity_request(user_input)
+            with self.scheduler.slot(request["model"], Priority.ROUTING), read_timeout(self.transport.route_timeout):
+                response = self.client.generate(**request)
+            self.timings.record(response, "complexity")
+            complexity = self._parse_complexity(response, user_input)
+            self.routing_cache.set(key, complexity)
             return complexity
         except Exception as e:
             logger.warning(f"Complexity assessment failed: {e}, defaulting to simple")
@@ -49,42 +290,279 @@ class OllamaClient:
         """
         Fast LLM call to route the request using andy-os classifier prompt.
         """
-        current_model = model_override or self.model
-        system_prompt = CLASSIFIER_PROMPT.format(tools=', '.join(tools))
-        
+        request = self._intent_request(user_input, tools, model_override)
+        key = self._cache_key("intent", user_input, tools, request["model"])
+        cached = self.routing_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = self.client.generate(
-                model=current_model,
-                prompt=f"Request: {user_input}",
-                system=system_prompt,
-                format="json",
-                stream=False
-            )
-            return json.loads(response['response'])
+            with self.scheduler.slot(request["model"], Priority.ROUTING), read_timeout(self.transport.route_timeout):
+                response = self.client.generate(**request)
+            self.timings.record(response, "classify")
+            result = json.loads(response['response'])
+            self.routing_cache.set(key, result)
+            return result
         except Exception as e:
-            logger.error(f"Classification failed using {current_model}: {e}")
+            logger.error(f"Classification failed using {request['model']}: {e}")
             return {"intent": "conversational", "tool": None, "args": {}}
 
+    def route(self, user_input: str, tools: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Single light-model call that returns complexity, intent, tool and args together.
+        Returns None if the response is unusable so callers can fall back to
+        assess_complexity + classify_intent.
+        """
+        key = self._cache_key("route", user_input, tools)
+        cached = self.routing_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            request = self._route_request(user_input, tools)
+            with self.scheduler.slot(request["model"], Priority.ROUTING), read_timeout(self.transport.route_timeout):
+                response = self.client.generate(**request)
+            self.timings.record(response, "route")
+            result = self._parse_route(response, user_input)
+            if result is not None:
+                self.routing_cache.set(key, result)
+            return result
+        except Exception as e:
+            logger.warning(f"Combined routing failed: {e}")
+            return None
+
     def chat(self, messages: List[Dict[str, str]], model_override: str = None, context: str = "") -> str:
         """
         Standard chat completion with andy-os identity.
         """
         current_model = model_override or self.model
+        full_messages = self._build_messages(messages, context)
+
+        try:
+            with self.scheduler.slot(current_model, Priority.SYNTHESIS, self._fallback(current_model)) as current_model:
+                response = self.client.chat(
+                    model=current_model,
+                    messages=full_messages,
+                    stream=False,
+                    keep_alive=self.keep_alive
+                )
+            self.timings.record(response, "chat")
+            return response['message']['content']
+        except (SchedulerOverloaded, OllamaUnavailable):
+            raise
+        except Exception as e:
+            logger.error(f"Chat failed using {current_model}: {e}")
+            return f"I encountered an error: {e}"
+
+    def chat_stream(self, messages: List[Dict[str, str]], model_override: str = None, context: str = "") -> Iterator[str]:
+        """
+        Streaming chat completion. Yields content tokens as Ollama produces them,
+        so callers can forward the first token without waiting for the full answer.
+        """
+        current_model = model_override or self.model
+        full_messages = self._build_messages(messages, context)
+
+        try:
+            with self.scheduler.slot(current_model, Priority.SYNTHESIS, self._fallback(current_model)) as current_model:
+                for chunk in self.client.chat(
+                    model=current_model,
+                    messages=full_messages,
+                    stream=True,
+                    keep_alive=self.keep_alive
+                ):
+                    if chunk.get('done'):
+                        self.timings.record(chunk, "chat")
+                    token = chunk['message']['content']
+                    if token:
+                        yield token
+        except (SchedulerOverloaded, OllamaUnavailable):
+            raise
+        except Exception as e:
+            logger.error(f"Streaming chat failed using {current_model}: {e}")
+            yield f"I encountered an error: {e}"
+
+    def summarize(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Fold messages into a rolling conversation summary using the light model.
+        Returns "" on failure so the previous summary is kept.
+        """
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        prompt = f"Existing summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"
         
-        # Prepend system message with andy-os identity
-        system_content = SYSTEM_IDENTITY
-        if context:
-            system_content += f"\n\n## Recent Context:\n{context}"
-        
-        full_messages = [{"role": "system", "content": system_content}] + messages
-        
         try:
-            response = self.client.chat(
-                model=current_model,
-                messages=full_messages,
-                stream=False
-            )
+            with self.scheduler.slot(self.LIGHT_MODEL, Priority.BACKGROUND):
+                response = self.client.generate(
+                    model=self.LIGHT_MODEL,
+                    prompt=prompt,
+                    system=SUMMARY_PROMPT,
+                    stream=False,
+                    keep_alive=self.keep_alive
+                )
+            self.timings.record(response, "summarize")
+            return response['response'].strip()
+        except Exception as e:
+            logger.warning(f"Summarization failed: {e}")
+            return ""
+
+    def embed(self, texts: List[str], model_override: str = None) -> List[List[float]]:
+        """
+        Batch embedding through Ollama's /api/embed endpoint. Errors propagate so
+        callers never index a chunk without its vector.
+        """
+        model = model_override or self.EMBED_MODEL
+        with self.scheduler.slot(model, Priority.BACKGROUND):
+            response = self.client.embed(model=model, input=texts)
+        return response['embeddings']
+
+    # --- Asynchronous API (ollama.AsyncClient), used by the async graph nodes ---
+
+    async def aassess_complexity(self, user_input: str) -> str:
+        """Async version of assess_complexity."""
+        key = self._cache_key("complexity", user_input)
+        cached = self.routing_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            request = self._complexity_request(user_input)
+            async with self.scheduler.aslot(request["model"], Priority.ROUTING):
+                with read_timeout(self.transport.route_timeout):
+                    response = await self.async_client.generate(**request)
+            self.timings.record(response, "complexity")
+            complexity = self._parse_complexity(response, user_input)
+            self.routing_cache.set(key, complexity)
+            return complexity
+        except Exception as e:
+            logger.warning(f"Complexity assessment failed: {e}, defaulting to simple")
+            return "simple"
+
+    async def aclassify_intent(self, user_input: str, tools: List[str], model_override: str = None) -> Dict[str, Any]:
+        """Async version of classify_intent."""
+        request = self._intent_request(user_input, tools, model_override)
+        key = self._cache_key("intent", user_input, tools, request["model"])
+        cached = self.routing_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            async with self.scheduler.aslot(request["model"], Priority.ROUTING):
+                with read_timeout(self.transport.route_timeout):
+                    response = await self.async_client.generate(**request)
+            self.timings.record(response, "classify")
+            result = json.loads(response['response'])
+            self.routing_cache.set(key, result)
+            return result
+        except Exception as e:
+            logger.error(f"Classification failed using {request['model']}: {e}")
+            return {"intent": "conversational", "tool": None, "args": {}}
+
+    async def aroute(self, user_input: str, tools: List[str]) -> Optional[Dict[str, Any]]:
+        """Async version of route."""
+        key = self._cache_key("route", user_input, tools)
+        cached = self.routing_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            request = self._route_request(user_input, tools)
+            async with self.scheduler.aslot(request["model"], Priority.ROUTING):
+                with read_timeout(self.transport.route_timeout):
+                    response = await self.async_client.generate(**request)
+            self.timings.record(response, "route")
+            result = self._parse_route(response, user_input)
+            if result is not None:
+                self.routing_cache.set(key, result)
+            return result
+        except Exception as e:
+            logger.warning(f"Combined routing failed: {e}")
+            return None
+
+    async def achat(self, messages: List[Dict[str, str]], model_override: str = None, context: str = "") -> str:
+        """Async version of chat."""
+        current_model = model_override or self.model
+        full_messages = self._build_messages(messages, context)
+
+        try:
+            async with self.scheduler.aslot(current_model, Priority.SYNTHESIS, self._fallback(current_model)) as current_model:
+                response = await self.async_client.chat(
+                    model=current_model,
+                    messages=full_messages,
+                    stream=False,
+                    keep_alive=self.keep_alive
+                )
+            self.timings.record(response, "chat")
             return response['message']['content']
+        except (SchedulerOverloaded, OllamaUnavailable):
+            raise
         except Exception as e:
             logger.error(f"Chat failed using {current_model}: {e}")
             return f"I encountered an error: {e}"
+
+    async def aprefill(self, messages: List[Dict[str, str]], model: str,
+                       preempt: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """
+        Evaluate the chat prompt without generating (num_predict=1; Ollama treats 0
+        as unlimited) so a following chat with the same messages reuses the KV
+        cache. Only runs if the model has a free slot, at the lowest priority, and
+        gives the slot up as soon as a real request queues for it (the scheduler
+        sets `preempt`). Returns None when skipped, preempted or on error, else the
+        prompt size and evaluation time.
+        """
+        preempt = preempt or threading.Event()
+        if not self.scheduler.try_acquire(model, Priority.BACKGROUND, preempt):
+            return None
+        start = time.monotonic()
+        try:
+            with read_timeout(self.transport.route_timeout):
+                call = asyncio.ensure_future(self.async_client.chat(
+                    model=model,
+                    messages=self._build_messages(messages),
+                    stream=False,
+                    keep_alive=self.keep_alive,
+                    options={"num_predict": 1}
+                ))
+            try:
+                while not call.done():
+                    if preempt.is_set():
+                        call.cancel()
+                        logger.debug(f"Prefill on {model} yielded its slot to a queued request")
+                        return None
+                    await asyncio.wait({call}, timeout=self.scheduler.POLL_INTERVAL)
+            except BaseException:
+                call.cancel()
+                raise
+            response = call.result()
+            self.timings.record(response, "prefill")
+            return {
+                "prompt_tokens": response.get('prompt_eval_count') or 0,
+                "prompt_eval_ms": round((response.get('prompt_eval_duration') or 0) / 1e6, 1)
+            }
+        except Exception as e:
+            logger.debug(f"Prefill on {model} failed: {e}")
+            return None
+        finally:
+            self.scheduler.release(model, time.monotonic() - start, preempt)
+
+    async def achat_stream(self, messages: List[Dict[str, str]], model_override: str = None, context: str = "") -> AsyncIterator[str]:
+        """Async version of chat_stream."""
+        current_model = model_override or self.model
+        full_messages = self._build_messages(messages, context)
+
+        try:
+            async with self.scheduler.aslot(current_model, Priority.SYNTHESIS, self._fallback(current_model)) as current_model:
+                async for chunk in await self.async_client.chat(
+                    model=current_model,
+                    messages=full_messages,
+                    stream=True,
+                    keep_alive=self.keep_alive
+                ):
+                    if chunk.get('done'):
+                        self.timings.record(chunk, "chat")
+                    token = chunk['message']['content']
+                    if token:
+                        yield token
+        except (SchedulerOverloaded, OllamaUnavailable):
+            raise
+        except Exception as e:
+            logger.error(f"Streaming chat failed using {current_model}: {e}")
+            yield f"I encountered an error: {e}"
@@ -8,11 +8,49 @@ import sqlite3
 import os
 import json
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Each entry upgrades the schema by one version (recorded in PRAGMA user_version),
+# so a migration runs exactly once per database. Append new steps; never edit old ones.
+SCHEMA_MIGRATIONS: List[List[str]] = [
+    # v1: base tables
+    [
+        """
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            summary TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id INTEGER,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            metadata TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (conversation_id) REFERENCES conversations(id)
+        )
+        """,
+    ],
+    # v2: history lookups walk indexes instead of scanning and sorting
+    [
+        "CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages (conversation_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_messages_created ON messages (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_conversations_created ON conversations (created_at)",
+    ],
+    # v3: client session ids map onto conversations
+    [
+        "ALTER TABLE conversations ADD COLUMN session_id TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_conversations_session ON conversations (session_id)",
+    ],
+]
+
 class MemoryStore:
     def __init__(self, db_path: str = None):
         if db_path is None:
@@ -22,90 +60,168 @@ class MemoryStore:
             db_path = os.path.join(data_dir, "memory.db")
         
         self.db_path = db_path
+        # One long-lived connection per thread (a sqlite3 connection must not be used
+        # concurrently); WAL lets readers proceed while another thread writes.
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
     
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's pooled connection, opening and tuning it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # fsync at checkpoints, not every commit
+            conn.execute("PRAGMA cache_size=-8000")    # 8 MB page cache
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close every pooled connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
     def _init_db(self):
-        """Initialize database tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    summary TEXT
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS messages (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    conversation_id INTEGER,
-                    role TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    metadata TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (conversation_id) REFERENCES conversations(id)
-                )
-            """)
-            conn.commit()
+        """Initialize database tables and apply any pending schema migrations."""
+        conn = self._conn()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        for target, statements in enumerate(SCHEMA_MIGRATIONS[version:], start=version + 1):
+            with conn:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {target}")
+            logger.info(f"Memory schema migrated to version {target}")
     
     def create_conversation(self) -> int:
         """Create a new conversation and return its ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn() as conn:
             cursor = conn.execute("INSERT INTO conversations DEFAULT VALUES")
-            conn.commit()
             return cursor.lastrowid
     
     def save_message(self, conversation_id: int, role: str, content: str, metadata: Dict = None):
         """Save a message to the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
+        self.save_messages(conversation_id, [{"role": role, "content": content, "metadata": metadata}])
+    
+    def save_messages(self, conversation_id: int, messages: List[Dict[str, Any]]):
+        """
+        Save several messages (dicts with role, content and optional metadata)
+        in a single transaction, e.g. the user and assistant side of one turn.
+        """
+        rows = [
+            (conversation_id, m["role"], m["content"],
+             json.dumps(m["metadata"], default=str) if m.get("metadata") else None)
+            for m in messages
+        ]
+        with self._conn() as conn:
+            conn.executemany(
                 "INSERT INTO messages (conversation_id, role, content, metadata) VALUES (?, ?, ?, ?)",
-                (conversation_id, role, content, json.dumps(metadata) if metadata else None)
+                rows
             )
-            conn.commit()
     
     def get_conversation_messages(self, conversation_id: int, limit: int = 50) -> List[Dict]:
         """Get messages from a specific conversation."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.execute(
                 """SELECT role, content, metadata, created_at 
                    FROM messages 
                    WHERE conversation_id = ? 
-                   ORDER BY created_at DESC 
+                   ORDER BY id DESC 
                    LIMIT ?""",
                 (conversation_id, limit)
             )
             rows = cursor.fetchall()
             return [dict(row) for row in reversed(rows)]
     
+    def get_messages_after(self, message_id: int, limit: int = 500) -> List[Dict]:
+        """Get messages with an id greater than message_id, oldest first (for incremental indexing)."""
+        with self._conn() as conn:
+            cursor = conn.execute(
+                """SELECT id, conversation_id, role, content 
+                   FROM messages 
+                   WHERE id > ? 
+                   ORDER BY id 
+                   LIMIT ?""",
+                (message_id, limit)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+    
     def get_recent_context(self, limit: int = 10) -> List[Dict]:
         """Get the most recent messages across all conversations."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._conn() as conn:
             cursor = conn.execute(
                 """SELECT role, content, created_at 
                    FROM messages 
-                   ORDER BY created_at DESC 
+                   ORDER BY id DESC 
                    LIMIT ?""",
                 (limit,)
             )
             rows = cursor.fetchall()
             return [dict(row) for row in reversed(rows)]
     
+    def get_summary(self, conversation_id: int) -> Optional[str]:
+        """Get the rolling summary of a conversation, if one has been written."""
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT summary FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+            return row[0] if row else None
+    
+    def update_summary(self, conversation_id: int, summary: str):
+        """Replace the rolling summary of a conversation."""
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE conversations SET summary = ? WHERE id = ?", (summary, conversation_id)
+            )
+    
     def get_or_create_conversation(self, session_id: Optional[str] = None) -> int:
-        """Get the most recent conversation or create a new one."""
-        with sqlite3.connect(self.db_path) as conn:
-            # Check if there's a recent conversation (within last hour)
+        """
+        Get the conversation bound to session_id (creating it on first use), or
+        without a session id, the most recent conversation no client session owns
+        (if it started within the hour) or a new one.
+        """
+        if session_id is not None:
+            with self._conn() as conn:
+                conn.execute("INSERT OR IGNORE INTO conversations (session_id) VALUES (?)", (session_id,))
+                row = conn.execute(
+                    "SELECT id FROM conversations WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                return row[0]
+        
+        with self._conn() as conn:
+            # Check if the newest conversation (highest rowid) started within the last hour
             cursor = conn.execute(
                 """SELECT id FROM conversations 
-                   WHERE created_at > datetime('now', '-1 hour')
-                   ORDER BY created_at DESC LIMIT 1"""
+                   WHERE id = (SELECT MAX(id) FROM conversations
+                               WHERE session_id IS NULL OR session_id = 'legacy-' || id)
+                     AND created_at > datetime('now', '-1 hour')"""
             )
             row = cursor.fetchone()
             if row:
                 return row[0]
             return self.create_conversation()
 
+    def bind_session(self, conversation_id: int, session_id: str):
+        """Attach session_id to a conversation that doesn't have one yet."""
+        with self._conn() as conn:
+            conn.execute("UPDATE conversations SET session_id = ? WHERE id = ? AND session_id IS NULL",
+                         (session_id, conversation_id))
+
 
-# Global instance
-memory = MemoryStore()
+def __getattr__(name: str):
+    # `from src.core.memory import memory` still works, but the shared store is
+    # owned by the application context and only opened when first asked for
+    if name == "memory":
+        from ..app import get_app
+        return get_app().memory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
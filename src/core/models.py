@@ -0,0 +1,107 @@
+"""
+andy-os Model Lifecycle
+
+Keeps the light and heavy tiers resident in Ollama so a "complex" request after
+a quiet period doesn't pay a multi-second model load. Models are preloaded at
+startup and re-pinged from a background task well inside their keep_alive
+window. The heavy model is left alone while the system is CRITICAL so warmup
+never adds to memory pressure.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+
+from .llm import OllamaClient
+from .resources import ResourceStatus
+
+logger = logging.getLogger(__name__)
+
+class ModelManager:
+    def __init__(self, client: OllamaClient, monitor=None, models: List[str] = None,
+                 interval: float = 600.0):
+        self.client = client
+        self.monitor = monitor
+        self.models = models or [OllamaClient.LIGHT_MODEL, OllamaClient.HEAVY_MODEL]
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._state: Dict[str, Dict[str, Any]] = {
+            model: {"warm": False, "last_warmed": None, "last_error": None, "skipped": 0}
+            for model in self.models
+        }
+
+    def _under_pressure(self) -> bool:
+        if self.monitor is None:
+            return False
+        return self.monitor.get_metrics().status == ResourceStatus.CRITICAL
+
+    async def preload(self, model: str) -> bool:
+        """Load model into memory (an empty prompt makes Ollama load without generating)."""
+        state = self._state.setdefault(model, {"warm": False, "last_warmed": None, "last_error": None, "skipped": 0})
+        try:
+            response = await self.client.async_client.generate(
+                model=model, prompt="", keep_alive=self.client.keep_alive
+            )
+            self.client.timings.record(response, "preload")
+            state.update(warm=True, last_warmed=time.time(), last_error=None)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to warm {model}: {e}")
+            state.update(warm=False, last_error=str(e))
+            return False
+
+    async def warm_all(self) -> Dict[str, bool]:
+        """Warm every configured model, skipping the heavy tier when resources are CRITICAL."""
+        results = {}
+        critical = await asyncio.to_thread(self._under_pressure)
+        for model in self.models:
+            if critical and model == OllamaClient.HEAVY_MODEL:
+                logger.info(f"Resources critical, skipping warmup of {model}")
+                self._state[model]["skipped"] += 1
+                results[model] = False
+                continue
+            results[model] = await self.preload(model)
+        return results
+
+    async def _ping_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.warm_all()
+            except Exception as e:
+                logger.error(f"Model keep-warm pass failed: {e}")
+
+    async def start(self):
+        """Preload models and start the background keep-warm task."""
+        if self._task is not None:
+            return
+        await self.warm_all()
+        self._task = asyncio.create_task(self._ping_loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def loaded_models(self) -> List[str]:
+        """Models Ollama currently holds in memory (empty if it can't be reached)."""
+        try:
+            response = await asyncio.wait_for(self.client.async_client.ps(), timeout=2.0)
+            return [m.get('model') or m.get('name') for m in response.get('models', [])]
+        except Exception as e:
+            logger.debug(f"Could not list loaded models: {e}")
+            return []
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "keep_alive": self.client.keep_alive,
+            "interval": self.interval,
+            "models": {model: dict(state) for model, state in self._state.items()},
+            "timings": self.client.timings.snapshot()
+        }
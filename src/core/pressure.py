@@ -0,0 +1,180 @@
+"""
+andy-os Power Mode
+
+Turns resource signals into an explicit PERFORMANCE / POWER_SAVE mode with
+hysteresis: power-save is entered when any signal crosses its enter threshold
+and left only once every signal is back under its (lower) exit threshold, and
+the mode never changes more often than min_dwell seconds. This keeps the model
+tier from flapping request to request around a single threshold, which would
+otherwise make Ollama swap llama3 in and out.
+
+Signals: smoothed CPU and memory, swap throughput, temperature and its trend
+(from ResourceMonitor), plus the RAM held by Ollama's loaded models (its /api/ps
+endpoint, refreshed by the background loop).
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from enum import Enum
+from typing import Dict, Any, List, Optional
+
+from .resources import ResourceMonitor
+
+logger = logging.getLogger(__name__)
+
+class PowerMode(Enum):
+    PERFORMANCE = "performance"
+    POWER_SAVE = "power_save"
+
+# A signal only enters power-save above its enter threshold and must drop below
+# its exit threshold before performance mode is restored
+ENTER_THRESHOLDS = {
+    "cpu": 85.0,            # % (EWMA)
+    "memory": 90.0,         # % (EWMA)
+    "swap_mb_s": 20.0,      # swap-in + swap-out throughput
+    "temperature": 85.0,    # °C (EWMA)
+    "temp_rise": 3.0,       # °C per minute, only counted while already warm
+    "ollama_share": 0.6,    # fraction of RAM held by loaded Ollama models
+}
+EXIT_THRESHOLDS = {
+    "cpu": 70.0,
+    "memory": 80.0,
+    "swap_mb_s": 2.0,
+    "temperature": 75.0,
+    "temp_rise": 0.5,
+    "ollama_share": 0.5,
+}
+
+class PressureController:
+    def __init__(self, monitor: ResourceMonitor, enter_thresholds: Dict[str, float] = None,
+                 exit_thresholds: Dict[str, float] = None, min_dwell: float = 30.0, trend_window: int = 30):
+        self.monitor = monitor
+        self.enter = {**ENTER_THRESHOLDS, "cpu": monitor.cpu_threshold, "memory": monitor.mem_threshold,
+                      **(enter_thresholds or {})}
+        self.exit = {**EXIT_THRESHOLDS, **(exit_thresholds or {})}
+        self.min_dwell = min_dwell
+        self.trend_window = trend_window
+        self._mode = PowerMode.PERFORMANCE
+        self._since = float("-inf")   # first transition is never held back
+        self._evaluated_at = float("-inf")
+        self._reasons: List[str] = []
+        self._ollama: Dict[str, int] = {"ram_bytes": 0, "vram_bytes": 0}
+        self.transitions = 0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def observe_ollama(self, models: List[Any]):
+        """Record memory held by Ollama's loaded models (entries from its ps endpoint)."""
+        ram, vram = 0, 0
+        for model in models:
+            size = model.get('size') or 0
+            size_vram = model.get('size_vram') or 0
+            vram += size_vram
+            ram += max(0, size - size_vram)
+        with self._lock:
+            self._ollama = {"ram_bytes": ram, "vram_bytes": vram}
+
+    def signals(self) -> Dict[str, float]:
+        smoothed = self.monitor.smoothed()
+        with self._lock:
+            ollama_ram = self._ollama["ram_bytes"]
+        import psutil
+        try:
+            total = psutil.virtual_memory().total
+        except Exception:
+            total = 0
+        temperature = smoothed.get("temperature", 0.0)
+        rise = self.monitor.trend("temperature", self.trend_window)
+        return {
+            "cpu": smoothed.get("cpu", 0.0),
+            "memory": smoothed.get("memory", 0.0),
+            "swap_mb_s": smoothed.get("swap_mb_s", 0.0),
+            "temperature": temperature,
+            # A rising trend only matters once the box is already warm
+            "temp_rise": rise if temperature > self.exit["temperature"] else 0.0,
+            "ollama_share": round(ollama_ram / total, 3) if total else 0.0,
+        }
+
+    def evaluate(self, now: float = None) -> PowerMode:
+        """Re-read the signals and apply the enter/exit thresholds and dwell time."""
+        now = time.monotonic() if now is None else now
+        signals = self.signals()
+        hot = [name for name, value in signals.items() if value > self.enter[name]]
+        cool = all(value < self.exit[name] for name, value in signals.items())
+
+        with self._lock:
+            self._evaluated_at = now
+            dwelled = now - self._since >= self.min_dwell
+            if self._mode == PowerMode.PERFORMANCE and hot and dwelled:
+                self._switch(PowerMode.POWER_SAVE, now, hot, signals)
+            elif self._mode == PowerMode.POWER_SAVE and cool and dwelled:
+                self._switch(PowerMode.PERFORMANCE, now, [], signals)
+            elif self._mode == PowerMode.POWER_SAVE and hot:
+                self._reasons = hot
+            return self._mode
+
+    def _switch(self, mode: PowerMode, now: float, reasons: List[str], signals: Dict[str, float]):
+        logger.warning(f"Power mode {self._mode.value} -> {mode.value} ({', '.join(reasons) or 'pressure cleared'}): {signals}")
+        self._mode = mode
+        self._since = now
+        self._reasons = reasons
+        self.transitions += 1
+
+    @property
+    def mode(self) -> PowerMode:
+        """Current mode; re-evaluated lazily when the background loop isn't running."""
+        if self._task is None and time.monotonic() - self._evaluated_at >= self.monitor.interval:
+            # Nothing samples in the background here (e.g. the REPL), so take a reading first
+            self.monitor.get_metrics()
+            return self.evaluate()
+        return self._mode
+
+    def should_use_light_model(self) -> bool:
+        return self.mode == PowerMode.POWER_SAVE
+
+    async def refresh_ollama(self, async_client):
+        try:
+            response = await asyncio.wait_for(async_client.ps(), timeout=2.0)
+            self.observe_ollama(response.get('models', []))
+        except Exception as e:
+            logger.debug(f"Could not read Ollama memory usage: {e}")
+
+    async def _loop(self, async_client):
+        while True:
+            if async_client is not None:
+                await self.refresh_ollama(async_client)
+            await asyncio.to_thread(self.evaluate)
+            await asyncio.sleep(self.monitor.interval)
+
+    def start(self, async_client):
+        """
+        Evaluate on a background task alongside the monitor's sampler. `async_client`
+        reaches the Ollama on this machine (None if there is none to count).
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(async_client))
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            mode, since, reasons = self._mode, self._since, list(self._reasons)
+            ollama = dict(self._ollama)
+        return {
+            "mode": mode.value,
+            "reasons": reasons,
+            "in_mode_s": round(time.monotonic() - since, 1) if since != float("-inf") else None,
+            "transitions": self.transitions,
+            "min_dwell_s": self.min_dwell,
+            "ollama_memory": ollama
+        }
@@ -32,8 +32,32 @@ Output ONLY a JSON object with keys:
 - "intent": one of ["tool_use", "conversational"]
 - "tool": tool name string or null
 - "args": object with tool arguments
+- "tools": optional list of {{"tool": ..., "args": ...}} when the request needs several independent tool calls
 
-Example: {{"intent": "tool_use", "tool": "run_command", "args": {{"command": "ls -la"}}}}"""
+Example: {{"intent": "tool_use", "tool": "run_command", "args": {{"command": "ls -la"}}}}
+Example: {{"intent": "tool_use", "tools": [{{"tool": "run_command", "args": {{"command": "df -h"}}}}, {{"tool": "read_file", "args": {{"file_path": "/etc/nginx/nginx.conf"}}}}]}}"""
+
+ROUTER_PROMPT = """You are a routing agent for andy-os. In one step, rate the request's complexity and select the best tool.
+
+Available Tools: {tools}
+
+Complexity:
+- "simple": greetings, basic questions, single-step tasks, status checks, short answers
+- "complex": multi-step reasoning, code generation, detailed analysis, debugging
+
+Output ONLY a JSON object with keys:
+- "complexity": one of ["simple", "complex"]
+- "intent": one of ["tool_use", "conversational"]
+- "tool": tool name string or null
+- "args": object with tool arguments
+- "tools": optional list of {{"tool": ..., "args": ...}} when the request needs several independent tool calls
+
+Example: {{"complexity": "simple", "intent": "tool_use", "tool": "run_command", "args": {{"command": "ls -la"}}}}
+Example: {{"complexity": "simple", "intent": "tool_use", "tools": [{{"tool": "run_command", "args": {{"command": "df -h"}}}}, {{"tool": "run_command", "args": {{"command": "free -m"}}}}]}}"""
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between Andy and andy-os.
+Merge the new messages into the existing summary. Keep facts, decisions, file paths,
+commands and open questions; drop greetings and filler. Write at most 150 words of plain text."""
 
 SYNTHESIZER_PROMPT = SYSTEM_IDENTITY + """
 
@@ -41,3 +65,9 @@ SYNTHESIZER_PROMPT = SYSTEM_IDENTITY + """
 {context}
 
 Respond to the user based on the conversation history and any tool outputs provided."""
+
+FOLLOW_UP_PROMPT = """If the tool output is not enough to answer and one more tool call would settle it, reply with ONLY a JSON object
+{{"tool": "<tool name>", "args": {{...}}}} (or {{"tools": [...]}} for independent calls) using one of: {tools}.
+Otherwise answer the user directly. Do not repeat a call whose output you already have."""
+
+FINAL_STEP_PROMPT = "No more tool calls are possible for this request. Answer with the tool output you have."
@@ -1,9 +1,11 @@
-import psutil
 import logging
 import os
+import time
+import threading
+import numpy as np
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -20,13 +22,58 @@ class ResourceMetrics:
     temperature: float  # Celsius
     status: ResourceStatus
 
+class MetricsRing:
+    """Fixed-size ring buffer of samples, one row per sample: (timestamp, cpu, memory, load1, temperature, swap)."""
+
+    FIELDS = ("timestamp", "cpu", "memory", "load_1m", "temperature", "swap_mb_s")
+
+    def __init__(self, capacity: int = 300):
+        self.capacity = capacity
+        self._data = np.zeros((capacity, len(self.FIELDS)), dtype=np.float64)
+        self._next = 0
+        self.count = 0
+
+    def append(self, row: Tuple[float, ...]):
+        self._data[self._next] = row
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> Optional[np.ndarray]:
+        return self._data[(self._next - 1) % self.capacity] if self.count else None
+
+    def last(self, n: int) -> np.ndarray:
+        """The n most recent samples, oldest first."""
+        n = min(n, self.count)
+        idx = (np.arange(self._next - n, self._next)) % self.capacity
+        return self._data[idx]
+
 class ResourceMonitor:
-    def __init__(self, cpu_threshold_critical: float = 85.0, mem_threshold_critical: float = 90.0):
+    """
+    Samples system metrics at a fixed interval on a background thread into a
+    ring buffer; reads are served from the latest sample. Status is decided on
+    EWMA-smoothed CPU/memory so a single spike doesn't flip the model tier.
+    Without a running sampler, get_metrics() samples lazily at most once per interval.
+    """
+
+    def __init__(self, cpu_threshold_critical: float = 85.0, mem_threshold_critical: float = 90.0,
+                 interval: float = 2.0, history: int = 300, alpha: float = 0.3):
         self.cpu_threshold = cpu_threshold_critical
         self.mem_threshold = mem_threshold_critical
-        
+        self.interval = interval
+        self.alpha = alpha
+        self.ring = MetricsRing(history)
+        self._ewma: Dict[str, float] = {}
+        self._latest: Optional[ResourceMetrics] = None
+        self._sampled_at = 0.0
+        self._swap_io: Optional[Tuple[float, float]] = None  # (monotonic time, swapped bytes in+out)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cpu_window_open = False  # set once cpu_percent() has been called by sample()
+
     def _get_temperature(self) -> float:
         """Get CPU temperature from thermal zone."""
+        import psutil
         try:
             # Try psutil first (cross-platform)
             temps = psutil.sensors_temperatures()
@@ -49,29 +96,107 @@ class ResourceMonitor:
         except Exception:
             return 0.0
         
-    def get_metrics(self) -> ResourceMetrics:
+    def _swap_rate(self) -> float:
+        """Swap-in + swap-out throughput in MB/s since the previous sample."""
+        import psutil
+        try:
+            swap = psutil.swap_memory()
+            now, total = time.monotonic(), float(swap.sin + swap.sout)
+        except Exception:
+            return 0.0
+        previous, self._swap_io = self._swap_io, (now, total)
+        if previous is None or now <= previous[0]:
+            return 0.0
+        return max(0.0, (total - previous[1]) / (now - previous[0]) / 1e6)
+
+    def _classify(self, cpu: float, mem: float) -> ResourceStatus:
+        if cpu > self.cpu_threshold or mem > self.mem_threshold:
+            return ResourceStatus.CRITICAL
+        if cpu > (self.cpu_threshold - 15) or mem > (self.mem_threshold - 10):
+            return ResourceStatus.WARNING
+        return ResourceStatus.HEALTHY
+
+    def sample(self) -> ResourceMetrics:
+        """Take one reading, append it to the ring buffer and update the averages."""
+        import psutil
         try:
-            cpu = psutil.cpu_percent(interval=None) 
+            cpu = psutil.cpu_percent(interval=None)
             mem = psutil.virtual_memory().percent
             load = os.getloadavg()  # (1min, 5min, 15min)
             temp = self._get_temperature()
-            
-            status = ResourceStatus.HEALTHY
-            if cpu > self.cpu_threshold or mem > self.mem_threshold:
-                status = ResourceStatus.CRITICAL
-            elif cpu > (self.cpu_threshold - 15) or mem > (self.mem_threshold - 10):
-                status = ResourceStatus.WARNING
-                
-            return ResourceMetrics(
+            swap = self._swap_rate()
+        except Exception as e:
+            logger.error(f"Failed to get metrics: {e}")
+            return self._latest or ResourceMetrics(0.0, 0.0, (0.0, 0.0, 0.0), 0.0, ResourceStatus.HEALTHY)
+
+        with self._lock:
+            readings = [("cpu", cpu), ("memory", mem), ("load_1m", load[0]), ("temperature", temp), ("swap_mb_s", swap)]
+            if not self._cpu_window_open:
+                # cpu_percent() measures since its previous call, so the first delta spans next to no
+                # time and often reads 100.0; throw it away instead of letting it seed the average
+                self._cpu_window_open = True
+                cpu = 0.0
+                readings = readings[1:]
+            self.ring.append((time.time(), cpu, mem, load[0], temp, swap))
+            for name, value in readings:
+                previous = self._ewma.get(name)
+                self._ewma[name] = value if previous is None else self.alpha * value + (1 - self.alpha) * previous
+            self._latest = ResourceMetrics(
                 cpu_percent=cpu,
                 memory_percent=mem,
                 load_avg=load,
                 temperature=temp,
-                status=status
+                status=self._classify(self._ewma.get("cpu", 0.0), self._ewma["memory"])
             )
-        except Exception as e:
-            logger.error(f"Failed to get metrics: {e}")
-            return ResourceMetrics(0.0, 0.0, (0.0, 0.0, 0.0), 0.0, ResourceStatus.HEALTHY)
+            self._sampled_at = time.monotonic()
+            return self._latest
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        """Start the background sampler (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="andy-os-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def get_metrics(self) -> ResourceMetrics:
+        """Latest sample; O(1) while the background sampler runs."""
+        latest = self._latest
+        if latest is not None and (self._thread is not None or time.monotonic() - self._sampled_at < self.interval):
+            return latest
+        return self.sample()
+
+    def smoothed(self) -> Dict[str, float]:
+        """EWMA of each metric across recent samples."""
+        with self._lock:
+            return {name: round(value, 2) for name, value in self._ewma.items()}
+
+    def history(self, n: int = 60) -> List[Dict[str, float]]:
+        """The n most recent samples, oldest first."""
+        with self._lock:
+            rows = self.ring.last(n)
+        return [{name: round(float(v), 2) for name, v in zip(MetricsRing.FIELDS, row)} for row in rows]
+
+    def trend(self, name: str, window: int = 30) -> float:
+        """Least-squares slope of a metric over the last `window` samples, in units per minute."""
+        column = MetricsRing.FIELDS.index(name)
+        with self._lock:
+            rows = self.ring.last(window)
+        if len(rows) < 3 or rows[-1, 0] <= rows[0, 0]:
+            return 0.0
+        slope = np.polyfit(rows[:, 0] - rows[0, 0], rows[:, column], 1)[0]
+        return float(slope * 60.0)
 
     def should_use_light_model(self) -> bool:
         metrics = self.get_metrics()
@@ -0,0 +1,274 @@
+"""
+andy-os Semantic Retrieval
+
+Embeds knowledge markdown and stored conversation messages into a local vector
+index for paraphrase-tolerant recall.
+
+Layout on disk (default ~/.andy-os/vectors/):
+- vectors.f32: row-major float32 matrix of L2-normalized embeddings, memory-mapped for queries
+- meta.json:   embedding model/dim, one entry per row (source, chunk key, content hash, text)
+               and the last indexed message id
+
+Updates are incremental: unchanged chunks (same key and content hash) keep their
+rows, new/changed chunks are embedded in batches and appended, stale rows are
+tombstoned and compacted away once they make up half the matrix.
+"""
+
+import os
+import glob
+import json
+import hashlib
+import logging
+import threading
+import numpy as np
+from typing import Callable, List, Dict, Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], Sequence[Sequence[float]]]
+
+def chunk_text(text: str, max_chars: int = 800) -> List[str]:
+    """Split text on blank lines, packing paragraphs into chunks of at most max_chars."""
+    chunks, current = [], ""
+    for para in (p.strip() for p in text.split("\n\n")):
+        if not para:
+            continue
+        # Hard-split paragraphs that are longer than a chunk on their own
+        while len(para) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(para[:max_chars])
+            para = para[max_chars:]
+        if current and len(current) + len(para) + 2 > max_chars:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+class VectorIndex:
+    def __init__(self, embed_fn: EmbedFn, model_name: str, index_dir: str = None, batch_size: int = 32):
+        if index_dir is None:
+            index_dir = os.path.join(os.path.expanduser("~"), ".andy-os", "vectors")
+        os.makedirs(index_dir, exist_ok=True)
+
+        self.embed_fn = embed_fn
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.matrix_path = os.path.join(index_dir, "vectors.f32")
+        self.meta_path = os.path.join(index_dir, "meta.json")
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._pending: List[tuple] = []  # (key, source, text, digest) awaiting embedding
+        self._load_meta()
+
+    # --- Persistence ---
+
+    def _load_meta(self):
+        self.dim: Optional[int] = None
+        self.entries: List[Optional[Dict[str, Any]]] = []
+        self.last_message_id = 0
+        self.files: Dict[str, List[float]] = {}
+        try:
+            with open(self.meta_path, 'r', encoding='utf_8') as f:
+                meta = json.load(f)
+            if meta.get("model") == self.model_name and os.path.exists(self.matrix_path):
+                self.dim = meta["dim"]
+                self.entries = meta["entries"]
+                self.last_message_id = meta.get("last_message_id", 0)
+                self.files = meta.get("files", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Vector index metadata unreadable, rebuilding: {e}")
+
+        if not self.entries:
+            self.files = {}
+            if os.path.exists(self.matrix_path):
+                os.remove(self.matrix_path)
+        else:
+            # Drop rows appended by an interrupted refresh that never reached meta.json
+            expected = len(self.entries) * self.dim * 4
+            if os.path.getsize(self.matrix_path) > expected:
+                os.truncate(self.matrix_path, expected)
+        self._keys = {e["key"]: row for row, e in enumerate(self.entries) if e}
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf_8') as f:
+            json.dump({
+                "model": self.model_name,
+                "dim": self.dim,
+                "last_message_id": self.last_message_id,
+                "files": self.files,
+                "entries": self.entries
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _matrix_view(self) -> Optional[np.ndarray]:
+        if self._matrix is None and self.entries:
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode='r',
+                                     shape=(len(self.entries), self.dim))
+        return self._matrix
+
+    def _append_vectors(self, vectors: np.ndarray):
+        with open(self.matrix_path, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        self._matrix = None  # shape changed, re-map lazily
+
+    def _compact(self):
+        live = [row for row, e in enumerate(self.entries) if e]
+        matrix = self._matrix_view()
+        kept = np.array(matrix[live]) if live else np.zeros((0, self.dim or 0), dtype=np.float32)
+        self._matrix = None
+        tmp_path = self.matrix_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(kept.tobytes())
+        os.replace(tmp_path, self.matrix_path)
+        self.entries = [self.entries[row] for row in live]
+        self._keys = {e["key"]: row for row, e in enumerate(self.entries)}
+        logger.info(f"Compacted vector index to {len(self.entries)} rows")
+
+    # --- Indexing ---
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        batches = [
+            np.asarray(self.embed_fn(texts[i:i + self.batch_size]), dtype=np.float32)
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        vectors = np.vstack(batches)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def sync_source(self, source: str, chunks: List[str]):
+        """
+        Make the index hold exactly these chunks for a source (e.g. one file),
+        embedding only chunks whose content changed.
+        """
+        digests = [hashlib.sha1(text.encode('utf_8')).hexdigest() for text in chunks]
+
+        # Chunk keys for a source are contiguous ("<source>#0..n"), so stale rows are
+        # the changed ones plus any trailing keys beyond the new chunk count
+        i = 0
+        while f"{source}#{i}" in self._keys:
+            key = f"{source}#{i}"
+            if i >= len(chunks) or self.entries[self._keys[key]]["hash"] != digests[i]:
+                self.entries[self._keys.pop(key)] = None
+            i += 1
+
+        self._pending.extend(
+            (f"{source}#{i}", source, text, digest)
+            for i, (text, digest) in enumerate(zip(chunks, digests))
+            if f"{source}#{i}" not in self._keys
+        )
+
+    def add_chunks(self, source: str, chunks: List[str]):
+        """Append chunks for an immutable source (e.g. a stored message)."""
+        for i, text in enumerate(chunks):
+            key = f"{source}#{i}"
+            if key not in self._keys:
+                self._pending.append((key, source, text, hashlib.sha1(text.encode('utf_8')).hexdigest()))
+
+    def flush(self):
+        """Embed all pending chunks (in batch_size requests) and append them to the matrix."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        vectors = self._embed([text for _, _, text, _ in pending])
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        self._append_vectors(vectors)
+        for key, source, text, digest in pending:
+            self._keys[key] = len(self.entries)
+            self.entries.append({"key": key, "source": source, "hash": digest, "text": text})
+
+    def remove_source(self, source: str):
+        """Tombstone every row belonging to a source."""
+        self.sync_source(source, [])
+
+    def commit(self):
+        """Embed pending chunks and persist metadata, compacting first if tombstones dominate."""
+        self.flush()
+        tombstones = sum(1 for e in self.entries if e is None)
+        if tombstones and tombstones * 2 >= len(self.entries):
+            self._compact()
+        self._save_meta()
+
+    # --- Query ---
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k chunks by cosine similarity (vectors are pre-normalized, so a dot product)."""
+        if not self._keys:
+            return []
+        q = self._embed([query])[0]
+
+        with self._lock:
+            matrix = self._matrix_view()
+            if matrix is None:
+                return []
+            scores = matrix @ q
+            dead = [row for row, e in enumerate(self.entries) if e is None]
+            if dead:
+                scores[dead] = -np.inf
+
+            k = min(k, len(self._keys))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {"source": self.entries[row]["source"], "text": self.entries[row]["text"],
+                 "score": float(scores[row])}
+                for row in top
+            ]
+
+    # --- Corpus sync ---
+
+    def index_files(self, search_paths: List[str], max_chars: int = 800):
+        """Sync markdown files under search_paths (sources are 'file:<abs path>'), skipping unchanged ones."""
+        present = set()
+        for path in search_paths:
+            for file_path in glob.glob(os.path.join(path, "*.md")):
+                source = f"file:{os.path.abspath(file_path)}"
+                try:
+                    stat = os.stat(file_path)
+                    present.add(source)
+                    if self.files.get(source) == [stat.st_mtime, stat.st_size]:
+                        continue
+                    with open(file_path, 'r', encoding='utf_8', errors='ignore') as f:
+                        text = f.read()
+                except Exception:
+                    continue
+                self.sync_source(source, chunk_text(text, max_chars))
+                self.files[source] = [stat.st_mtime, stat.st_size]
+
+        for source in [s for s in self.files if s not in present]:
+            self.remove_source(source)
+            del self.files[source]
+
+    def index_messages(self, memory, max_chars: int = 800, batch: int = 500):
+        """Embed stored messages newer than the last indexed id (sources are 'message:<id>')."""
+        while True:
+            rows = memory.get_messages_after(self.last_message_id, limit=batch)
+            if not rows:
+                break
+            for row in rows:
+                text = f"{row['role']}: {row['content']}"
+                self.add_chunks(f"message:{row['id']}", chunk_text(text, max_chars))
+                self.last_message_id = row["id"]
+
+    def refresh(self, search_paths: List[str], memory=None):
+        """Incrementally bring the index up to date with files and (optionally) messages."""
+        with self._lock:
+            try:
+                self.index_files(search_paths)
+                if memory is not None:
+                    self.index_messages(memory)
+                self.commit()
+            except Exception:
+                # Discard in-memory progress so the next refresh retries from the saved state
+                self._pending = []
+                self._matrix = None
+                self._load_meta()
+                raise
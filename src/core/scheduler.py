@@ -0,0 +1,269 @@
+"""
+andy-os Ollama Scheduler
+
+Admission control in front of OllamaClient. Each model gets a lane with its own
+concurrency limit; callers that can't run immediately wait in a bounded
+priority queue where light-model routing calls go ahead of synthesis. A request
+whose expected wait exceeds max_wait (or that times out waiting) is downgraded
+to its fallback model when it has one, otherwise shed with SchedulerOverloaded.
+
+Speculative work (the heavy model's prefill) takes a slot only when one is free
+and registers it as preemptible: as soon as a real request queues for that
+model the holder is told to give the slot back, and that request is queued
+rather than downgraded or shed on the holder's account.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from enum import IntEnum
+from typing import Dict, Any, Optional
+
+from .resources import ResourceMonitor, ResourceStatus
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    ROUTING = 0      # complexity / intent classification
+    SYNTHESIS = 1    # user-facing chat completions
+    BACKGROUND = 2   # summaries, embeddings
+
+class SchedulerOverloaded(Exception):
+    """Raised when a request is shed instead of queued."""
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "enqueued", "event", "granted")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+        self.granted = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class _Lane:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.queue = []                # heap of _Waiter
+        self.service_s = 0.0           # EWMA of slot hold time
+        self.preemptible = set()       # threading.Events of slots held by speculative work
+
+def _percentile(ordered, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class ModelScheduler:
+    POLL_INTERVAL = 0.02  # async waiters poll their grant instead of parking a thread
+
+    def __init__(self, limits: Dict[str, int] = None, default_limit: int = 2, max_queue: int = 32,
+                 max_wait: float = 20.0, monitor: ResourceMonitor = None, samples: int = 1000):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.monitor = monitor or ResourceMonitor()
+        self._lanes: Dict[str, _Lane] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._waits = deque(maxlen=samples)
+        self.admitted = 0
+        self.shed = 0
+        self.downgraded = 0
+
+    def _lane(self, model: str) -> _Lane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = self._lanes[model] = _Lane(self.limits.get(model, self.default_limit))
+        return lane
+
+    def _queued(self) -> int:
+        return sum(len(lane.queue) for lane in self._lanes.values())
+
+    def _expected_wait(self, lane: _Lane, priority: int) -> float:
+        ahead = sum(1 for w in lane.queue if w.priority <= priority)
+        return (ahead // lane.limit + 1) * lane.service_s
+
+    def _grant(self, lane: _Lane, waiter: _Waiter):
+        lane.active += 1
+        waiter.granted = True
+        self._waits.append(time.monotonic() - waiter.enqueued)
+        self.admitted += 1
+        waiter.event.set()
+
+    def _dispatch(self, lane: _Lane):
+        while lane.queue and lane.active < lane.limit:
+            self._grant(lane, heapq.heappop(lane.queue))
+
+    def _enqueue(self, model: str, priority: int, allow_pressure_downgrade: bool) -> Optional[_Waiter]:
+        """Admit immediately (granted waiter), queue (pending waiter) or return None to downgrade/shed."""
+        with self._lock:
+            lane = self._lane(model)
+            waiter = _Waiter(priority, next(self._seq))
+            if lane.active < lane.limit and not lane.queue:
+                self._grant(lane, waiter)
+                return waiter
+            if lane.active - len(lane.preemptible) < lane.limit:
+                # Only speculative work is in the way; it yields the slot straight away
+                heapq.heappush(lane.queue, waiter)
+                for preempt in lane.preemptible:
+                    preempt.set()
+                return waiter
+            if self._queued() >= self.max_queue:
+                logger.warning(f"Scheduler queue full ({self.max_queue}), rejecting {model} request")
+                return None
+            if self._expected_wait(lane, priority) > self.max_wait:
+                logger.warning(f"Expected wait for {model} exceeds {self.max_wait}s")
+                return None
+        # Checking the monitor samples psutil; do it outside the lock
+        if allow_pressure_downgrade and self.monitor.get_metrics().status == ResourceStatus.CRITICAL:
+            logger.warning(f"Resources critical and {model} is busy, not queueing")
+            return None
+        with self._lock:
+            lane = self._lane(model)
+            heapq.heappush(lane.queue, waiter)
+            self._dispatch(lane)
+            return waiter
+
+    def _abandon(self, model: str, waiter: _Waiter) -> bool:
+        """Remove a timed-out waiter. Returns True if it was granted in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            lane = self._lane(model)
+            lane.queue.remove(waiter)
+            heapq.heapify(lane.queue)
+            return False
+
+    def release(self, model: str, held_for: Optional[float] = None, preempt: Optional[threading.Event] = None):
+        """Hand a slot back; `held_for` feeds the service-time estimate (None for unused slots)."""
+        with self._lock:
+            lane = self._lane(model)
+            lane.preemptible.discard(preempt)
+            lane.active -= 1
+            if held_for is not None:
+                lane.service_s = held_for if lane.service_s == 0.0 else 0.8 * lane.service_s + 0.2 * held_for
+            self._dispatch(lane)
+
+    def _withdraw(self, model: str, waiter: Optional[_Waiter]):
+        """Undo a waiter whose caller went away: dequeue it, or give back the slot it was granted."""
+        if waiter is not None and self._abandon(model, waiter):
+            self.release(model)
+
+    def _resolve(self, model: str, fallback: Optional[str]) -> str:
+        if fallback and fallback != model:
+            with self._lock:
+                self.downgraded += 1
+            logger.warning(f"Downgrading request from {model} to {fallback}")
+            return fallback
+        with self._lock:
+            self.shed += 1
+        raise SchedulerOverloaded(f"{model} is overloaded, try again shortly")
+
+    def acquire(self, model: str, priority: int = Priority.SYNTHESIS, fallback: str = None) -> str:
+        """Block until a slot is free and return the model it was granted for."""
+        waiter = self._enqueue(model, priority, allow_pressure_downgrade=fallback is not None)
+        if waiter is not None:
+            if waiter.event.wait(self.max_wait) or self._abandon(model, waiter):
+                return model
+        model = self._resolve(model, fallback)
+        return self.acquire(model, priority)
+
+    async def aacquire(self, model: str, priority: int = Priority.SYNTHESIS, fallback: str = None) -> str:
+        """Async version of acquire. A cancelled caller never keeps a queue entry or slot."""
+        enqueue = asyncio.ensure_future(asyncio.to_thread(self._enqueue, model, priority, fallback is not None))
+        waiter = None
+        try:
+            # Shielded so the enqueue thread's result is never lost; a cancel lands here instead
+            waiter = await asyncio.shield(enqueue)
+            if waiter is not None:
+                deadline = time.monotonic() + self.max_wait
+                while not waiter.event.is_set() and time.monotonic() < deadline:
+                    await asyncio.sleep(self.POLL_INTERVAL)
+                if waiter.event.is_set() or self._abandon(model, waiter):
+                    return model
+        except BaseException:
+            def withdraw(future):
+                if not future.cancelled() and future.exception() is None:
+                    self._withdraw(model, future.result())
+            if enqueue.done():
+                withdraw(enqueue)
+            else:
+                enqueue.add_done_callback(withdraw)  # still queueing in its thread
+            raise
+        model = self._resolve(model, fallback)
+        return await self.aacquire(model, priority)
+
+    def try_acquire(self, model: str, priority: int = Priority.BACKGROUND,
+                    preempt: Optional[threading.Event] = None) -> bool:
+        """
+        Take a slot only if one is free right now with nothing queued; never waits.
+        With `preempt` the slot is preemptible: the event is set once another
+        request queues for the model, and the holder should release promptly
+        (passing the same event) unless keep() made it a regular slot.
+        """
+        with self._lock:
+            lane = self._lane(model)
+            if lane.active < lane.limit and not lane.queue:
+                self._grant(lane, _Waiter(priority, next(self._seq)))
+                if preempt is not None:
+                    lane.preemptible.add(preempt)
+                return True
+            return False
+
+    def keep(self, model: str, preempt: threading.Event):
+        """Turn a preemptible slot into a regular one (the speculation turned out to be needed)."""
+        with self._lock:
+            self._lane(model).preemptible.discard(preempt)
+
+    @contextmanager
+    def slot(self, model: str, priority: int = Priority.SYNTHESIS, fallback: str = None):
+        granted = self.acquire(model, priority, fallback)
+        start = time.monotonic()
+        try:
+            yield granted
+        finally:
+            self.release(granted, time.monotonic() - start)
+
+    @asynccontextmanager
+    async def aslot(self, model: str, priority: int = Priority.SYNTHESIS, fallback: str = None):
+        granted = await self.aacquire(model, priority, fallback)
+        start = time.monotonic()
+        try:
+            yield granted
+        finally:
+            self.release(granted, time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "queue_depth": self._queued(),
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "downgraded": self.downgraded,
+                "wait_ms": {
+                    "p50": round(_percentile(waits, 50) * 1000, 1),
+                    "p95": round(_percentile(waits, 95) * 1000, 1),
+                    "p99": round(_percentile(waits, 99) * 1000, 1)
+                },
+                "models": {
+                    model: {
+                        "limit": lane.limit,
+                        "active": lane.active,
+                        "queued": len(lane.queue),
+                        "avg_service_ms": round(lane.service_s * 1000, 1)
+                    }
+                    for model, lane in self._lanes.items()
+                }
+            }
@@ -0,0 +1,101 @@
+"""
+andy-os Chat Sessions
+
+Server-side conversation state so clients only send the new message each turn.
+Hot sessions keep their recent message window in an in-process LRU; cold ones
+are reloaded from MemoryStore. Messages that slide out of the window are handed
+to `on_evict` so they can be folded into the conversation summary.
+"""
+
+import threading
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Session:
+    session_id: str
+    conversation_id: int
+    messages: Deque[Dict[str, str]] = field(default_factory=deque)
+
+# (conversation_id, evicted messages, messages still in the window)
+EvictFn = Callable[[int, List[Dict[str, str]], List[Dict[str, str]]], None]
+
+class SessionStore:
+    def __init__(self, memory, max_sessions: int = 256, window: int = 20, on_evict: Optional[EvictFn] = None):
+        self.memory = memory
+        self.max_sessions = max_sessions
+        self.window = window
+        self.on_evict = on_evict
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str) -> Session:
+        """Return the session, loading its recent window from MemoryStore on a miss."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self.hits += 1
+                return session
+
+        # Load outside the lock; SQLite reads don't need to serialize other sessions
+        conversation_id = self.memory.get_or_create_conversation(session_id)
+        rows = self.memory.get_conversation_messages(conversation_id, limit=self.window)
+        loaded = Session(
+            session_id=session_id,
+            conversation_id=conversation_id,
+            messages=deque(({"role": r["role"], "content": r["content"]} for r in rows), maxlen=self.window)
+        )
+
+        with self._lock:
+            self.misses += 1
+            session = self._sessions.setdefault(session_id, loaded)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                logger.debug(f"Evicted session {evicted} from cache")
+            return session
+
+    def legacy_session_id(self) -> str:
+        """
+        Session for clients that send `history` without a session id: the single
+        rolling conversation kept before sessions existed (the newest one if it
+        started within the hour, else a new one).
+        """
+        conversation_id = self.memory.get_or_create_conversation()
+        session_id = f"legacy-{conversation_id}"
+        # Bound so a cold reload of this session finds the same conversation
+        self.memory.bind_session(conversation_id, session_id)
+        return session_id
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """Recent messages for the session, oldest first."""
+        return list(self.get(session_id).messages)
+
+    def record_turn(self, session_id: str, user_message: str, response: str,
+                    metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Persist one user/assistant exchange and append it to the cached window."""
+        session = self.get(session_id)
+        self.memory.save_messages(session.conversation_id, [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": response, "metadata": metadata}
+        ])
+        with self._lock:
+            overflow = min(len(session.messages), len(session.messages) + 2 - self.window)
+            evicted = [session.messages[i] for i in range(overflow)]
+            session.messages.append({"role": "user", "content": user_message})
+            session.messages.append({"role": "assistant", "content": response})
+            window = list(session.messages)
+        if evicted and self.on_evict is not None:
+            self.on_evict(session.conversation_id, evicted, window)
+        return session.conversation_id
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"cached": len(self._sessions), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,230 @@
+"""
+andy-os Telemetry
+
+Spans around graph nodes, tool invocations and Ollama calls, aggregated into
+Prometheus-style histograms and counters (rendered by /metrics in the text
+exposition format, no client library needed).
+
+A request can additionally collect its own spans: inside `with trace() as t`
+every span recorded by the request, including those in tool-pool threads that
+run under a copied context, is appended to `t`, and `t.breakdown()` summarizes
+where the time went.
+"""
+
+import time
+import inspect
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250)
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, escaped)) + "}"
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # per-bucket counts + [+Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(str(labels.get(n, "")) for n in self.labelnames))
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames + ('le',), key + (le,))} {cumulative:g}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]:g}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative:g}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._gauges: List[Tuple[str, str, Callable[[], float]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]):
+        """Gauge whose value is read from `read` at scrape time."""
+        self._gauges.append((name, help, read))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, help, read in self._gauges:
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value:g}"])
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+SPAN_SECONDS = registry.histogram(
+    "andy_os_span_seconds", "Duration of graph nodes and tool invocations", ("kind", "name"))
+SPAN_ERRORS = registry.counter(
+    "andy_os_span_errors_total", "Graph nodes and tool invocations that raised", ("kind", "name"))
+OLLAMA_SECONDS = registry.histogram(
+    "andy_os_ollama_request_seconds", "Ollama call duration as reported by Ollama (total_duration)", ("model", "call"))
+OLLAMA_LOAD_SECONDS = registry.histogram(
+    "andy_os_ollama_load_seconds", "Time Ollama spent loading the model for a call", ("model",))
+OLLAMA_TOKENS = registry.counter(
+    "andy_os_ollama_tokens_total", "Prompt (in) and generated (out) tokens", ("model", "direction"))
+OLLAMA_TOKENS_PER_SECOND = registry.histogram(
+    "andy_os_ollama_tokens_per_second", "Generation speed per call", ("model",), RATE_BUCKETS)
+
+# --- Per-request traces ---
+
+class Trace:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.spans: List[Dict[str, Any]] = []
+
+    def add(self, span: Dict[str, Any]):
+        self.spans.append(span)  # list.append is atomic; tool threads may add concurrently
+
+    def breakdown(self) -> Dict[str, Any]:
+        by_kind: Dict[str, float] = {}
+        for span in self.spans:
+            by_kind[span["kind"]] = round(by_kind.get(span["kind"], 0.0) + span["ms"], 1)
+        return {
+            "total_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "by_kind": by_kind,
+            "spans": list(self.spans)
+        }
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("andy_os_trace", default=None)
+
+@contextmanager
+def trace():
+    """Collect the spans recorded while this block (and work it spawns) runs."""
+    current = Trace()
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+
+def _finish(kind: str, name: str, started: float, failed: bool):
+    elapsed = time.monotonic() - started
+    SPAN_SECONDS.observe(elapsed, kind=kind, name=name)
+    if failed:
+        SPAN_ERRORS.inc(kind=kind, name=name)
+    current = _current.get()
+    if current is not None:
+        current.add({"kind": kind, "name": name, "ms": round(elapsed * 1000, 1)})
+
+@contextmanager
+def span(kind: str, name: str):
+    started = time.monotonic()
+    failed = False
+    try:
+        yield
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        _finish(kind, name, started, failed)
+
+def traced(name: str, fn: Callable, kind: str = "node") -> Callable:
+    """Wrap a graph node (sync or async) in a span."""
+    if inspect.iscoroutinefunction(fn):
+        @wraps(fn)
+        async def async_node(state):
+            with span(kind, name):
+                return await fn(state)
+        return async_node
+
+    @wraps(fn)
+    def node(state):
+        with span(kind, name):
+            return fn(state)
+    return node
+
+def record_ollama(call: str, response) -> Optional[Dict[str, Any]]:
+    """Record Ollama's own timing/token fields for one call (skips responses without them)."""
+    try:
+        model = response.get('model') or "unknown"
+        total = response.get('total_duration')
+        load = response.get('load_duration') or 0
+        tokens_in = response.get('prompt_eval_count') or 0
+        tokens_out = response.get('eval_count') or 0
+        eval_ns = response.get('eval_duration') or 0
+    except Exception:
+        return None
+    if not isinstance(total, (int, float)) or not all(isinstance(v, (int, float)) for v in (load, tokens_in, tokens_out, eval_ns)):
+        return None
+
+    OLLAMA_SECONDS.observe(total / 1e9, model=model, call=call)
+    OLLAMA_LOAD_SECONDS.observe(load / 1e9, model=model)
+    OLLAMA_TOKENS.inc(tokens_in, model=model, direction="in")
+    OLLAMA_TOKENS.inc(tokens_out, model=model, direction="out")
+    rate = tokens_out / (eval_ns / 1e9) if eval_ns and tokens_out else 0.0
+    if rate:
+        OLLAMA_TOKENS_PER_SECOND.observe(rate, model=model)
+
+    entry = {
+        "kind": "ollama", "name": call, "model": model, "ms": round(total / 1e6, 1),
+        "tokens_in": tokens_in, "tokens_out": tokens_out,
+        "tokens_per_s": round(rate, 1), "load_ms": round(load / 1e6, 1)
+    }
+    current = _current.get()
+    if current is not None:
+        current.add(entry)
+    return entry
@@ -0,0 +1,256 @@
+"""
+andy-os Ollama Transport
+
+The HTTP layer under OllamaClient. The sync and async ollama clients each get
+one pooled httpx transport (bounded pool, kept-alive connections) wrapped in
+a guard that:
+
+- applies explicit connect/read timeouts (the ollama library defaults to
+  none, so a hung socket used to hang the request), with a shorter read
+  timeout for routing calls via `read_timeout()`
+- retries connection failures - refused or timed-out connects and kept-alive
+  connections Ollama dropped before answering - a bounded number of times
+  with jittered exponential backoff; nothing is retried once Ollama has
+  started responding
+- feeds a shared CircuitBreaker: after `failures` consecutive requests that
+  could not reach Ollama (refused, timed-out or reset connections - not read
+  timeouts, which just mean a slow generation) it opens, and every call raises OllamaUnavailable immediately
+  instead of waiting on its own timeout, until a probe after `cooldown`
+  seconds succeeds
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+class OllamaUnavailable(Exception):
+    """Raised without touching the network while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Ollama is unavailable, not retrying for {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+# Failures that mean the request never reached (or never got an answer from) Ollama
+RETRYABLE = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+# What the breaker counts: those plus connections reset mid-request. A read timeout
+# on an established request is a busy Ollama, not a down one
+UNREACHABLE = RETRYABLE + (httpx.ReadError,)
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failures: int = 3, cooldown: float = 15.0, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 unless open)."""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown - self.clock())
+
+    def before_call(self):
+        """Admit a request, or raise OllamaUnavailable. Half-open admits one probe at a time."""
+        with self._lock:
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.cooldown - self.clock()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise OllamaUnavailable(remaining)
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise OllamaUnavailable(1.0)
+                self._probing = True
+
+    def success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Ollama reachable again, closing circuit")
+            self.state = self.CLOSED
+            self._consecutive = 0
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self._consecutive >= self.failures):
+                if self.state == self.CLOSED:
+                    logger.warning(f"Ollama failed {self._consecutive} requests in a row, opening circuit for {self.cooldown:g}s")
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+                self.opened += 1
+
+    def abandon(self):
+        """A request ended without an outcome (e.g. cancelled); let the next one probe."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive,
+            "retry_after": round(self.retry_after(), 1),
+            "opened": self.opened,
+            "rejected": self.rejected
+        }
+
+# Per-call read timeout override, set by the caller around one Ollama call
+_read_timeout: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("andy_os_read_timeout", default=None)
+
+@contextmanager
+def read_timeout(seconds: Optional[float]):
+    """Requests sent inside this block wait at most `seconds` between bytes from Ollama."""
+    token = _read_timeout.set(seconds)
+    try:
+        yield
+    finally:
+        _read_timeout.reset(token)
+
+@dataclass
+class TransportConfig:
+    max_connections: int = 16
+    keepalive_connections: int = 8
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 3.0
+    read_timeout: float = 300.0
+    route_timeout: float = 30.0
+    retries: int = 2
+    backoff: float = 0.25
+    breaker_failures: int = 3
+    breaker_cooldown: float = 15.0
+
+    @classmethod
+    def from_env(cls) -> "TransportConfig":
+        return cls(
+            max_connections=int(os.getenv("ANDY_OS_OLLAMA_MAX_CONNECTIONS", "16")),
+            keepalive_connections=int(os.getenv("ANDY_OS_OLLAMA_KEEPALIVE_CONNECTIONS", "8")),
+            keepalive_expiry=float(os.getenv("ANDY_OS_OLLAMA_KEEPALIVE_EXPIRY", "60")),
+            connect_timeout=float(os.getenv("ANDY_OS_OLLAMA_CONNECT_TIMEOUT", "3")),
+            read_timeout=float(os.getenv("ANDY_OS_OLLAMA_READ_TIMEOUT", "300")),
+            route_timeout=float(os.getenv("ANDY_OS_OLLAMA_ROUTE_TIMEOUT", "30")),
+            retries=int(os.getenv("ANDY_OS_OLLAMA_RETRIES", "2")),
+            backoff=float(os.getenv("ANDY_OS_OLLAMA_RETRY_BACKOFF", "0.25")),
+            breaker_failures=int(os.getenv("ANDY_OS_OLLAMA_BREAKER_FAILURES", "3")),
+            breaker_cooldown=float(os.getenv("ANDY_OS_OLLAMA_BREAKER_COOLDOWN", "15"))
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections,
+                            max_keepalive_connections=self.keepalive_connections,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    def timeout(self) -> httpx.Timeout:
+        # Waiting for a pooled connection is bounded like a read; the scheduler keeps that rare
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (0-based)."""
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def client_options(self, breaker: CircuitBreaker, asynchronous: bool = False) -> Dict[str, Any]:
+        """Keyword arguments for ollama.Client / ollama.AsyncClient (passed through to httpx)."""
+        if asynchronous:
+            transport = GuardedAsyncTransport(httpx.AsyncHTTPTransport(limits=self.limits()), self, breaker)
+        else:
+            transport = GuardedTransport(httpx.HTTPTransport(limits=self.limits()), self, breaker)
+        return {"timeout": self.timeout(), "transport": transport}
+
+def _apply_read_timeout(request: httpx.Request):
+    seconds = _read_timeout.get()
+    if seconds is not None:
+        request.extensions["timeout"] = {**request.extensions.get("timeout", {}), "read": seconds}
+
+class GuardedTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, config: TransportConfig, breaker: CircuitBreaker):
+        self.transport = transport
+        self.config = config
+        self.breaker = breaker
+        self.retried = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_read_timeout(request)
+        self.breaker.before_call()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = self.transport.handle_request(request)
+                    break
+                except RETRYABLE as e:
+                    if attempt >= self.config.retries:
+                        raise
+                    delay = self.config.delay(attempt)
+                    logger.info(f"Ollama connection failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+                    time.sleep(delay)
+                    attempt += 1
+                    self.retried += 1
+        except UNREACHABLE:
+            self.breaker.failure()
+            raise
+        except BaseException:
+            self.breaker.abandon()  # slow generation, our own busy pool, cancellation
+            raise
+        self.breaker.success()
+        return response
+
+    def close(self):
+        self.transport.close()
+
+class GuardedAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, config: TransportConfig, breaker: CircuitBreaker):
+        self.transport = transport
+        self.config = config
+        self.breaker = breaker
+        self.retried = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _apply_read_timeout(request)
+        self.breaker.before_call()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self.transport.handle_async_request(request)
+                    break
+                except RETRYABLE as e:
+                    if attempt >= self.config.retries:
+                        raise
+                    delay = self.config.delay(attempt)
+                    logger.info(f"Ollama connection failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    self.retried += 1
+        except UNREACHABLE:
+            self.breaker.failure()
+            raise
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        self.breaker.success()
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
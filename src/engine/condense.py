@@ -0,0 +1,184 @@
+"""
+Tool-output condensation between tool_node and synthesizer_node.
+
+Tool results are rendered compactly per tool type, and anything over the
+synthesis budget is cut into line-aligned chunks. The first and last chunk are
+always kept (headers, exit status, trailing errors). The remaining budget goes
+to the chunks that share the most terms with the user's request, so the prompt
+the heavy model evaluates grows with relevance rather than verbosity.
+"""
+
+import os
+import math
+import logging
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List
+
+from ..core.context import estimate_tokens
+from ..tools.knowledge import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the tool result in the synthesis prompt
+TOOL_OUTPUT_BUDGET = int(os.getenv("ANDY_OS_TOOL_OUTPUT_TOKENS", "1024"))
+CHUNK_CHARS = 600
+
+# Very common words carry no signal about which chunk the user cares about
+STOPWORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was", "it",
+    "this", "that", "me", "my", "what", "show", "tell", "file", "files", "read", "run", "please",
+    "can", "you", "i", "with", "from", "does", "do", "how", "any", "there"
+}
+
+@dataclass
+class Condensed:
+    text: str
+    original_tokens: int
+    kept_tokens: int
+    chunks_total: int
+    chunks_kept: int
+
+    @property
+    def dropped_tokens(self) -> int:
+        return max(0, self.original_tokens - self.kept_tokens)
+
+    def stats(self) -> Dict[str, int]:
+        return {**{k: v for k, v in asdict(self).items() if k != "text"}, "dropped_tokens": self.dropped_tokens}
+
+# --- Per-tool formatting ---
+
+def _format_command(output: Dict[str, Any]) -> str:
+    lines = []
+    status = []
+    if "returncode" in output:
+        status.append(f"exit {output['returncode']}")
+    if output.get("timed_out"):
+        status.append("timed out")
+    if output.get("cancelled"):
+        status.append("cancelled")
+    if output.get("truncated"):
+        status.append(f"{output.get('omitted_bytes', 0)} bytes omitted by the shell")
+    if status:
+        lines.append(f"[{', '.join(status)}]")
+    lines.append(str(output.get("output", "")))
+    return "\n".join(lines)
+
+def _format_listing(output: str) -> str:
+    """Collapse "[DIR] x" / "[FILE] y" lines into two comma-separated lists."""
+    dirs, files, other = [], [], []
+    for line in output.splitlines():
+        if line.startswith("[DIR] "):
+            dirs.append(line[6:] + "/")
+        elif line.startswith("[FILE] "):
+            files.append(line[7:])
+        else:
+            other.append(line)
+    if not dirs and not files:
+        return output
+    parts = []
+    if dirs:
+        parts.append(f"Directories ({len(dirs)}): {', '.join(dirs)}")
+    if files:
+        parts.append(f"Files ({len(files)}): {', '.join(files)}")
+    return "\n".join(parts + other)
+
+def _format_generic(output: Any) -> str:
+    if isinstance(output, dict):
+        if not output.get("success", True) and output.get("error"):
+            return f"Error: {output['error']}"
+        if "output" in output:
+            return str(output["output"])
+        return "\n".join(f"{k}: {v}" for k, v in output.items() if v not in (None, "", [], {}))
+    if isinstance(output, (list, tuple)):
+        return "\n".join(str(item) for item in output)
+    return str(output)
+
+def format_tool_output(tool_name: str, output: Any) -> str:
+    """Render a tool result as plain text without dict reprs or empty metadata."""
+    if tool_name == "run_command" and isinstance(output, dict) and "tier" in output:
+        return _format_command(output)
+    if tool_name == "list_dir" and isinstance(output, str):
+        return _format_listing(output)
+    return _format_generic(output)
+
+# --- Chunking and relevance ---
+
+def chunk_lines(text: str, max_chars: int = CHUNK_CHARS) -> List[str]:
+    """Split on line boundaries into chunks of at most ~max_chars (long lines are split)."""
+    chunks, current, size = [], [], 0
+    for line in text.splitlines():
+        while len(line) > max_chars:
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if size + len(line) + 1 > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def _terms(text: str) -> List[str]:
+    return [m.group() for m in tokenize(text) if m.group() not in STOPWORDS and len(m.group()) > 1]
+
+def score_chunks(chunks: List[str], query: str) -> List[float]:
+    """TF-IDF overlap between each chunk and the query terms (IDF computed over the chunks)."""
+    query_terms = set(_terms(query))
+    if not query_terms:
+        return [0.0] * len(chunks)
+    counts = [Counter(_terms(chunk)) for chunk in chunks]
+    df = Counter(term for c in counts for term in query_terms if term in c)
+    scores = []
+    for c in counts:
+        length = sum(c.values()) or 1
+        score = sum((1 + math.log(c[t])) * math.log(1 + len(chunks) / df[t]) for t in query_terms if c[t])
+        scores.append(score / math.sqrt(length))
+    return scores
+
+def condense(tool_name: str, output: Any, query: str, budget: int = None) -> Condensed:
+    """Format a tool result and trim it to `budget` tokens, keeping query-relevant chunks."""
+    budget = TOOL_OUTPUT_BUDGET if budget is None else budget
+    text = format_tool_output(tool_name, output)
+    original = estimate_tokens(text)
+    if original <= budget:
+        return Condensed(text, original, original, 1, 1)
+
+    # Size chunks so the kept head and tail take at most a quarter of the budget
+    chunks = chunk_lines(text, max_chars=min(CHUNK_CHARS, budget * 4 // 8))
+    costs = [estimate_tokens(chunk) for chunk in chunks]
+    keep = {0, len(chunks) - 1}
+    used = sum(costs[i] for i in keep)
+
+    scores = score_chunks(chunks, query)
+    for i in sorted(range(len(chunks)), key=lambda i: (-scores[i], i)):
+        if i in keep or scores[i] <= 0:
+            continue
+        if used + costs[i] > budget:
+            continue
+        keep.add(i)
+        used += costs[i]
+
+    # Nothing matched the query: spend what's left on the head of the output
+    if not any(scores[i] > 0 for i in keep):
+        for i in range(1, len(chunks) - 1):
+            if used + costs[i] > budget:
+                break
+            keep.add(i)
+            used += costs[i]
+
+    parts, skipped = [], 0
+    for i, chunk in enumerate(chunks):
+        if i in keep:
+            if skipped:
+                parts.append(f"[... {skipped} chunk{'s' if skipped > 1 else ''} omitted ...]")
+                skipped = 0
+            parts.append(chunk)
+        else:
+            skipped += 1
+    condensed = "\n".join(parts)
+    return Condensed(condensed, original, estimate_tokens(condensed), len(chunks), len(keep))
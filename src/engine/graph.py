@@ -1,19 +1,45 @@
 from langgraph.graph import StateGraph, START, END
 from .state import AgentState
-from .nodes import classifier_node, tool_node, synthesizer_node
+from ..core.telemetry import traced
+from .nodes import (
+    classifier_node, tool_node, condenser_node, synthesizer_node,
+    aclassifier_node, atool_node, asynthesizer_node, MAX_STEPS
+)
 
 def route_step(state: AgentState):
     if state.get("intent") == "tool_use" and state.get("selected_tool"):
         return "tool_node"
     return "synthesizer_node"
 
-def create_agent_graph():
+def next_step(state: AgentState):
+    # The synthesizer asked for another tool call instead of answering
+    if state.get("follow_up"):
+        return "tool_node"
+    return END
+
+def create_agent_graph(use_async: bool = False, max_steps: int = None):
+    """
+    Build the classifier -> tool -> condenser -> synthesizer graph.
+    With use_async=True the nodes are coroutines and the graph must be run
+    with ainvoke/astream (used by the API server).
+    With max_steps > 1 (default ANDY_OS_MAX_STEPS) the synthesizer may loop
+    back to the tool node for follow-up calls, up to max_steps tool steps.
+    """
+    max_steps = MAX_STEPS if max_steps is None else max_steps
     workflow = StateGraph(AgentState)
     
     # Add Nodes
-    workflow.add_node("classifier_node", classifier_node)
-    workflow.add_node("tool_node", tool_node)
-    workflow.add_node("synthesizer_node", synthesizer_node)
+    if use_async:
+        workflow.add_node("classifier_node", traced("classifier", aclassifier_node))
+        workflow.add_node("tool_node", traced("tool", atool_node))
+        workflow.add_node("synthesizer_node", traced("synthesizer", asynthesizer_node))
+    else:
+        workflow.add_node("classifier_node", traced("classifier", classifier_node))
+        workflow.add_node("tool_node", traced("tool", tool_node))
+        workflow.add_node("synthesizer_node", traced("synthesizer", synthesizer_node))
+    
+    # Pure CPU and cheap, shared by both graphs
+    workflow.add_node("condenser_node", traced("condenser", condenser_node))
     
     # Add Edges
     workflow.add_edge(START, "classifier_node")
@@ -27,7 +53,12 @@ def create_agent_graph():
         }
     )
     
-    workflow.add_edge("tool_node", "synthesizer_node")
-    workflow.add_edge("synthesizer_node", END)
+    workflow.add_edge("tool_node", "condenser_node")
+    workflow.add_edge("condenser_node", "synthesizer_node")
+    workflow.add_conditional_edges("synthesizer_node", next_step, {"tool_node": "tool_node", END: END})
     
-    return workflow.compile()
+    # Each step is three node runs; leave headroom over LangGraph's default limit
+    return workflow.compile().with_config(
+        configurable={"max_steps": max_steps},
+        recursion_limit=max(25, 3 * max_steps + 5)
+    )
@@ -1,30 +1,142 @@
 
-from typing import Dict, Any
+import os
+import json
+import time
+import asyncio
+import contextvars
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Optional, Tuple
 from .state import AgentState
-from ..core.llm import OllamaClient
-from ..tools.registry import ToolRegistry
+from ..app import shared
+from ..core.llm import OllamaClient, ResponseCache
+from ..core.context import ContextManager
+from ..core.pressure import PowerMode
+from ..core.prompts import FOLLOW_UP_PROMPT, FINAL_STEP_PROMPT
+from ..core import telemetry
+from .prerouter import PreRouter
+from .condense import condense, TOOL_OUTPUT_BUDGET
+from .speculation import SpeculativePrefill
+from langgraph.config import get_stream_writer, get_config
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Singletons for this example, or strictly instantiated in main
-client = OllamaClient()
-registry = ToolRegistry()
+# Process-wide objects owned by the application context (src.app), built on first use
+client = shared("client")
+registry = shared("registry")
+# Sampled resource metrics and the power mode derived from them (with hysteresis)
+monitor = shared("monitor")
+pressure = shared("pressure")
 
-def classifier_node(state: AgentState) -> AgentState:
-    logger.info("Running Classifier")
-    user_input = state["user_input"]
-    tool_names = registry.get_tool_names()
+# Resolve client at call time so tests patching `client` also cover summaries
+context_manager = ContextManager(lambda summary, messages: client.summarize(summary, messages))
+# Opt-in (ANDY_OS_RESPONSE_CACHE=1) cache for conversational answers
+response_cache = ResponseCache()
+
+# Opt-in (ANDY_OS_SPECULATIVE=1): prefill the heavy model with the conversational
+# synthesis prompt while the async classifier runs
+speculator = SpeculativePrefill(
+    lambda messages, model, preempt: client.aprefill(messages, model, preempt),
+    model=OllamaClient.HEAVY_MODEL,
+    keep=lambda model, preempt: client.scheduler.keep(model, preempt),
+    monitor=monitor,
+    enabled=os.getenv("ANDY_OS_SPECULATIVE", "0") == "1"
+)
+
+# How classifier_node talks to the light model:
+#   "combined"   - one call returning complexity + intent (falls back to "sequential")
+#   "parallel"   - assess_complexity and classify_intent issued concurrently
+#   "sequential" - the original two back-to-back calls
+ROUTING_MODE = os.getenv("ANDY_OS_ROUTING_MODE", "combined").lower()
+
+# Lexical fast path that skips the LLM classifier for obvious intents (ANDY_OS_PREROUTER=0 disables).
+# Built from the registry's tool names on first use; None when disabled.
+_UNBUILT = object()
+prerouter: Optional[PreRouter] = _UNBUILT if os.getenv("ANDY_OS_PREROUTER", "1") == "1" else None
+
+# Bounded pool for blocking tools (shell, filesystem, knowledge search) on the async path
+TOOL_WORKERS = int(os.getenv("ANDY_OS_TOOL_WORKERS", "4"))
+tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="andy-os-tool")
+
+# Independent tool calls in one turn: how many are accepted, how many run at
+# once, and how long the turn waits for all of them
+MAX_TOOL_CALLS = int(os.getenv("ANDY_OS_MAX_TOOL_CALLS", "4"))
+TOOL_CONCURRENCY = int(os.getenv("ANDY_OS_TOOL_CONCURRENCY", "3"))
+TOOL_TIMEOUT = float(os.getenv("ANDY_OS_TOOL_TIMEOUT", "90"))
+
+# Iterative mode: the synthesizer may request up to MAX_STEPS tool steps per
+# request (1 keeps the single-shot graph) within LOOP_BUDGET seconds
+MAX_STEPS = int(os.getenv("ANDY_OS_MAX_STEPS", "1"))
+LOOP_BUDGET = float(os.getenv("ANDY_OS_LOOP_BUDGET", "120"))
+
+def _fast_route(user_input: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Pre-router decision as (complexity, classification), or None for ambiguous input."""
+    global prerouter
+    if prerouter is _UNBUILT:
+        prerouter = PreRouter(registry.get_tool_names(),
+                              threshold=float(os.getenv("ANDY_OS_PREROUTER_THRESHOLD", "0.5")))
+    if prerouter is None:
+        return None
+    decision = prerouter.route(user_input)
+    if decision is None:
+        return None
+    return "simple", {"intent": decision.intent, "tool": decision.tool, "args": decision.args}
+
+def _route_request(user_input: str, tool_names: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """Return (complexity, classification) according to ROUTING_MODE."""
+    fast = _fast_route(user_input)
+    if fast is not None:
+        return fast
+    
+    if ROUTING_MODE == "combined":
+        result = client.route(user_input, tool_names)
+        if result is not None:
+            return result["complexity"], result
+        logger.info("Combined routing unavailable, falling back to two-call path")
+    
+    if ROUTING_MODE == "parallel":
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            complexity = pool.submit(client.assess_complexity, user_input)
+            result = pool.submit(client.classify_intent, user_input, tool_names,
+                                 model_override=client.LIGHT_MODEL)
+            return complexity.result(), result.result()
     
-    # Step 1: Assess complexity using lightweight model
     complexity = client.assess_complexity(user_input)
+    # Intent classification always uses the light model for speed
+    result = client.classify_intent(user_input, tool_names, model_override=client.LIGHT_MODEL)
+    return complexity, result
+
+async def _allm_route(user_input: str, tool_names: List[str]) -> Tuple[str, Dict[str, Any]]:
+    """Async light-model routing (the LLM part of _route_request)."""
+    if ROUTING_MODE == "combined":
+        result = await client.aroute(user_input, tool_names)
+        if result is not None:
+            return result["complexity"], result
+        logger.info("Combined routing unavailable, falling back to two-call path")
+    
+    if ROUTING_MODE == "parallel":
+        complexity, result = await asyncio.gather(
+            client.aassess_complexity(user_input),
+            client.aclassify_intent(user_input, tool_names, model_override=client.LIGHT_MODEL)
+        )
+        return complexity, result
+    
+    complexity = await client.aassess_complexity(user_input)
+    result = await client.aclassify_intent(user_input, tool_names, model_override=client.LIGHT_MODEL)
+    return complexity, result
+
+def _apply_routing(state: AgentState, complexity: str, result: Dict[str, Any]) -> AgentState:
     state["complexity"] = complexity
     
-    # Step 2: Choose model based on complexity
-    # BUT respect pre-set model_override from server (resource constraint)
+    # Choose model based on complexity
+    # BUT respect a pre-set model_override and the power mode the request arrived in
     existing_override = state.get("model_override")
     if existing_override:
-        logger.info(f"Resource constraint: keeping forced model {existing_override}")
+        logger.info(f"Keeping forced model {existing_override}")
+    elif state.get("power_mode") == PowerMode.POWER_SAVE.value:
+        state["model_override"] = client.LIGHT_MODEL
+        logger.info(f"Power save mode, using {client.LIGHT_MODEL} regardless of complexity")
     elif complexity == "complex":
         state["model_override"] = client.HEAVY_MODEL
         logger.info(f"Complex request detected, will use {client.HEAVY_MODEL} for synthesis")
@@ -32,53 +144,402 @@ def classifier_node(state: AgentState) -> AgentState:
         state["model_override"] = client.LIGHT_MODEL
         logger.info(f"Simple request, using {client.LIGHT_MODEL}")
     
-    # Step 3: Classify intent (always with light model for speed)
-    result = client.classify_intent(user_input, tool_names, model_override=client.LIGHT_MODEL)
-    
+    calls = _tool_calls(result)
     state["intent"] = result.get("intent", "conversational")
-    state["selected_tool"] = result.get("tool")
-    state["tool_args"] = result.get("args", {})
+    state["tool_calls"] = calls
+    state["selected_tool"] = calls[0]["tool"] if calls else None
+    state["tool_args"] = calls[0]["args"] if calls else {}
     
     return state
 
-def tool_node(state: AgentState) -> AgentState:
-    logger.info(f"Running Tool: {state['selected_tool']}")
-    tool_name = state["selected_tool"]
-    args = state["tool_args"]
-    
+def _tool_calls(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Normalize a classification ("tools" list or single "tool"/"args") into [{"tool", "args"}]."""
+    raw = result.get("tools")
+    if not isinstance(raw, list) or not raw:
+        raw = [{"tool": result.get("tool"), "args": result.get("args")}]
+    calls = [
+        {"tool": call["tool"], "args": call.get("args") if isinstance(call.get("args"), dict) else {}}
+        for call in raw if isinstance(call, dict) and call.get("tool")
+    ]
+    if len(calls) > MAX_TOOL_CALLS:
+        logger.warning(f"Classifier asked for {len(calls)} tool calls, running the first {MAX_TOOL_CALLS}")
+    return calls[:MAX_TOOL_CALLS]
+
+def _run_tool(tool_name: str, args: Dict[str, Any], **runtime) -> Any:
     tool_func = registry.get_tool(tool_name)
-    if tool_func:
+    if not tool_func:
+        return {"success": False, "error": "Tool not found"}
+    with telemetry.span("tool", tool_name):
         try:
-            output = tool_func(**args)
-            state["tool_output"] = output
+            return tool_func(**args, **runtime)
         except Exception as e:
-            state["tool_output"] = {"success": False, "error": str(e)}
+            return {"success": False, "error": str(e)}
+
+def _tool_runtime(state: AgentState, tool_name: str) -> Dict[str, Any]:
+    """
+    Partial-output callback and cancel event for tools that support them. The
+    cancel event comes from the run config (configurable.cancel_event) so a
+    disconnected client can stop a long-running command.
+    """
+    if tool_name not in registry.streaming_tools:
+        return {}
+    runtime = {}
+    if state.get("stream"):
+        writer = get_stream_writer()
+        runtime["on_output"] = lambda stream, text: writer({"type": "tool_output", "stream": stream, "content": text})
+    cancel = get_config().get("configurable", {}).get("cancel_event")
+    if cancel is not None:
+        runtime["cancel"] = cancel
+    return runtime
+
+def _pending_calls(state: AgentState) -> List[Dict[str, Any]]:
+    return state.get("tool_calls") or [{"tool": state["selected_tool"], "args": state.get("tool_args") or {}}]
+
+def _timed_out() -> Dict[str, Any]:
+    return {"success": False, "error": f"Tool did not finish within {TOOL_TIMEOUT:.0f}s"}
+
+def _call_task(state: AgentState, call: Dict[str, Any]):
+    """Callable running one tool call under the current (node) context."""
+    return partial(contextvars.copy_context().run,
+                   partial(_run_tool, call["tool"], call["args"], **_tool_runtime(state, call["tool"])))
+
+def _run_tool_calls(state: AgentState, calls: List[Dict[str, Any]]) -> List[Any]:
+    """Run calls (a single one too) on the tool pool, at most TOOL_CONCURRENCY at a time, within TOOL_TIMEOUT."""
+    deadline = time.monotonic() + TOOL_TIMEOUT
+    outputs: List[Any] = [None] * len(calls)
+    queue = list(enumerate(calls))
+    running = {}
+    while queue or running:
+        while queue and len(running) < TOOL_CONCURRENCY:
+            index, call = queue.pop(0)
+            running[tool_executor.submit(_call_task(state, call))] = index
+        done, _ = wait(running, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            outputs[running.pop(future)] = future.result()
+
+    for future, index in running.items():
+        future.cancel()
+        outputs[index] = _timed_out()
+    for index, _ in queue:
+        outputs[index] = _timed_out()
+    return outputs
+
+async def _arun_tool_calls(state: AgentState, calls: List[Dict[str, Any]]) -> List[Any]:
+    """Async version of _run_tool_calls (always off the event loop)."""
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(TOOL_CONCURRENCY)
+
+    async def run(call):
+        async with limit:
+            return await loop.run_in_executor(tool_executor, _call_task(state, call))
+
+    tasks = [asyncio.ensure_future(run(call)) for call in calls]
+    done, pending = await asyncio.wait(tasks, timeout=TOOL_TIMEOUT)
+    for task in pending:
+        task.cancel()
+    return [task.result() if task in done else _timed_out() for task in tasks]
+
+def _cache_key(call: Dict[str, Any]) -> str:
+    return json.dumps([call["tool"], call["args"]], sort_keys=True, default=str)
+
+def _uncached_calls(state: AgentState, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Calls whose result isn't in this run's tool cache yet (duplicates within the step run once)."""
+    cache = state.get("tool_cache") or {}
+    fresh = {}
+    for call in calls:
+        fresh.setdefault(_cache_key(call), call)
+    return [call for key, call in fresh.items() if key not in cache]
+
+def _finish_tool_step(state: AgentState, calls: List[Dict[str, Any]], fresh: List[Dict[str, Any]],
+                      outputs: List[Any], started: float) -> AgentState:
+    """Cache the new results, record the step's latency and store results for the condenser."""
+    cache = state["tool_cache"] = dict(state.get("tool_cache") or {})
+    results = dict(cache)
+    for call, output in zip(fresh, outputs):
+        results[_cache_key(call)] = output
+        # Infrastructure failures (timeouts, exceptions) are worth retrying; real results are not
+        if not (isinstance(output, dict) and "error" in output):
+            cache[_cache_key(call)] = output
+
+    steps = state["steps"] = list(state.get("steps") or [])
+    steps.append({
+        "step": len(steps) + 1,
+        "tools": [c["tool"] for c in calls],
+        "cached": len(calls) - len(fresh),
+        "tool_ms": round((time.monotonic() - started) * 1000, 1)
+    })
+    if not state.get("loop_started"):
+        state["loop_started"] = started
+    return _store_results(state, calls, [results[_cache_key(c)] for c in calls])
+
+def _step_budget() -> int:
+    """Step budget bound to the graph (create_agent_graph(max_steps=...)), else MAX_STEPS."""
+    try:
+        return get_config().get("configurable", {}).get("max_steps", MAX_STEPS)
+    except RuntimeError:
+        return MAX_STEPS
+
+def _can_follow_up(state: AgentState) -> bool:
+    """Whether the synthesizer may still ask for another tool step."""
+    if len(state.get("steps") or []) >= _step_budget():
+        return False
+    started = state.get("loop_started")
+    return started is None or time.monotonic() - started < LOOP_BUDGET
+
+def _parse_follow_up(text: str) -> Optional[List[Dict[str, Any]]]:
+    """Tool calls requested by a synthesis reply, or None if the reply is an answer."""
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.strip("`").strip()
+        if body.startswith("json"):
+            body = body[4:].strip()
+    if not body.startswith("{"):
+        return None
+    try:
+        request = json.loads(body)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(request, dict):
+        return None
+    calls = [c for c in _tool_calls(request) if registry.get_tool(c["tool"])]
+    return calls or None
+
+def _record_synthesis(state: AgentState, started: float, response: str, allow_follow_up: bool) -> AgentState:
+    """Either queue the requested tool step (follow_up) or accept response as the answer."""
+    steps = state["steps"] = list(state.get("steps") or [])
+    if not steps or "synthesis_ms" in steps[-1]:
+        steps.append({"step": len(steps) + 1, "tools": [], "cached": 0, "tool_ms": 0.0})
+    steps[-1] = {**steps[-1], "synthesis_ms": round((time.monotonic() - started) * 1000, 1)}
+
+    calls = _parse_follow_up(response) if allow_follow_up else None
+    state["follow_up"] = calls is not None
+    if calls is None:
+        _remember_response(state, response)
+        state["final_response"] = response
+        return state
+
+    logger.info(f"Follow-up step {len(steps) + 1}: {[c['tool'] for c in calls]}")
+    state["scratchpad"] = list(state.get("scratchpad") or []) + [
+        {"role": "user", "content": f"Tool Output: {state.get('tool_context')}"},
+        {"role": "assistant", "content": response.strip()}
+    ]
+    state["tool_calls"] = calls
+    state["selected_tool"] = calls[0]["tool"]
+    state["tool_args"] = calls[0]["args"]
+    return state
+
+class _TokenGate:
+    """
+    Streams synthesis tokens, except that a reply opening like a JSON tool call
+    is held back until the whole reply can be parsed.
+    """
+
+    def __init__(self, writer, hold_calls: bool):
+        self.writer = writer
+        self.parts: List[str] = []
+        self.open = not hold_calls
+
+    def feed(self, token: str):
+        self.parts.append(token)
+        if self.open:
+            self.writer({"type": "token", "content": token})
+            return
+        head = "".join(self.parts).lstrip()
+        if head and head[0] not in "{`":
+            self.open = True
+            self.writer({"type": "token", "content": "".join(self.parts)})
+
+    def finish(self, follow_up: bool):
+        if not self.open and not follow_up:
+            self.writer({"type": "token", "content": "".join(self.parts)})
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+def _succeeded(output: Any) -> bool:
+    if isinstance(output, dict):
+        return bool(output.get("success", True))
+    return not str(output).startswith("Error")
+
+def _store_results(state: AgentState, calls: List[Dict[str, Any]], outputs: List[Any]) -> AgentState:
+    state["tool_results"] = [{"tool": c["tool"], "args": c["args"], "output": o} for c, o in zip(calls, outputs)]
+    if len(outputs) == 1:
+        state["tool_output"] = outputs[0]
     else:
-        state["tool_output"] = {"success": False, "error": "Tool not found"}
-        
+        state["tool_output"] = {"success": all(_succeeded(o) for o in outputs), "results": state["tool_results"]}
     return state
 
-def synthesizer_node(state: AgentState) -> AgentState:
-    logger.info("Synthesizing Response")
-    model_override = state.get("model_override")
-    
-    # Construct context from state
-    messages = list(state.get("messages", []))
+def _describe_args(args: Dict[str, Any]) -> str:
+    text = ", ".join(f"{k}={v}" for k, v in args.items())
+    return text if len(text) <= 80 else text[:77] + "..."
+
+def _tool_context(state: AgentState) -> Tuple[str, Dict[str, int]]:
+    """Condensed text of every tool result (budget split evenly) plus summed token accounting."""
+    results = state.get("tool_results") or [
+        {"tool": state["selected_tool"], "args": state.get("tool_args") or {}, "output": state.get("tool_output")}
+    ]
+    budget = TOOL_OUTPUT_BUDGET // len(results)
+    sections, totals = [], {}
+    for r in results:
+        condensed = condense(r["tool"], r["output"], state["user_input"], budget=budget)
+        label = f"'{r['tool']}' ({_describe_args(r['args'])})" if len(results) > 1 else f"'{r['tool']}'"
+        sections.append(f"Result of tool {label}:\n{condensed.text}\n")
+        for key, value in condensed.stats().items():
+            totals[key] = totals.get(key, 0) + value
+    return "\n".join(sections), totals
+
+def _synthesis_messages(state: AgentState, allow_follow_up: bool = False) -> List[Dict[str, str]]:
+    # Construct context from state, trimmed to the synthesis model's token budget
+    conversation_id = state.get("conversation_id")
+    messages, dropped = context_manager.fit(
+        state.get("messages", []), state.get("model_override"), conversation_id
+    )
+    if dropped and conversation_id is not None:
+        context_manager.schedule_summary(conversation_id, dropped)
     
     # If we just ran a tool, add that context
     if state.get("selected_tool"):
-        tool_ctx = (
-            f"Result of tool '{state['selected_tool']}':\n"
-            f"{state['tool_output']}\n"
-        )
+        tool_ctx = state.get("tool_context")
+        if tool_ctx is None:
+            tool_ctx, _ = _tool_context(state)
         # Add as system/context message temporarily or just append to history?
         # For simplicity, we assume 'messages' holds the history.
         # We'll create a new prompt for synthesis.
         system_msg = "You are Agent-OS. Answer the user based on the tool output provided."
+        if allow_follow_up:
+            system_msg += "\n" + FOLLOW_UP_PROMPT.format(tools=", ".join(registry.get_tool_names()))
+        elif len(state.get("steps") or []) > 1:
+            system_msg += "\n" + FINAL_STEP_PROMPT
         messages.append({"role": "system", "content": system_msg})
+        messages.extend(state.get("scratchpad") or [])
         messages.append({"role": "user", "content": f"Tool Output: {tool_ctx}"})
     
+    return messages
+
+def _prior_history(state: AgentState) -> List[Dict[str, str]]:
+    """The conversation before this turn (state messages end with the current user message)."""
+    messages = state.get("messages") or []
+    if messages and messages[-1].get("role") == "user" and messages[-1].get("content") == state["user_input"]:
+        return messages[:-1]
+    return messages
+
+def _cached_response(state: AgentState) -> Optional[str]:
+    """Cached answer for a conversational turn (never for tool-backed ones)."""
+    if state.get("selected_tool"):
+        return None
+    cached = response_cache.get(state["user_input"], state.get("model_override"), _prior_history(state))
+    if cached is not None:
+        logger.info("Response cache hit")
+        if state.get("stream"):
+            get_stream_writer()({"type": "token", "content": cached})
+    return cached
+
+def _remember_response(state: AgentState, response: str):
+    if not state.get("selected_tool"):
+        response_cache.set(state["user_input"], state.get("model_override"), response, _prior_history(state))
+
+def classifier_node(state: AgentState) -> AgentState:
+    logger.info("Running Classifier")
+    user_input = state["user_input"]
+    tool_names = registry.get_tool_names()
+    
+    # Assess complexity and classify intent using the lightweight model
+    complexity, result = _route_request(user_input, tool_names)
+    return _apply_routing(state, complexity, result)
+
+def tool_node(state: AgentState) -> AgentState:
+    calls = _pending_calls(state)
+    started = time.monotonic()
+    fresh = _uncached_calls(state, calls)
+    logger.info(f"Running Tools: {[c['tool'] for c in fresh]} ({len(calls) - len(fresh)} cached)")
+    outputs = _run_tool_calls(state, fresh) if fresh else []
+    return _finish_tool_step(state, calls, fresh, outputs, started)
+
+def condenser_node(state: AgentState) -> AgentState:
+    """Shrink the tool results to the parts relevant to the request before synthesis."""
+    state["tool_context"], stats = _tool_context(state)
+    state["condensation"] = stats
+    if stats["dropped_tokens"]:
+        logger.info(f"Condensed tool output: kept {stats['chunks_kept']}/{stats['chunks_total']} chunks, "
+                    f"dropped {stats['dropped_tokens']} of {stats['original_tokens']} tokens")
+    return state
+
+def synthesizer_node(state: AgentState) -> AgentState:
+    logger.info("Synthesizing Response")
+    # Follow-up steps keep the tier chosen by the classifier
+    model_override = state.get("model_override")
+    cached = _cached_response(state)
+    if cached is not None:
+        state["final_response"] = cached
+        return state
+    started = time.monotonic()
+    allow_follow_up = bool(state.get("selected_tool")) and _can_follow_up(state)
+    messages = _synthesis_messages(state, allow_follow_up)
+    
+    if state.get("stream"):
+        # Push each token out of the graph run (stream_mode="custom") as it arrives
+        gate = _TokenGate(get_stream_writer(), hold_calls=allow_follow_up)
+        for token in client.chat_stream(messages, model_override=model_override):
+            gate.feed(token)
+        response = gate.text
+        state = _record_synthesis(state, started, response, allow_follow_up)
+        gate.finish(state["follow_up"])
+        return state
     response = client.chat(messages, model_override=model_override)
-    state["final_response"] = response
+    return _record_synthesis(state, started, response, allow_follow_up)
+
+# --- Async nodes: same contract, non-blocking on the event loop ---
+
+async def aclassifier_node(state: AgentState) -> AgentState:
+    logger.info("Running Classifier (async)")
+    user_input = state["user_input"]
+    tool_names = registry.get_tool_names()
     
+    fast = _fast_route(user_input)
+    if fast is not None:
+        return _apply_routing(state, *fast)
+    
+    # The LLM classifier is on the critical path; overlap it with the heavy model's prompt eval
+    speculation = None
+    if speculator.applies(state):
+        history, _ = context_manager.fit(state.get("messages", []), speculator.model, state.get("conversation_id"))
+        speculation = speculator.start(history)
+    started = time.monotonic()
+    complexity, result = await _allm_route(user_input, tool_names)
+    state = _apply_routing(state, complexity, result)
+    if speculation is not None:
+        uses_tool = state["intent"] == "tool_use" and bool(state["selected_tool"])
+        speculator.resolve(speculation, uses_tool, state["model_override"], time.monotonic() - started)
     return state
+
+async def atool_node(state: AgentState) -> AgentState:
+    calls = _pending_calls(state)
+    started = time.monotonic()
+    fresh = _uncached_calls(state, calls)
+    logger.info(f"Running Tools (async): {[c['tool'] for c in fresh]} ({len(calls) - len(fresh)} cached)")
+    outputs = await _arun_tool_calls(state, fresh) if fresh else []
+    return _finish_tool_step(state, calls, fresh, outputs, started)
+
+async def asynthesizer_node(state: AgentState) -> AgentState:
+    logger.info("Synthesizing Response (async)")
+    model_override = state.get("model_override")
+    cached = _cached_response(state)
+    if cached is not None:
+        state["final_response"] = cached
+        return state
+    started = time.monotonic()
+    allow_follow_up = bool(state.get("selected_tool")) and _can_follow_up(state)
+    messages = _synthesis_messages(state, allow_follow_up)
+    
+    if state.get("stream"):
+        gate = _TokenGate(get_stream_writer(), hold_calls=allow_follow_up)
+        async for token in client.achat_stream(messages, model_override=model_override):
+            gate.feed(token)
+        state = _record_synthesis(state, started, gate.text, allow_follow_up)
+        gate.finish(state["follow_up"])
+        return state
+    response = await client.achat(messages, model_override=model_override)
+    return _record_synthesis(state, started, response, allow_follow_up)
@@ -0,0 +1,254 @@
+"""
+Fast-path router that runs before the LLM classifier.
+
+Each input is scored against per-tool exemplar phrases with a small TF-IDF
+model (word unigrams + bigrams, cosine similarity in NumPy). A route is taken
+only when the best label is confident, clearly ahead of the runner-up, and its
+arguments can be extracted from the text; everything else falls through to the
+light-model classifier.
+"""
+
+import re
+import math
+import shlex
+import logging
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Any
+
+from ..safety.validator import CommandValidator
+
+logger = logging.getLogger(__name__)
+
+CONVERSATIONAL = "conversational"
+
+EXEMPLARS: Dict[str, List[str]] = {
+    CONVERSATIONAL: [
+        "hi", "hello", "hey there", "good morning", "good evening", "thanks", "thank you",
+        "thanks a lot", "cheers", "bye", "goodbye", "see you later", "how are you",
+        "who are you", "what can you do", "ok", "okay cool", "nice", "great thanks",
+    ],
+    "run_command": [
+        "run CMD", "run the command CMD", "execute CMD", "please run CMD", "can you run CMD",
+        "CMD", "run it in the shell CMD", "execute this command CMD",
+    ],
+    "list_dir": [
+        "list files in PATH", "list the files in PATH", "list directory PATH",
+        "what is in PATH", "what's in PATH", "show me the contents of PATH",
+        "show files in PATH", "list everything in PATH", "what files are in PATH",
+        "list files here", "list the current directory", "show the directory contents",
+    ],
+    "read_file": [
+        "read PATH", "read the file PATH", "show me PATH", "open PATH", "print PATH",
+        "display the contents of PATH", "what does PATH say", "show the file PATH",
+        "read file PATH", "view PATH",
+    ],
+    "find_files": [
+        "find GLOB files", "find files named GLOB", "find all GLOB in PATH",
+        "find GLOB files in PATH", "search for files matching GLOB", "locate GLOB",
+        "where are the GLOB files", "list all GLOB files under PATH",
+    ],
+    "search_knowledge_base": [
+        "what did we do yesterday", "what did we talk about", "do you remember when we",
+        "search my notes for", "search the knowledge base for", "look up in my notes",
+        "what did we decide about", "recall what we said about", "check my notes about",
+        "did we discuss", "what do my notes say about",
+    ],
+}
+
+PATH_RE = re.compile(r"(?<![\w*?])(~?/[^\s'\"`]*|\.{1,2}/[^\s'\"`]*|~)(?=[\s'\"`.,?!]*$|[\s'\"`,?!])")
+GLOB_RE = re.compile(r"(?<!\S)['\"`]?([^\s'\"`]*[*?][^\s'\"`]*)['\"`]?")
+RUN_RE = re.compile(r"^(?:please\s+|can you\s+|could you\s+)?(?:run|execute|exec)(?:\s+the\s+command|\s+this\s+command)?[\s:]+[`'\"]?(.+?)[`'\"]?\s*$", re.I)
+KNOWN_COMMANDS = (
+    {c.split()[0] for c in CommandValidator.TIER_1_SAFE | CommandValidator.TIER_2_WRITE}
+    | {"df", "du", "free", "uptime", "ps", "top", "uname", "date", "hostname", "ip", "git"}
+)
+KB_LEAD_RE = re.compile(
+    r"^(search (my notes|the knowledge base)( for)?|look up( in my notes)?|check my notes (about|for)|"
+    r"what do my notes say about|recall what we said about|what did we decide about)\s+", re.I
+)
+
+# Words that mark a sentence rather than a shell command ("find *.py files in ~/proj")
+PROSE_WORDS = {"files", "file", "in", "named", "all", "the", "for", "me", "my", "what", "where", "is", "are"}
+
+# A bare command's arguments must look like arguments - flags, paths, globs, file
+# names, numbers, quoted strings - or be a word that command takes, so "date night
+# ideas" or "top 10 movies of 2020" go to the classifier instead of the shell
+ARG_RE = re.compile(r"^(-\S|[~./$]|\d+$)|[/*?=\s]|\w\.\w")
+WORD_ARGS = {
+    "git": {"status", "log", "diff", "show", "branch", "remote", "stash", "fetch", "pull", "tag"},
+    "ps": {"aux", "ax", "ef"},
+    "ip": {"a", "addr", "address", "route", "link"},
+    "pip": {"list", "freeze", "show"},
+}
+
+PLACEHOLDERS = {"CMD", "PATH", "GLOB"}
+
+def _bare_command(text: str) -> Optional[str]:
+    """Return text if it reads as a literal shell command (e.g. "ls -la ~/proj", "git status")."""
+    command = text.strip().strip("`")
+    words = command.split()
+    if not words or words[0] not in KNOWN_COMMANDS or command.endswith("?"):
+        return None
+    if len(words) > 6 or PROSE_WORDS & {w.lower() for w in words[1:]}:
+        return None
+    try:
+        args = shlex.split(command)[1:]
+    except ValueError:
+        return None
+    allowed = WORD_ARGS.get(words[0], set())
+    if not all(arg in allowed or ARG_RE.search(arg) for arg in args):
+        return None
+    return command
+
+def _placeholders(text: str) -> str:
+    """Replace concrete commands/paths/globs with placeholder tokens so exemplars generalize."""
+    match = RUN_RE.match(text.strip())
+    if match:
+        text = text.strip()[:match.start(1)] + " CMD"
+    elif _bare_command(text):
+        return "CMD"
+    text = GLOB_RE.sub(" GLOB ", text)
+    text = PATH_RE.sub(" PATH ", text)
+    return text
+
+def _features(text: str) -> List[str]:
+    words = re.findall(r"[A-Za-z]+", _placeholders(text))
+    words = [w if w in PLACEHOLDERS else w.lower() for w in words]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+# --- Argument extraction: a route is only taken if its extractor succeeds ---
+
+def _extract_run_command(text: str) -> Optional[Dict[str, Any]]:
+    match = RUN_RE.match(text.strip())
+    if match:
+        # "run the tests" / "execute the plan" name a task, not a command; leave those to the LLM
+        command = match.group(1).strip()
+        return {"command": command} if command.split()[0] in KNOWN_COMMANDS else None
+    command = _bare_command(text)
+    return {"command": command} if command else None
+
+def _extract_path(text: str) -> Optional[str]:
+    match = PATH_RE.search(text)
+    return match.group(1).rstrip(".,?!") if match else None
+
+def _extract_list_dir(text: str) -> Optional[Dict[str, Any]]:
+    path = _extract_path(text)
+    if path:
+        return {"path": path}
+    if re.search(r"\b(here|current directory|this directory)\b", text, re.I):
+        return {"path": "."}
+    return None
+
+def _extract_read_file(text: str) -> Optional[Dict[str, Any]]:
+    path = _extract_path(text)
+    # Require something that looks like a file, not a directory
+    if path and not path.endswith("/") and path != "~":
+        return {"file_path": path}
+    return None
+
+def _extract_find_files(text: str) -> Optional[Dict[str, Any]]:
+    match = GLOB_RE.search(text)
+    if not match:
+        return None
+    args = {"pattern": match.group(1)}
+    path = _extract_path(text[:match.start()] + text[match.end():])
+    if path:
+        args["path"] = path
+    return args
+
+def _extract_kb_query(text: str) -> Optional[Dict[str, Any]]:
+    query = KB_LEAD_RE.sub("", text.strip()).strip(" ?")
+    return {"query": query} if query else None
+
+EXTRACTORS: Dict[str, Callable[[str], Optional[Dict[str, Any]]]] = {
+    CONVERSATIONAL: lambda text: {},
+    "run_command": _extract_run_command,
+    "list_dir": _extract_list_dir,
+    "read_file": _extract_read_file,
+    "find_files": _extract_find_files,
+    "search_knowledge_base": _extract_kb_query,
+}
+
+@dataclass
+class RouteDecision:
+    label: str            # tool name or "conversational"
+    confidence: float     # cosine similarity of the best exemplar
+    margin: float         # lead over the best exemplar of any other label
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def intent(self) -> str:
+        return CONVERSATIONAL if self.label == CONVERSATIONAL else "tool_use"
+
+    @property
+    def tool(self) -> Optional[str]:
+        return None if self.label == CONVERSATIONAL else self.label
+
+class PreRouter:
+    def __init__(self, tools: List[str], threshold: float = 0.5, min_margin: float = 0.15,
+                 exemplars: Dict[str, List[str]] = None):
+        self.threshold = threshold
+        self.min_margin = min_margin
+        exemplars = exemplars or EXEMPLARS
+        # Only route to tools the registry actually has
+        self.exemplars = {label: phrases for label, phrases in exemplars.items()
+                          if label == CONVERSATIONAL or label in tools}
+
+        docs, self.labels = [], []
+        for label, phrases in self.exemplars.items():
+            for phrase in phrases:
+                docs.append(_features(phrase))
+                self.labels.append(label)
+        self.label_names = sorted(self.exemplars)
+        self._label_index = np.array([self.label_names.index(l) for l in self.labels])
+
+        vocab = sorted({t for doc in docs for t in doc})
+        self.vocab = {t: i for i, t in enumerate(vocab)}
+        df = Counter(t for doc in docs for t in set(doc))
+        self.idf = np.array([math.log((1 + len(docs)) / (1 + df[t])) + 1.0 for t in vocab], dtype=np.float32)
+        self.oov_idf = math.log(1 + len(docs)) + 1.0
+        self.matrix = np.vstack([self._vectorize(doc) for doc in docs])
+
+    def _vectorize(self, features: List[str]) -> np.ndarray:
+        vec = np.zeros(len(self.vocab), dtype=np.float32)
+        oov_mass = 0.0
+        for term, count in Counter(features).items():
+            weight = 1.0 + math.log(count)
+            idx = self.vocab.get(term)
+            if idx is not None:
+                vec[idx] = weight * self.idf[idx]
+            else:
+                # Words no exemplar uses still count against similarity, so
+                # "hi, refactor my codebase" is not mistaken for a greeting
+                oov_mass += (weight * self.oov_idf) ** 2
+        norm = math.sqrt(float(vec @ vec) + oov_mass)
+        return vec / norm if norm else vec
+
+    def score(self, text: str) -> RouteDecision:
+        """Best label for text with its confidence and margin (no threshold applied)."""
+        sims = self.matrix @ self._vectorize(_features(text))
+
+        per_label = np.full(len(self.label_names), -1.0, dtype=np.float32)
+        np.maximum.at(per_label, self._label_index, sims)
+        order = np.argsort(-per_label)
+        best = int(order[0])
+        runner_up = float(per_label[order[1]]) if len(order) > 1 else 0.0
+        return RouteDecision(
+            label=self.label_names[best],
+            confidence=float(per_label[best]),
+            margin=float(per_label[best]) - runner_up
+        )
+
+    def route(self, text: str) -> Optional[RouteDecision]:
+        """Return a decision for obvious inputs, or None to fall through to the LLM."""
+        decision = self.score(text)
+        if decision.confidence < self.threshold or decision.margin < self.min_margin:
+            return None
+        args = EXTRACTORS[decision.label](text)
+        if args is None:
+            return None
+        decision.args = args
+        logger.info(f"Pre-router: {decision.label} ({decision.confidence:.2f}, margin {decision.margin:.2f})")
+        return decision
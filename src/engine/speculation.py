@@ -0,0 +1,110 @@
+"""
+andy-os Speculative Prefill
+
+For a conversational turn the synthesis prompt is just the (trimmed) history,
+which is known before classification finishes. While the light model routes the
+request, the heavy model is asked to evaluate that prompt so its KV cache is
+already filled when synthesis starts, taking prompt evaluation off the critical
+path. If the classifier picks a tool or the light tier, the prefill is cancelled
+and the time it held the model is counted as wasted.
+
+Prefill only runs when the heavy model has a free slot, never under CRITICAL
+resource pressure and never in power-save mode. Until the classifier confirms
+it, its slot is preemptible: another request queueing for the heavy model makes
+it stop and hand the slot over, so speculation never delays or sheds real work.
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..core.resources import ResourceStatus
+from ..core.pressure import PowerMode
+
+logger = logging.getLogger(__name__)
+
+# (messages, model, preempt event) -> prompt stats, or None if skipped/preempted
+Prefill = Callable[[List[Dict[str, str]], str, threading.Event], Awaitable[Optional[Dict[str, Any]]]]
+
+@dataclass
+class Speculation:
+    task: asyncio.Task
+    started: float
+    preempt: threading.Event
+
+class SpeculativePrefill:
+    def __init__(self, prefill: Prefill, model: str, monitor=None, enabled: bool = False,
+                 keep: Optional[Callable[[str, threading.Event], None]] = None):
+        self.prefill = prefill
+        self.model = model
+        self.keep = keep  # makes a confirmed prefill's slot non-preemptible
+        self.monitor = monitor
+        self.enabled = enabled
+        self.started = 0
+        self.skipped = 0      # model busy or prefill failed, nothing was evaluated
+        self.hits = 0         # synthesis ran on the prefilled prompt
+        self.misses = 0       # classifier chose the light tier
+        self.cancelled = 0    # classifier chose a tool
+        self.wasted_ms = 0.0
+        self.wasted_tokens = 0
+        self.overlapped_ms = 0.0  # classification time the hits ran alongside
+
+    def applies(self, state: Dict[str, Any]) -> bool:
+        if not self.enabled or state.get("model_override"):
+            return False
+        if state.get("power_mode") == PowerMode.POWER_SAVE.value:
+            return False
+        return self.monitor is None or self.monitor.get_metrics().status != ResourceStatus.CRITICAL
+
+    def start(self, messages: List[Dict[str, str]]) -> Speculation:
+        """Begin prefilling the synthesis prompt on the speculated model."""
+        self.started += 1
+        preempt = threading.Event()
+        return Speculation(asyncio.create_task(self.prefill(messages, self.model, preempt)), time.monotonic(), preempt)
+
+    def resolve(self, speculation: Speculation, uses_tool: bool, model: Optional[str], classify_s: float):
+        """Keep the prefill if synthesis will use it, otherwise cancel it and count the waste."""
+        task = speculation.task
+        finished = task.done() and not task.cancelled()
+        if finished and task.result() is None:
+            self.skipped += 1
+            return
+        if not uses_tool and model == self.model:
+            # Left running: synthesis queues behind it on the same slot and reuses the cache
+            if self.keep is not None and not finished:
+                self.keep(self.model, speculation.preempt)
+            self.hits += 1
+            self.overlapped_ms += classify_s * 1000
+            return
+
+        if uses_tool:
+            self.cancelled += 1
+        else:
+            self.misses += 1
+        if finished:
+            result = task.result()
+            self.wasted_ms += result["prompt_eval_ms"]
+            self.wasted_tokens += result["prompt_tokens"]
+        else:
+            task.cancel()
+            self.wasted_ms += (time.monotonic() - speculation.started) * 1000
+        logger.debug(f"Discarded {self.model} prefill ({'tool step' if uses_tool else 'synthesis on ' + str(model)})")
+
+    def stats(self) -> Dict[str, Any]:
+        resolved = self.hits + self.misses + self.cancelled
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "started": self.started,
+            "skipped": self.skipped,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cancelled": self.cancelled,
+            "hit_rate": round(self.hits / resolved, 3) if resolved else 0.0,
+            "wasted_ms": round(self.wasted_ms, 1),
+            "wasted_tokens": self.wasted_tokens,
+            "overlapped_ms": round(self.overlapped_ms, 1)
+        }
@@ -9,11 +9,22 @@ class AgentState(TypedDict):
     
     # Classification State
     intent: str  # e.g., "tool_use", "conversational", "ambiguous"
-    selected_tool: Optional[str]
+    selected_tool: Optional[str]  # first entry of tool_calls
     tool_args: Dict[str, Any]
+    tool_calls: List[Dict[str, Any]]  # independent calls for this turn: [{"tool": ..., "args": ...}]
     
     # Execution State
-    tool_output: Optional[Dict[str, Any]]
+    tool_output: Optional[Dict[str, Any]]  # raw result, or {"success", "results"} for several calls
+    tool_results: List[Dict[str, Any]]  # [{"tool", "args", "output"}] in tool_calls order
+    tool_context: Optional[str]  # tool_output condensed for the synthesis prompt
+    condensation: Optional[Dict[str, int]]  # token accounting from the condenser
+    
+    # Iterative (ReAct) State
+    follow_up: bool  # synthesizer asked for another tool step instead of answering
+    scratchpad: List[Dict[str, str]]  # earlier steps' tool output and follow-up calls, replayed to synthesis
+    tool_cache: Dict[str, Any]  # results by (tool, args) for this run, so repeated calls are free
+    steps: List[Dict[str, Any]]  # per-step latency: {"step", "tools", "cached", "tool_ms", "synthesis_ms"}
+    loop_started: Optional[float]  # time.monotonic() of the first tool step (wall-clock budget)
     
     # Final Response
     final_response: str
@@ -21,4 +32,7 @@ class AgentState(TypedDict):
     
     # Configuration
     model_override: Optional[str]
+    power_mode: Optional[str]  # PowerMode value sampled when the request arrived
     complexity: Optional[str]  # "simple" or "complex"
+    stream: bool  # emit synthesis tokens through the graph's custom stream
+    conversation_id: Optional[int]  # enables rolling summaries of trimmed history
@@ -1,15 +1,23 @@
 import sys
-from ..engine.graph import create_agent_graph
+from ..app import get_app
 from ..engine.state import AgentState
 
+# Raw turns kept in-process; the synthesizer trims further to the model's token
+# budget, and what falls out of either is summarized
+HISTORY_WINDOW = 50
+
 def run_repl():
     print("Initializing Agent-OS...")
-    graph = create_agent_graph()
+    context = get_app()
+    graph = context.graph()
+    memory, pressure = context.memory, context.pressure
+    from ..engine.nodes import context_manager
     
     print("Agent-OS Ready. Type 'exit' to quit.")
     print("-" * 50)
     
     history = []
+    conversation_id = memory.create_conversation()
     
     while True:
         try:
@@ -24,13 +32,15 @@ def run_repl():
             # Prepare state
             state: AgentState = {
                 "user_input": user_input,
-                "messages": history,
+                "messages": history + [{"role": "user", "content": user_input}],
                 "intent": "ambiguous",
                 "selected_tool": None,
                 "tool_args": {},
                 "tool_output": None,
                 "final_response": "",
-                "error": None
+                "error": None,
+                "power_mode": pressure.mode.value,
+                "conversation_id": conversation_id
             }
             
             # Run Graph
@@ -41,9 +51,15 @@ def run_repl():
             response = result.get("final_response", "No response.")
             print(f"\nAgent: {response}")
             
-            # Update History (naive)
-            history.append({"role": "user", "content": user_input})
-            history.append({"role": "assistant", "content": response})
+            # Update and persist history, keeping only the recent window in memory
+            turn = [
+                {"role": "user", "content": user_input},
+                {"role": "assistant", "content": response}
+            ]
+            memory.save_messages(conversation_id, turn)
+            history = history + turn
+            evicted, history = history[:-HISTORY_WINDOW], history[-HISTORY_WINDOW:]
+            context_manager.schedule_summary(conversation_id, evicted, history)
             
         except KeyboardInterrupt:
             print("\nGoodbye!")
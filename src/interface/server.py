@@ -1,19 +1,27 @@
 import logging
 import sys
 import os
+import json
+import asyncio
+import uuid
+import threading
+from contextlib import asynccontextmanager
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # Ensure src is in path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.engine.graph import create_agent_graph
+from src.app import get_app
 from src.engine.state import AgentState
-from src.core.resources import ResourceMonitor, ResourceStatus
-from src.core.memory import memory
+from src.core.pressure import PowerMode
+from src.core.scheduler import SchedulerOverloaded
+from src.core.transport import OllamaUnavailable
+from src.core import telemetry
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -22,40 +30,79 @@ logger = logging.getLogger(__name__)
 # Load env
 load_dotenv()
 
-# Initialize Resource Monitor
-monitor = ResourceMonitor(cpu_threshold_critical=85.0, mem_threshold_critical=90.0)
+# Shared client, registry, memory and graph; built by the lifespan hook rather than at import
+context = get_app()
+# Compiled async graph (async nodes keep the event loop free while the LLM pipeline runs)
+graph = None
 
-# Current conversation ID (simple session management)
-current_conversation_id = memory.get_or_create_conversation()
-logger.info(f"Using conversation ID: {current_conversation_id}")
+# Current values exposed next to the latency histograms on /metrics
+telemetry.registry.gauge("andy_os_cpu_percent", "Smoothed CPU usage",
+                         lambda: context.monitor.smoothed().get("cpu", 0.0))
+telemetry.registry.gauge("andy_os_memory_percent", "Smoothed memory usage",
+                         lambda: context.monitor.smoothed().get("memory", 0.0))
+telemetry.registry.gauge("andy_os_power_save", "1 while synthesis is held on the light model",
+                         lambda: context.pressure.status()["mode"] == PowerMode.POWER_SAVE.value)
+telemetry.registry.gauge("andy_os_scheduler_queue_depth", "Ollama calls waiting for a model slot",
+                         lambda: context.client.scheduler.stats()["queue_depth"])
+telemetry.registry.gauge("andy_os_ollama_circuit_open", "1 while Ollama calls fail fast after repeated connection failures",
+                         lambda: context.client.backends.retry_after() > 0)
 
-app = FastAPI(title="andy-os API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global graph
+    try:
+        graph = context.graph(use_async=True)
+    except Exception as e:
+        logger.error(f"Failed to initialize Agent Graph: {e}")
+        graph = None
+    context.monitor.start()
+    # Only models loaded on this machine count against its RAM
+    local = context.client.backends.local
+    context.pressure.start(local.async_client if local else None)
+    context.client.backends.start()
+    if os.getenv("ANDY_OS_PRELOAD_MODELS", "1") == "1":
+        await context.model_manager.start()
+    yield
+    await context.model_manager.stop()
+    await context.client.backends.stop()
+    await context.pressure.stop()
+    context.monitor.stop()
 
-# ... (CORS middleware)
+app = FastAPI(title="andy-os API", lifespan=lifespan)
 
-# Initialize Agent Graph
-try:
-    graph = create_agent_graph()
-    logger.info("Agent Graph initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Agent Graph: {e}")
-    graph = None
+# ... (CORS middleware)
 
 class ChatRequest(BaseModel):
     message: str
-    history: List[Dict[str, str]] = []
+    # Omit on the first turn; the server assigns one and returns it
+    session_id: Optional[str] = None
+    # Legacy clients only: full history overrides the server-side session window
+    history: Optional[List[Dict[str, str]]] = None
+    # Return a per-request breakdown of node, tool and Ollama time
+    timings: bool = False
 
 class ChatResponse(BaseModel):
     response: str
     tool_output: Optional[Dict[str, Any]] = None
     model_used: str
+    session_id: str
+    timings: Optional[Dict[str, Any]] = None
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok", "agent_status": "ready" if graph else "error"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of the span, Ollama and resource metrics."""
+    return PlainTextResponse(telemetry.registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/status")
 async def get_status():
+    # Engine-level caches live with the graph nodes, which the lifespan hook has imported
+    from src.engine.nodes import response_cache, speculator
+
+    monitor, pressure, client = context.monitor, context.pressure, context.client
     metrics = monitor.get_metrics()
     return {
         "cpu": metrics.cpu_percent,
@@ -67,62 +114,183 @@ async def get_status():
         },
         "temperature": metrics.temperature,
         "status": metrics.status.value,
-        "mode": "Power Save" if metrics.status == ResourceStatus.CRITICAL else "Performance"
+        "mode": "Power Save" if pressure.mode == PowerMode.POWER_SAVE else "Performance",
+        "power": pressure.status(),
+        "smoothed": monitor.smoothed(),
+        "history": monitor.history(int(os.getenv("ANDY_OS_STATUS_HISTORY", "60"))),
+        "cache": {
+            "routing": client.cache_stats(),
+            "responses": response_cache.stats(),
+            "sessions": context.sessions.stats()
+        },
+        "scheduler": client.scheduler.stats(),
+        "ollama": client.transport_stats(),
+        "speculation": speculator.stats(),
+        "models": {
+            **context.model_manager.status(),
+            "loaded": await context.model_manager.loaded_models()
+        }
+    }
+
+def ensure_available():
+    """Fail fast with 503 while every Ollama backend's circuit breaker is open."""
+    retry_after = context.client.backends.retry_after()
+    if retry_after > 0:
+        raise HTTPException(status_code=503, detail="Ollama is unavailable",
+                            headers={"Retry-After": str(max(1, round(retry_after)))})
+
+async def load_session(request: ChatRequest):
+    """Resolve (session_id, conversation_id, prior messages) for a request."""
+    if request.session_id:
+        session_id = request.session_id
+    elif request.history is not None:
+        # Legacy clients keep appending to one rolling conversation, not one per message
+        session_id = await asyncio.to_thread(context.sessions.legacy_session_id)
+    else:
+        session_id = uuid.uuid4().hex
+    session = await asyncio.to_thread(context.sessions.get, session_id)
+    if request.history is not None:
+        return session_id, session.conversation_id, list(request.history)
+    return session_id, session.conversation_id, list(session.messages)
+
+def build_state(request: ChatRequest, conversation_id: int, history: List[Dict[str, str]],
+                power_mode: PowerMode, stream: bool = False) -> AgentState:
+    """Construct the initial graph state for a chat request."""
+    current_messages = list(history)
+    current_messages.append({"role": "user", "content": request.message})
+    
+    return {
+        "user_input": request.message,
+        "messages": current_messages,
+        "intent": "ambiguous",
+        "selected_tool": None,
+        "tool_args": {},
+        "tool_output": None,
+        "final_response": "",
+        "error": None,
+        # Model selection now handled by classifier_node via complexity assessment
+        # and the power mode (power save keeps synthesis on the light model)
+        "model_override": None,
+        "power_mode": power_mode.value,
+        "complexity": None,
+        "stream": stream,
+        "conversation_id": conversation_id
     }
 
+def save_turn(session_id: str, message: str, response_text: str, model_used: str, tool_out: Any):
+    """Persist one user/assistant exchange to the session's conversation in one transaction."""
+    context.sessions.record_turn(session_id, message, response_text,
+                         {"model": model_used, "tool_output": tool_out})
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     if not graph:
         raise HTTPException(status_code=500, detail="Agent system not initialized")
     
     logger.info(f"Received message: {request.message}")
+    ensure_available()
     
-    # Resource constraint check - force light model if system is under pressure
-    force_light = monitor.should_use_light_model()
-    if force_light:
-        logger.warning("Resource constraint detected, will force light model")
+    # One power mode for the whole request; the controller applies hysteresis so it doesn't flap
+    power_mode = context.pressure.mode
+    if power_mode == PowerMode.POWER_SAVE:
+        logger.warning("Power save mode, synthesis will use the light model")
 
     try:
-        # Construct state
-        current_messages = list(request.history)
-        current_messages.append({"role": "user", "content": request.message})
-        
-        state: AgentState = {
-            "user_input": request.message,
-            "messages": current_messages,
-            "intent": "ambiguous",
-            "selected_tool": None,
-            "tool_args": {},
-            "tool_output": None,
-            "final_response": "",
-            "error": None,
-            # Model selection now handled by classifier_node via complexity assessment
-            # But if resources are constrained, force light model
-            "model_override": "qwen2.5-coder:1.5b" if force_light else None,
-            "complexity": None
-        }
+        session_id, conversation_id, history = await load_session(request)
+        state = build_state(request, conversation_id, history, power_mode)
         
-        result = graph.invoke(state)
+        with telemetry.trace() as request_trace, telemetry.span("request", "chat"):
+            result = await graph.ainvoke(state)
         
         response_text = result.get("final_response", "No response generated.")
         tool_out = result.get("tool_output")
         model_used = result.get("model_override", "unknown")
         
-        # Save messages to persistent memory
-        memory.save_message(current_conversation_id, "user", request.message)
-        memory.save_message(current_conversation_id, "assistant", response_text, 
-                           {"model": model_used, "tool_output": tool_out})
+        # Save messages to persistent memory (SQLite is blocking, keep it off the loop)
+        await asyncio.to_thread(save_turn, session_id, request.message, response_text, model_used, tool_out)
         
         return ChatResponse(
             response=response_text,
             tool_output=tool_out if isinstance(tool_out, dict) else None,
-            model_used=model_used
+            model_used=model_used,
+            session_id=session_id,
+            timings=request_trace.breakdown() if request.timings else None
         )
         
+    except SchedulerOverloaded as e:
+        logger.warning(f"Shedding chat request: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except OllamaUnavailable as e:
+        logger.warning(f"Chat request failed fast: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, round(e.retry_after)))})
     except Exception as e:
         logger.error(f"Error processing chat: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /api/chat. Responds with newline-delimited JSON events:
+    {"type": "token", "content": ...} for each synthesized token, followed by a
+    single {"type": "done", ...} event carrying the same fields as ChatResponse.
+    Shell commands also emit {"type": "tool_output", "stream": ..., "content": ...}
+    as they print, and are killed if the client disconnects.
+    """
+    if not graph:
+        raise HTTPException(status_code=500, detail="Agent system not initialized")
+    
+    logger.info(f"Received streaming message: {request.message}")
+    ensure_available()
+    
+    power_mode = context.pressure.mode
+    if power_mode == PowerMode.POWER_SAVE:
+        logger.warning("Power save mode, synthesis will use the light model")
+    
+    session_id, conversation_id, history = await load_session(request)
+    state = build_state(request, conversation_id, history, power_mode, stream=True)
+
+    # Set when the response ends for any reason, including a client disconnect
+    cancel = threading.Event()
+
+    async def event_stream():
+        result = state
+        try:
+            with telemetry.trace() as request_trace, telemetry.span("request", "chat_stream"):
+                async for mode, chunk in graph.astream(state, stream_mode=["custom", "values"],
+                                                       config={"configurable": {"cancel_event": cancel}}):
+                    if mode == "custom":
+                        yield json.dumps(chunk) + "\n"
+                    else:
+                        result = chunk
+            
+            response_text = result.get("final_response") or "No response generated."
+            tool_out = result.get("tool_output")
+            model_used = result.get("model_override", "unknown")
+            
+            await asyncio.to_thread(save_turn, session_id, request.message, response_text, model_used, tool_out)
+            
+            yield json.dumps({
+                "type": "done",
+                "response": response_text,
+                "tool_output": tool_out if isinstance(tool_out, dict) else None,
+                "model_used": model_used,
+                "session_id": session_id,
+                "timings": request_trace.breakdown() if request.timings else None
+            }, default=str) + "\n"
+        except SchedulerOverloaded as e:
+            logger.warning(f"Shedding streaming request: {e}")
+            yield json.dumps({"type": "error", "detail": str(e), "retry_after": 5}) + "\n"
+        except OllamaUnavailable as e:
+            logger.warning(f"Streaming request failed fast: {e}")
+            yield json.dumps({"type": "error", "detail": str(e), "retry_after": max(1, round(e.retry_after))}) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming chat: {e}", exc_info=True)
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            cancel.set()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 if __name__ == "__main__":
     import uvicorn
     # Listen on all interfaces
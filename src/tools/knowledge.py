@@ -1,81 +1,258 @@
 import os
+import re
 import glob
-from typing import List, Dict, Any
+import json
+import math
+import logging
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[re.Match]:
+    """Lowercase word tokens with their character offsets in the source text."""
+    return list(TOKEN_RE.finditer(text.lower()))
 
 class KnowledgeBaseTool:
-    def __init__(self):
+    """
+    Keyword search over markdown knowledge files backed by a persistent inverted index.
+
+    The index maps each term to postings {file: [char offsets]} and is stored as JSON.
+    Before every query the search paths are stat'ed and only new, changed (mtime/size)
+    or deleted files are re-indexed. Results are ranked with BM25 and snippets are cut
+    around the stored offsets, so only the returned files are read at query time.
+    """
+
+    INDEX_VERSION = 1
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+    SNIPPET_WINDOW = 500
+
+    def __init__(self, search_paths: Optional[List[str]] = None, index_path: Optional[str] = None):
         # Define knowledge paths (exports from chat, and a manual knowledge folder)
         self.home = os.path.expanduser("~")
-        self.search_paths = [
+        self.search_paths = search_paths or [
             os.path.join(os.getcwd(), "exports"),
             os.path.join(os.getcwd(), "knowledge"),
             os.path.join(self.home, ".andy-os", "knowledge")
         ]
+        self.index_path = index_path or os.path.join(self.home, ".andy-os", "kb_index.json")
+        self._lock = threading.Lock()
+        self._load_index()
 
-    def search(self, query: str, limit: int = 3) -> str:
+    def _load_index(self):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[str, List[int]]] = defaultdict(dict)
+        try:
+            with open(self.index_path, 'r', encoding='utf_8') as f:
+                data = json.load(f)
+            if data.get("version") == self.INDEX_VERSION:
+                self.docs = data["docs"]
+                self.postings.update(data["postings"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Knowledge index unreadable, rebuilding: {e}")
+
+    def _save_index(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf_8') as f:
+                json.dump({
+                    "version": self.INDEX_VERSION,
+                    "docs": self.docs,
+                    "postings": self.postings
+                }, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"Failed to persist knowledge index: {e}")
+
+    def _remove_doc(self, file_path: str):
+        doc = self.docs.pop(file_path, None)
+        if not doc:
+            return
+        for term in doc["terms"]:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(file_path, None)
+                if not postings:
+                    del self.postings[term]
+
+    def _index_doc(self, file_path: str, stat: os.stat_result):
+        try:
+            with open(file_path, 'r', encoding='utf_8', errors='ignore') as f:
+                content = f.read()
+        except Exception as e:
+            logger.debug(f"Skipping unreadable knowledge file {file_path}: {e}")
+            return
+
+        offsets: Dict[str, List[int]] = defaultdict(list)
+        tokens = tokenize(content)
+        for match in tokens:
+            offsets[match.group()].append(match.start())
+
+        for term, positions in offsets.items():
+            self.postings[term][file_path] = positions
+        self.docs[file_path] = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "length": len(tokens),
+            "terms": list(offsets.keys())
+        }
+
+    def refresh(self) -> bool:
         """
-        Search the knowledge base (markdown files) for the given query.
-        Simple keyword matching for now.
+        Bring the index in line with the files on disk. Returns True if anything changed.
         """
-        results = []
-        query_terms = query.lower().split()
-        
+        seen = set()
+        changed = False
+
         for path in self.search_paths:
             if not os.path.exists(path):
                 continue
-                
-            # Find all .md files
-            files = glob.glob(os.path.join(path, "*.md"))
-            
-            for file_path in files:
+
+            for file_path in glob.glob(os.path.join(path, "*.md")):
+                file_path = os.path.abspath(file_path)
                 try:
-                    with open(file_path, 'r', encoding='utf_8', errors='ignore') as f:
-                        content = f.read()
-                        content_lower = content.lower()
-                        
-                        # Score: how many query terms are present?
-                        score = sum(1 for term in query_terms if term in content_lower)
-                        
-                        if score > 0:
-                            # snippet generation (simple: first 500 chars or context around match)
-                            # context window around first match
-                            first_match_idx = -1
-                            for term in query_terms:
-                                idx = content_lower.find(term)
-                                if idx != -1:
-                                    first_match_idx = idx
-                                    break
-                            
-                            start = max(0, first_match_idx - 100)
-                            end = min(len(content), first_match_idx + 400)
-                            snippet = content[start:end].replace('\n', ' ')
-                            
-                            results.append({
-                                "file": os.path.basename(file_path),
-                                "score": score,
-                                "snippet": f"...{snippet}..."
-                            })
-                except Exception as e:
+                    stat = os.stat(file_path)
+                except OSError:
                     continue
+                seen.add(file_path)
+
+                doc = self.docs.get(file_path)
+                if doc and doc["mtime"] == stat.st_mtime and doc["size"] == stat.st_size:
+                    continue
+
+                self._remove_doc(file_path)
+                self._index_doc(file_path, stat)
+                changed = True
+
+        for file_path in [p for p in self.docs if p not in seen]:
+            self._remove_doc(file_path)
+            changed = True
+
+        if changed:
+            logger.info(f"Knowledge index updated: {len(self.docs)} documents, {len(self.postings)} terms")
+            self._save_index()
+        return changed
+
+    def _rank(self, query_terms: List[str]) -> List[Dict[str, Any]]:
+        n_docs = len(self.docs)
+        if not n_docs:
+            return []
+        avg_len = sum(d["length"] for d in self.docs.values()) / n_docs or 1.0
 
-        # Sort by score descending
-        results.sort(key=lambda x: x['score'], reverse=True)
-        
-        if not results:
+        scores: Dict[str, float] = defaultdict(float)
+        hits: Dict[str, List[int]] = defaultdict(list)
+        for term in set(query_terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log((n_docs - len(postings) + 0.5) / (len(postings) + 0.5) + 1.0)
+            for file_path, positions in postings.items():
+                tf = len(positions)
+                norm = self.BM25_K1 * (1 - self.BM25_B + self.BM25_B * self.docs[file_path]["length"] / avg_len)
+                scores[file_path] += idf * tf * (self.BM25_K1 + 1) / (tf + norm)
+                hits[file_path].extend(positions)
+
+        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+        return [{"path": p, "score": s, "positions": sorted(hits[p])} for p, s in ranked]
+
+    def _snippet(self, file_path: str, positions: List[int]) -> str:
+        # Center the window on the stretch of text holding the most query-term hits
+        best_start, best_count, j = positions[0], 0, 0
+        for i, start in enumerate(positions):
+            while positions[j] < start - self.SNIPPET_WINDOW + 100:
+                j += 1
+            if i - j + 1 > best_count:
+                best_count, best_start = i - j + 1, positions[j]
+
+        try:
+            with open(file_path, 'r', encoding='utf_8', errors='ignore') as f:
+                content = f.read()
+        except Exception:
+            return ""
+
+        start = max(0, best_start - 100)
+        end = min(len(content), start + self.SNIPPET_WINDOW)
+        return content[start:end].replace('\n', ' ')
+
+    def search(self, query: str, limit: int = 3) -> str:
+        """
+        Search the knowledge base (markdown files) for the given query.
+        BM25 ranking over the inverted index.
+        """
+        query_terms = [m.group() for m in tokenize(query)]
+
+        with self._lock:
+            self.refresh()
+            ranked = self._rank(query_terms)[:limit]
+
+        if not ranked:
             return "No relevant information found in the knowledge base."
-            
+
         # Format output
         output = "Found the following info in Knowledge Base:\n"
-        for i, res in enumerate(results[:limit]):
-            output += f"{i+1}. [{res['file']}]: {res['snippet']}\n"
-            
+        for i, res in enumerate(ranked):
+            snippet = self._snippet(res["path"], res["positions"])
+            output += f"{i+1}. [{os.path.basename(res['path'])}]: ...{snippet}...\n"
+
         return output
 
+_knowledge_base: Optional[KnowledgeBaseTool] = None
+_knowledge_base_lock = threading.Lock()
+
+def get_knowledge_base() -> KnowledgeBaseTool:
+    """Shared KnowledgeBaseTool so the index is loaded once per process."""
+    global _knowledge_base
+    with _knowledge_base_lock:
+        if _knowledge_base is None:
+            _knowledge_base = KnowledgeBaseTool()
+        return _knowledge_base
+
 # Standalone function for tool registry
 def search_knowledge_base(query: str) -> str:
     """
     Search past conversations and knowledge files for information.
     Useful for recalling facts, "what did we do yesterday?", or looking up stored notes.
     """
-    kb = KnowledgeBaseTool()
-    return kb.search(query)
+    return get_knowledge_base().search(query)
+
+_vector_index = None
+
+def semantic_search(query: str) -> str:
+    """
+    Search knowledge files and past conversations by meaning rather than keywords.
+    Useful when the user paraphrases something that was discussed or written down before.
+    """
+    global _vector_index
+    from ..core.retrieval import VectorIndex
+    from ..app import get_app
+
+    app = get_app()
+    kb = get_knowledge_base()
+    with _knowledge_base_lock:
+        if _vector_index is None:
+            _vector_index = VectorIndex(app.client.embed, app.client.EMBED_MODEL)
+
+    try:
+        _vector_index.refresh(kb.search_paths, app.memory)
+        results = _vector_index.search(query, k=3)
+    except Exception as e:
+        logger.error(f"Semantic search failed: {e}")
+        return f"Semantic search unavailable: {e}"
+
+    if not results:
+        return "No relevant information found in the knowledge base."
+
+    output = "Found the following related passages:\n"
+    for i, res in enumerate(results):
+        source = res["source"]
+        label = os.path.basename(source[5:]) if source.startswith("file:") else source
+        snippet = res["text"][:500].replace('\n', ' ')
+        output += f"{i+1}. [{label}] (similarity {res['score']:.2f}): {snippet}\n"
+    return output
@@ -1,6 +1,6 @@
 from .shell import ShellTool
 from .fs import FileTool
-from .knowledge import search_knowledge_base
+from .knowledge import search_knowledge_base, semantic_search
 
 class ToolRegistry:
     def __init__(self):
@@ -13,8 +13,11 @@ class ToolRegistry:
             "write_file": self.fs.write_file,
             "list_dir": self.fs.list_dir,
             "find_files": self.fs.find_files,
-            "search_knowledge_base": search_knowledge_base
+            "search_knowledge_base": search_knowledge_base,
+            "semantic_search": semantic_search
         }
+        # Tools that accept on_output (partial output callback) and cancel (threading.Event)
+        self.streaming_tools = {"run_command"}
 
     def get_tool(self, name: str):
         return self.tools.get(name)
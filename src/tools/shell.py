@@ -1,58 +1,188 @@
+import os
+import time
+import codecs
+import signal
+import selectors
 import subprocess
+import threading
 import logging
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from ..safety.validator import CommandValidator
 from ..safety.sudo import wrap_sudo_command
 
 logger = logging.getLogger(__name__)
 
+# Output kept per stream; the middle of anything larger is dropped
+MAX_OUTPUT_BYTES = int(os.getenv("ANDY_OS_SHELL_MAX_OUTPUT", "16384"))
+COMMAND_TIMEOUT = float(os.getenv("ANDY_OS_SHELL_TIMEOUT", "60"))
+READ_SIZE = 4096
+
+OutputCallback = Callable[[str, str], None]  # (stream name, decoded text)
+
+class BoundedOutput:
+    """
+    Keeps the first and last max_bytes/2 bytes of a stream and counts what was
+    dropped in between, so memory stays bounded however much a command prints.
+    """
+
+    def __init__(self, max_bytes: int = MAX_OUTPUT_BYTES):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes):
+        self.total += len(data)
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data:
+            self.tail += data
+            if len(self.tail) > self.tail_limit:
+                del self.tail[:len(self.tail) - self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        tail = self.tail.decode("utf-8", errors="replace")
+        if self.omitted:
+            return f"{head}\n... [{self.omitted} bytes omitted] ...\n{tail}"
+        return head + tail
+
 class ShellTool:
     """
     Executes shell commands with safety validation.
     """
-    
-    def __init__(self):
+
+    def __init__(self, max_output_bytes: int = MAX_OUTPUT_BYTES, timeout: float = COMMAND_TIMEOUT):
         self.validator = CommandValidator()
+        self.max_output_bytes = max_output_bytes
+        self.timeout = timeout
 
-    def run(self, command: str) -> Dict[str, Any]:
+    def run(self, command: str, on_output: Optional[OutputCallback] = None,
+            cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
         """
         Runs a shell command if allowed.
+        Output is read incrementally and capped (head + tail); on_output receives
+        decoded chunks as they arrive, and setting cancel kills the command.
         """
         # Validate
         is_safe, reason, tier = self.validator.validate(command)
-        
+
         if not is_safe:
             logger.warning(f"Blocked command: {command} ({reason})")
             return {
-                "success": False, 
+                "success": False,
                 "output": f"Security Block: {reason} (Tier: {tier})",
                 "tier": tier
             }
 
         # Apply Sudo Wrapper if needed
         final_cmd = wrap_sudo_command(command)
-        
+
         try:
-            # Execute
-            result = subprocess.run(
-                final_cmd, 
-                shell=True, 
-                capture_output=True, 
-                text=True, 
-                timeout=60
+            # Execute in its own process group so timeouts/cancels kill the whole pipeline
+            proc = subprocess.Popen(
+                final_cmd,
+                shell=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True
             )
-            
-            output = result.stdout
-            if result.stderr:
-                output += f"\nStderr: {result.stderr}"
-                
-            return {
-                "success": result.returncode == 0,
-                "output": output.strip() or "(No output)",
-                "tier": tier
-            }
-            
-        except subprocess.TimeoutExpired:
-            return {"success": False, "output": "Command timed out.", "tier": tier}
         except Exception as e:
             return {"success": False, "output": f"Execution error: {e}", "tier": tier}
+
+        streams = {"stdout": BoundedOutput(self.max_output_bytes), "stderr": BoundedOutput(self.max_output_bytes)}
+        timed_out, cancelled = self._pump(proc, streams, on_output, cancel)
+
+        if not (timed_out or cancelled):
+            # Pipes closed; the process itself may still be finishing
+            try:
+                proc.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                timed_out = True
+        if timed_out or cancelled:
+            self._kill(proc)
+        returncode = proc.wait()
+
+        if timed_out:
+            status = "Command timed out."
+        elif cancelled:
+            status = "Command cancelled."
+        else:
+            status = None
+
+        output = streams["stdout"].text()
+        if streams["stderr"].total:
+            output += f"\nStderr: {streams['stderr'].text()}"
+        output = output.strip()
+        if status:
+            output = f"{output}\n{status}".strip()
+
+        truncated = any(s.omitted for s in streams.values())
+        return {
+            "success": returncode == 0 and not (timed_out or cancelled),
+            "output": output or "(No output)",
+            "tier": tier,
+            "returncode": returncode,
+            "truncated": truncated,
+            "output_bytes": {name: s.total for name, s in streams.items()},
+            "omitted_bytes": sum(s.omitted for s in streams.values()),
+            "timed_out": timed_out,
+            "cancelled": cancelled
+        }
+
+    def _pump(self, proc: subprocess.Popen, streams: Dict[str, BoundedOutput],
+              on_output: Optional[OutputCallback], cancel: Optional[threading.Event]):
+        """Read both pipes until EOF, the timeout or cancellation. Returns (timed_out, cancelled)."""
+        deadline = time.monotonic() + self.timeout
+        decoders = {name: codecs.getincrementaldecoder("utf-8")(errors="replace") for name in streams}
+        selector = selectors.DefaultSelector()
+        selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+        try:
+            while selector.get_map():
+                if cancel is not None and cancel.is_set():
+                    return False, True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True, False
+                # Wake up periodically to notice cancellation
+                for key, _ in selector.select(timeout=min(remaining, 0.2)):
+                    data = os.read(key.fileobj.fileno(), READ_SIZE)
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        continue
+                    streams[key.data].write(data)
+                    if on_output is not None:
+                        text = decoders[key.data].decode(data)
+                        if text:
+                            try:
+                                on_output(key.data, text)
+                            except Exception as e:
+                                # A broken listener must not abort the command
+                                logger.debug(f"Dropping partial output: {e}")
+                                on_output = None
+            return False, False
+        finally:
+            selector.close()
+            proc.stdout.close()
+            proc.stderr.close()
+
+    def _kill(self, proc: subprocess.Popen):
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(proc.pid, sig)
+            except (ProcessLookupError, PermissionError):
+                return
+            try:
+                proc.wait(timeout=2)
+                return
+            except subprocess.TimeoutExpired:
+                continue
@@ -0,0 +1,49 @@
+import sys
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.import_time import ENTRY_POINTS, measure
+from src.app import AppContext, set_app
+
+class TestAppContext(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"HOME": self.tmp.name})
+        self.env.start()
+        self.context = AppContext()
+        self.previous = set_app(self.context)
+
+    def tearDown(self):
+        set_app(self.previous)
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_objects_are_built_once_and_shared(self):
+        from src.engine import nodes
+        from src.core.memory import memory
+
+        self.assertIs(self.context.client, self.context.client)
+        self.assertIs(self.context.client.scheduler.monitor, self.context.monitor)
+        self.assertIs(memory, self.context.memory)
+        self.assertTrue(self.context.memory.db_path.startswith(self.tmp.name))
+        self.assertIs(self.context.sessions.memory, self.context.memory)
+        # The graph nodes resolve the same objects through the context
+        self.assertEqual(nodes.registry.get_tool_names(), self.context.registry.get_tool_names())
+        self.assertIs(nodes.client.scheduler, self.context.client.scheduler)
+        self.assertIs(self.context.graph(use_async=True), self.context.graph(use_async=True))
+        self.assertIsNot(self.context.graph(), self.context.graph(use_async=True))
+
+    def test_entry_points_import_lazily(self):
+        for module, budget in ENTRY_POINTS.items():
+            result = measure(module, runs=1)
+            self.assertEqual(result["heavy"], [], module)
+            self.assertLess(result["seconds"], budget, module)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.fake_ollama import FakeOllama
+from src.core.backends import is_local
+from src.core.llm import OllamaClient
+from src.core.pressure import PressureController
+from tests.verify_transport import closed_port_url
+
+LIGHT, HEAVY = OllamaClient.LIGHT_MODEL, OllamaClient.HEAVY_MODEL
+
+class TestBackendPool(unittest.TestCase):
+
+    def setUp(self):
+        self.fakes = []
+
+    def tearDown(self):
+        for fake in self.fakes:
+            fake.stop()
+
+    def fake(self, **options) -> FakeOllama:
+        fake = FakeOllama(token_ms=1, load_ms=0, reply_tokens=5, **options).start()
+        self.fakes.append(fake)
+        return fake
+
+    def client(self, backends: str) -> OllamaClient:
+        env = {"ANDY_OS_OLLAMA_BACKENDS": backends, "ANDY_OS_OLLAMA_RETRY_BACKOFF": "0.01"}
+        with patch.dict(os.environ, env):
+            return OllamaClient()
+
+    def test_model_groups_come_from_health_checks(self):
+        main, light = self.fake(models=[HEAVY]), self.fake(models=[LIGHT])
+        client = self.client(f"{main.url} {light.url}")
+        messages = [{"role": "user", "content": "hi"}]
+
+        async def run():
+            await client.backends.check()
+            route = await client.aroute("list the files in this directory", ["list_dir"])
+            reply = await client.achat(messages, model_override=HEAVY)
+            return route, reply
+
+        route, reply = asyncio.run(run())
+        self.assertEqual(route["tool"], "list_dir")
+        self.assertNotIn("error", reply)
+        self.assertNotIn("error", "".join(client.chat_stream(messages, model_override=LIGHT)))
+        # Each tier only ever reached the host that serves it (the two health-check GETs aside)
+        self.assertEqual((main.requests, light.requests), (1, 2))
+        stats = client.transport_stats()["backends"]
+        self.assertEqual([b["models"] for b in stats], [[HEAVY], [LIGHT]])
+
+    def test_failover_to_next_backend(self):
+        live = self.fake()
+        client = self.client(f"{closed_port_url()}={LIGHT} {live.url}={LIGHT}")
+        messages = [{"role": "user", "content": "hi"}]
+
+        self.assertNotIn("error", client.chat(messages, model_override=LIGHT))
+        self.assertEqual(client.backends.failovers, 1)
+        dead = client.backends.backends[0]
+        self.assertFalse(dead.healthy)
+        # The unreachable host is tried last from now on, streams included
+        self.assertNotIn("error", "".join(client.chat_stream(messages, model_override=LIGHT)))
+        self.assertEqual((client.backends.failovers, live.requests), (1, 2))
+
+    def test_least_outstanding_spreads_concurrent_calls(self):
+        first, second = self.fake(parallel=4), self.fake(parallel=4)
+        client = self.client(f"{first.url}={LIGHT} {second.url}={LIGHT}")
+        # Both hosts serve the light model, so it gets twice the scheduler slots
+        self.assertEqual(client.scheduler.limits[LIGHT], 4)
+        messages = [{"role": "user", "content": "hi"}]
+
+        async def run():
+            return await asyncio.gather(*(client.achat(messages, model_override=LIGHT) for _ in range(4)))
+
+        replies = asyncio.run(run())
+        self.assertTrue(all("error" not in r for r in replies))
+        self.assertEqual((first.requests, second.requests), (2, 2))
+
+    def test_only_the_local_backend_counts_for_memory_pressure(self):
+        self.assertTrue(all(map(is_local, ["localhost:11434", "http://127.0.0.1:11434", "0.0.0.0"])))
+        self.assertFalse(is_local("http://gpu-box:11434"))
+        self.assertIsNone(self.client("http://gpu-box:11434").backends.local)
+
+        remote, local = self.fake(), self.fake()
+        client = self.client(f"{remote.url}={HEAVY} {local.url}={LIGHT}")
+        client.backends.backends[0].local = False  # both fakes listen on loopback; the first plays another host
+        self.assertIs(client.backends.local, client.backends.backends[1])
+
+        controller = PressureController(MagicMock(cpu_threshold=85.0, mem_threshold=90.0))
+        big = {"models": [{"name": HEAVY, "model": HEAVY, "size": 8 << 30, "size_vram": 0}]}
+
+        async def run():
+            await controller.refresh_ollama(client.backends.local.async_client)
+            return await client.async_client.ps()
+
+        with patch.object(remote, "ps", return_value=big):
+            pooled = asyncio.run(run())
+        # The pool still reports every host's models; only this machine's count towards its RAM
+        self.assertEqual([m["model"] for m in pooled["models"]], [HEAVY])
+        self.assertEqual(controller.status()["ollama_memory"]["ram_bytes"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+import asyncio
+import tempfile
+import subprocess
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from scripts.fake_ollama import FakeOllama
+from src.core.llm import OllamaClient
+
+class TestFakeOllama(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeOllama(token_ms=1, load_ms=50, reply_tokens=5).start()
+        with patch.dict(os.environ, {"OLLAMA_HOST": self.fake.url}):
+            self.client = OllamaClient()
+
+    def tearDown(self):
+        self.fake.stop()
+
+    def test_routing_is_deterministic(self):
+        tools = ["run_command", "list_dir"]
+        result = self.client.route("list the files in this directory", tools)
+        self.assertEqual(result, {"complexity": "simple", "intent": "tool_use", "tool": "list_dir", "args": {"path": "."}})
+        self.assertEqual(self.client.route("explain why raft needs a leader", tools)["complexity"], "complex")
+
+    def test_chat_stream_reports_load_once(self):
+        messages = [{"role": "user", "content": "hi"}]
+        tokens = list(self.client.chat_stream(messages, model_override="llama3"))
+        self.assertEqual(len(tokens), 5)
+        self.assertEqual(asyncio.run(self.client.achat(messages, model_override="llama3")), "".join(tokens))
+        timings = self.client.timings.snapshot()["llama3"]
+        self.assertEqual((timings["calls"], timings["last_load_ms"]), (2, 0.0))
+        self.assertGreaterEqual(timings["avg_load_ms"], 25)
+
+class TestBenchmarkScript(unittest.TestCase):
+
+    def test_offline_run_writes_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            subprocess.run(
+                [sys.executable, os.path.join(ROOT, "scripts", "benchmark.py"), "--synthetic", "12",
+                 "--token-ms", "1", "--load-ms", "10", "--json", path],
+                check=True, capture_output=True, timeout=120, env={**os.environ, "OLLAMA_HOST": "http://127.0.0.1:9"}
+            )
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual((report["meta"]["requests"], report["errors"]), (12, 0))
+        self.assertGreater(report["throughput_rps"], 0)
+        self.assertLessEqual(report["latency_ms"]["p50"], report["latency_ms"]["p99"])
+        self.assertIn("node:synthesizer", report["stages"])
+        self.assertTrue(any(stage.startswith("ollama:chat@") for stage in report["stages"]))
+
+if __name__ == "__main__":
+    unittest.main()
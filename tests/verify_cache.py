@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+import json
+import unittest
+from unittest.mock import MagicMock
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.llm import OllamaClient, TTLCache, ResponseCache, normalize_input
+
+class TestCaching(unittest.TestCase):
+
+    def test_ttl_and_lru(self):
+        cache = TTLCache(maxsize=2, ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)  # evicts "b"
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_routing_cache_skips_second_call(self):
+        client = OllamaClient()
+        client.client = MagicMock()
+        client.client.generate.return_value = {"response": json.dumps(
+            {"complexity": "simple", "intent": "conversational", "tool": None, "args": {}}
+        )}
+        
+        first = client.route("What's up?", ["run_command"])
+        second = client.route("  what's UP ", ["run_command"])
+        self.assertEqual(first, second)
+        self.assertEqual(client.client.generate.call_count, 1)
+        
+        # Different tool list is a different key
+        client.route("what's up", ["run_command", "read_file"])
+        self.assertEqual(client.client.generate.call_count, 2)
+        self.assertEqual(client.cache_stats()["hits"], 1)
+
+    def test_failures_are_not_cached(self):
+        client = OllamaClient()
+        client.client = MagicMock()
+        client.client.generate.side_effect = ConnectionError("down")
+        client.assess_complexity("hello")
+        client.assess_complexity("hello")
+        self.assertEqual(client.client.generate.call_count, 2)
+
+    def test_response_cache_rules(self):
+        cache = ResponseCache(enabled=True)
+        cache.set("Hello!", "llama3", "Hi Andy.")
+        self.assertEqual(cache.get("hello", "llama3"), "Hi Andy.")
+        self.assertIsNone(cache.get("hello", "qwen2.5-coder:1.5b"))
+        
+        cache.set("what's the cpu temp", "llama3", "42C")
+        self.assertIsNone(cache.get("what's the cpu temp", "llama3"))
+        
+        # A follow-up only hits an answer given after the same conversation
+        history = [{"role": "user", "content": "tell me about raft"}, {"role": "assistant", "content": "Raft is..."}]
+        cache.set("why?", "llama3", "Because leaders...", history)
+        self.assertEqual(cache.get("why", "llama3", list(history)), "Because leaders...")
+        self.assertIsNone(cache.get("why", "llama3"))
+        self.assertIsNone(cache.get("why", "llama3", [{"role": "user", "content": "tell me about paxos"}]))
+
+        disabled = ResponseCache(enabled=False)
+        disabled.set("hello", "llama3", "Hi")
+        self.assertIsNone(disabled.get("hello", "llama3"))
+        self.assertEqual(normalize_input("  Hello   There?! "), "hello there")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import os
+import unittest
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.context import count_tokens
+from src.engine.condense import condense, chunk_lines, format_tool_output
+
+class TestCondense(unittest.TestCase):
+
+    def test_small_output_passes_through_formatted(self):
+        result = condense("run_command", {"success": True, "output": "hi", "tier": "TIER_1_SAFE",
+                                          "returncode": 0, "truncated": False}, "say hi")
+        self.assertEqual(result.text, "[exit 0]\nhi")
+        self.assertEqual(result.dropped_tokens, 0)
+
+    def test_listing_is_compacted(self):
+        text = format_tool_output("list_dir", "[DIR] src\n[FILE] README.md\n[FILE] setup.py")
+        self.assertEqual(text, "Directories (1): src/\nFiles (2): README.md, setup.py")
+
+    def test_large_output_keeps_relevant_chunks(self):
+        lines = [f"2024-01-01 INFO worker {i} heartbeat ok" for i in range(2000)]
+        lines[1200] = "2024-01-01 ERROR database connection refused on port 5432"
+        log = "\n".join(lines)
+
+        result = condense("read_file", log, "why was the database connection refused?", budget=300)
+        self.assertIn("connection refused", result.text)
+        self.assertTrue(result.text.startswith("2024-01-01 INFO worker 0"))
+        self.assertIn("worker 1999", result.text)
+        self.assertIn("omitted", result.text)
+        self.assertLessEqual(result.kept_tokens, 320)
+        self.assertGreater(result.dropped_tokens, 10000)
+        self.assertEqual(result.stats()["dropped_tokens"], result.dropped_tokens)
+
+    def test_irrelevant_query_falls_back_to_head(self):
+        text = "\n".join(f"line {i}" for i in range(5000))
+        result = condense("read_file", text, "zzz", budget=200)
+        self.assertTrue(result.text.startswith("line 0\nline 1\n"))
+        self.assertLessEqual(result.kept_tokens, 220)
+
+    def test_tool_output_is_not_kept_in_token_cache(self):
+        cached = count_tokens.cache_info().currsize
+        condense("read_file", "x" * 1_000_000 + "\n" + "y" * 1000, "y", budget=200)
+        self.assertEqual(count_tokens.cache_info().currsize, cached)
+
+    def test_chunk_lines_splits_long_lines(self):
+        chunks = chunk_lines("a" * 1500 + "\nshort", max_chars=600)
+        self.assertEqual([len(c) for c in chunks], [600, 600, len("a" * 300 + "\nshort")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import sys
+import os
+import tempfile
+import threading
+import unittest
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.context import ContextManager, message_tokens
+from src.core.memory import MemoryStore
+from src.core.sessions import SessionStore
+
+def turn(i):
+    return [
+        {"role": "user", "content": f"question {i} " + "x" * 200},
+        {"role": "assistant", "content": f"answer {i} " + "y" * 200},
+    ]
+
+class TestContextManager(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.memory = MemoryStore(os.path.join(self.tmp.name, "memory.db"))
+        self.summaries = []
+
+    def tearDown(self):
+        self.memory.close()
+        self.tmp.cleanup()
+
+    def summarize(self, previous, messages):
+        self.summaries.append([m["content"].split()[1] for m in messages])
+        return f"{previous} +{len(messages)}".strip()
+
+    def test_fits_budget_and_keeps_latest(self):
+        manager = ContextManager(self.summarize, self.memory, budgets={"small": 200})
+        history = sum((turn(i) for i in range(10)), [])
+        
+        kept, dropped = manager.fit(history, "small")
+        self.assertLessEqual(sum(message_tokens(m) for m in kept), 200)
+        self.assertEqual(kept[-1], history[-1])
+        self.assertEqual(dropped + kept, history)
+        
+        # A single oversized message is still sent
+        kept, _ = manager.fit([{"role": "user", "content": "z" * 5000}], "small")
+        self.assertEqual(len(kept), 1)
+
+    def test_rolling_summary(self):
+        conv = self.memory.create_conversation()
+        manager = ContextManager(self.summarize, self.memory, budgets={"small": 300})
+        history = sum((turn(i) for i in range(6)), [])
+        
+        kept, dropped = manager.fit(history, "small", conv)
+        manager.schedule_summary(conv, dropped)
+        manager._executor.submit(lambda: None).result()  # drain the background worker
+        self.assertEqual(self.memory.get_summary(conv), f"+{len(dropped)}")
+        
+        # Next turn: only newly dropped messages are folded in, and the summary leads the prompt
+        history += turn(6)
+        kept, dropped = manager.fit(history, "small", conv)
+        self.assertTrue(kept[0]["content"].startswith("Summary of the earlier conversation"))
+        manager.schedule_summary(conv, dropped)
+        manager._executor.submit(lambda: None).result()
+        self.assertEqual(len(self.summaries), 2)
+        self.assertNotIn("0", self.summaries[1])
+
+    def test_turns_leaving_the_session_window_are_summarized(self):
+        gate = threading.Event()
+        manager = ContextManager(lambda previous, messages: gate.wait() and self.summarize(previous, messages),
+                                 self.memory, budgets={"big": 100000})
+        store = SessionStore(self.memory, window=4, on_evict=manager.schedule_summary)
+        for i in range(4):
+            store.record_turn("s", f"question {i}", f"answer {i}")
+        # Turn 0 left the window first and is being summarized; turn 1 is queued behind it
+        gate.set()
+        for _ in range(2):
+            manager._executor.submit(lambda: None).result()
+        self.assertEqual(self.summaries, [["0", "0"], ["1", "1"]])
+
+        # Everything left fits the budget, but the summary still stands in for the evicted turns
+        conv = store.get("s").conversation_id
+        kept, dropped = manager.fit(store.history("s") + [{"role": "user", "content": "next"}], "big", conv)
+        self.assertEqual(dropped, [])
+        self.assertEqual(kept[0]["content"], "Summary of the earlier conversation:\n+2 +2")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,7 @@
-from src.tools.knowledge import search_knowledge_base
+from src.tools.knowledge import search_knowledge_base, KnowledgeBaseTool
 import os
+import tempfile
+from unittest.mock import patch
 
 def test_kb():
     # Ensure exports dir exists
@@ -19,5 +21,41 @@ def test_kb():
     else:
         print("FAILURE: Did not find the secret.")
 
+def test_kb_incremental_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        kb_dir = os.path.join(tmp, "knowledge")
+        os.makedirs(kb_dir)
+        index_path = os.path.join(tmp, "index.json")
+        with open(os.path.join(kb_dir, "nginx.md"), "w") as f:
+            f.write("# Nginx\nThe nginx config lives in /etc/nginx/nginx.conf. nginx nginx.")
+        with open(os.path.join(kb_dir, "misc.md"), "w") as f:
+            f.write("# Misc\nA note that mentions nginx once among many other words here.")
+
+        kb = KnowledgeBaseTool(search_paths=[kb_dir], index_path=index_path)
+        result = kb.search("nginx config")
+        # BM25 ranks the file with more (and rarer) matching terms first
+        assert result.index("[nginx.md]") < result.index("[misc.md]"), result
+        assert "/etc/nginx/nginx.conf" in result
+        assert len(kb.docs) == 2
+
+        # A fresh instance loads the persisted index without re-reading unchanged files
+        kb2 = KnowledgeBaseTool(search_paths=[kb_dir], index_path=index_path)
+        with patch.object(kb2, "_index_doc", wraps=kb2._index_doc) as indexed:
+            assert kb2.refresh() is False
+            assert indexed.call_count == 0
+            assert len(kb2.docs) == 2
+
+            # Changed and deleted files are picked up incrementally
+            with open(os.path.join(kb_dir, "misc.md"), "w") as f:
+                f.write("Backups run nightly via restic.")
+            os.remove(os.path.join(kb_dir, "nginx.md"))
+            assert kb2.refresh() is True
+            assert [os.path.basename(c.args[0]) for c in indexed.call_args_list] == ["misc.md"]
+        assert [os.path.basename(p) for p in kb2.docs] == ["misc.md"]
+        assert "restic" in kb2.search("restic backups")
+        assert "No relevant information" in kb2.search("nginx")
+    print("SUCCESS: Index ranked, persisted and refreshed incrementally.")
+
 if __name__ == "__main__":
     test_kb()
+    test_kb_incremental_index()
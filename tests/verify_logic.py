@@ -1,7 +1,10 @@
 import sys
 import os
+import time
+import asyncio
+import threading
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -9,6 +12,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.engine.graph import create_agent_graph
 from src.core.llm import OllamaClient
 
+# These tests exercise the LLM classifier path, so the lexical pre-router is disabled
+@patch('src.engine.nodes.prerouter', None)
 class TestAgentOS(unittest.TestCase):
     
     @patch('src.engine.nodes.client')
@@ -17,6 +22,7 @@ class TestAgentOS(unittest.TestCase):
         print("\nTesting Safe Tool Routing...")
         
         # Mock Classification
+        mock_client.route.return_value = None  # exercise the two-call fallback
         mock_client.classify_intent.return_value = {
             "intent": "tool_use", 
             "tool": "run_command", 
@@ -40,6 +46,7 @@ class TestAgentOS(unittest.TestCase):
         """Test that sudo rm -rf is blocked"""
         print("\nTesting Safety Block...")
         
+        mock_client.route.return_value = None  # exercise the two-call fallback
         mock_client.classify_intent.return_value = {
             "intent": "tool_use", 
             "tool": "run_command", 
@@ -62,6 +69,7 @@ class TestAgentOS(unittest.TestCase):
         """Test conversational routing"""
         print("\nTesting Conversational Routing...")
         
+        mock_client.route.return_value = None  # exercise the two-call fallback
         mock_client.classify_intent.return_value = {
             "intent": "conversational", 
             "tool": None, 
@@ -78,5 +86,297 @@ class TestAgentOS(unittest.TestCase):
         self.assertEqual(result["final_response"], "Hello there!")
         print("PASS: Routed to synthesis directly.")
 
+    @patch('src.engine.nodes.client')
+    def test_combined_routing(self, mock_client):
+        """Test that a single combined routing call replaces the two-call path"""
+        print("\nTesting Combined Routing...")
+        
+        mock_client.route.return_value = {
+            "complexity": "complex",
+            "intent": "tool_use", 
+            "tool": "run_command", 
+            "args": {"command": "pwd"}
+        }
+        mock_client.chat.return_value = "You are here."
+        
+        graph = create_agent_graph()
+        result = graph.invoke({"user_input": "where am I", "messages": []})
+        
+        self.assertEqual(result["complexity"], "complex")
+        self.assertEqual(result["model_override"], mock_client.HEAVY_MODEL)
+        self.assertEqual(result["selected_tool"], "run_command")
+        mock_client.assess_complexity.assert_not_called()
+        mock_client.classify_intent.assert_not_called()
+        print("PASS: Routed with one light-model call.")
+
+    @patch('src.engine.nodes.client')
+    def test_power_save_keeps_light_model(self, mock_client):
+        """Test that power save mode overrides a complex classification"""
+        print("\nTesting Power Save Mode...")
+        
+        mock_client.route.return_value = {"complexity": "complex", "intent": "conversational"}
+        mock_client.chat.return_value = "Short answer."
+        
+        graph = create_agent_graph()
+        result = graph.invoke({"user_input": "explain monads", "messages": [], "power_mode": "power_save"})
+        
+        self.assertEqual(result["model_override"], mock_client.LIGHT_MODEL)
+        print("PASS: Light model used in power save.")
+
+    @patch('src.engine.nodes.client')
+    def test_streaming_synthesis(self, mock_client):
+        """Test that streamed tokens are emitted from the graph run"""
+        print("\nTesting Streaming Synthesis...")
+        
+        mock_client.route.return_value = None  # exercise the two-call fallback
+        mock_client.classify_intent.return_value = {
+            "intent": "conversational", 
+            "tool": None, 
+            "args": {}
+        }
+        mock_client.chat_stream.return_value = iter(["Hel", "lo", "!"])
+        
+        graph = create_agent_graph()
+        initial_state = {"user_input": "Hello", "messages": [], "stream": True}
+        
+        tokens = []
+        final = None
+        for mode, chunk in graph.stream(initial_state, stream_mode=["custom", "values"]):
+            if mode == "custom":
+                tokens.append(chunk["content"])
+            else:
+                final = chunk
+        
+        self.assertEqual(tokens, ["Hel", "lo", "!"])
+        self.assertEqual(final["final_response"], "Hello!")
+        mock_client.chat.assert_not_called()
+        print("PASS: Tokens streamed before final response.")
+
+    @patch('src.engine.nodes.client')
+    def test_async_graph(self, mock_client):
+        """Test the async node path used by the API server"""
+        print("\nTesting Async Graph...")
+        
+        mock_client.aroute = AsyncMock(return_value={
+            "complexity": "simple",
+            "intent": "tool_use", 
+            "tool": "run_command", 
+            "args": {"command": "echo hi"}
+        })
+        mock_client.achat = AsyncMock(return_value="It printed hi.")
+        
+        graph = create_agent_graph(use_async=True)
+        result = asyncio.run(graph.ainvoke({"user_input": "say hi", "messages": []}))
+        
+        self.assertTrue(result["tool_output"]["success"])
+        self.assertEqual(result["tool_output"]["output"], "hi")
+        self.assertEqual(result["final_response"], "It printed hi.")
+        mock_client.chat.assert_not_called()
+        print("PASS: Async graph ran tool in pool and synthesized.")
+
+    @patch('src.engine.nodes.client')
+    def test_async_tool_output_streaming(self, mock_client):
+        """Test that shell output is streamed from the tool pool before synthesis"""
+        print("\nTesting Tool Output Streaming...")
+        
+        mock_client.aroute = AsyncMock(return_value={
+            "complexity": "simple",
+            "intent": "tool_use", 
+            "tool": "run_command", 
+            "args": {"command": "echo hi"}
+        })
+        async def tokens(*args, **kwargs):
+            yield "Done."
+        mock_client.achat_stream = tokens
+        
+        graph = create_agent_graph(use_async=True)
+        
+        async def run():
+            events = []
+            async for mode, chunk in graph.astream({"user_input": "say hi", "messages": [], "stream": True},
+                                                   stream_mode=["custom", "values"]):
+                if mode == "custom":
+                    events.append(chunk)
+            return events
+        
+        events = asyncio.run(run())
+        self.assertEqual(events[0], {"type": "tool_output", "stream": "stdout", "content": "hi\n"})
+        self.assertEqual(events[-1], {"type": "token", "content": "Done."})
+        print("PASS: Partial tool output streamed.")
+
+    @patch('src.engine.nodes.client')
+    def test_parallel_tool_calls(self, mock_client):
+        """Test that independent tool calls run concurrently and all reach synthesis"""
+        print("\nTesting Parallel Tool Calls...")
+        
+        sleep = "python3 -c \"import time; time.sleep(0.5); print('{}')\""
+        mock_client.aroute = AsyncMock(return_value={
+            "complexity": "simple",
+            "intent": "tool_use",
+            "tools": [
+                {"tool": "run_command", "args": {"command": sleep.format("one")}},
+                {"tool": "run_command", "args": {"command": sleep.format("two")}},
+                {"tool": "run_command", "args": {"command": sleep.format("three")}}
+            ]
+        })
+        mock_client.achat = AsyncMock(return_value="All three finished.")
+        
+        graph = create_agent_graph(use_async=True)
+        start = time.monotonic()
+        result = asyncio.run(graph.ainvoke({"user_input": "run them", "messages": []}))
+        
+        self.assertLess(time.monotonic() - start, 1.4)
+        self.assertTrue(result["tool_output"]["success"])
+        self.assertEqual([r["output"]["output"] for r in result["tool_results"]], ["one", "two", "three"])
+        prompt = mock_client.achat.call_args[0][0][-1]["content"]
+        for word in ("one", "two", "three"):
+            self.assertIn(word, prompt)
+        self.assertEqual(prompt.count("Result of tool 'run_command'"), 3)
+        print("PASS: Tool calls fanned out and merged.")
+
+    @patch('src.engine.nodes.TOOL_TIMEOUT', 0.5)
+    @patch('src.engine.nodes.TOOL_CONCURRENCY', 1)
+    @patch('src.engine.nodes.client')
+    def test_tool_calls_respect_cap_and_timeout(self, mock_client):
+        """Test the per-turn concurrency cap and the turn timeout on the sync path"""
+        print("\nTesting Tool Call Cap and Timeout...")
+        
+        mock_client.route.return_value = {
+            "complexity": "simple",
+            "intent": "tool_use",
+            "tools": [
+                {"tool": "run_command", "args": {"command": "echo fast"}},
+                {"tool": "run_command", "args": {"command": "python3 -c \"import time; time.sleep(2)\""}},
+                {"tool": "run_command", "args": {"command": "echo never"}}
+            ]
+        }
+        mock_client.chat.return_value = "Partial results."
+        
+        graph = create_agent_graph()
+        result = graph.invoke({"user_input": "run them", "messages": []})
+        
+        outputs = [r["output"] for r in result["tool_results"]]
+        self.assertEqual(outputs[0]["output"], "fast")
+        self.assertIn("did not finish", outputs[1]["error"])
+        self.assertIn("did not finish", outputs[2]["error"])
+        self.assertFalse(result["tool_output"]["success"])
+        self.assertEqual(result["final_response"], "Partial results.")
+        print("PASS: Calls capped and timed out.")
+
+    @patch('src.engine.nodes.TOOL_TIMEOUT', 0.5)
+    @patch('src.engine.nodes.client')
+    def test_single_tool_call_is_timed_out(self, mock_client):
+        """Test that one tool call on the sync path is bounded like a fan-out"""
+        print("\nTesting Single Tool Call Timeout...")
+        
+        mock_client.route.return_value = {
+            "complexity": "simple",
+            "intent": "tool_use",
+            "tool": "run_command",
+            "args": {"command": "python3 -c \"import time; time.sleep(2)\""}
+        }
+        mock_client.chat.return_value = "It timed out."
+        
+        start = time.monotonic()
+        result = create_agent_graph().invoke({"user_input": "run it", "messages": []})
+        
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertIn("did not finish", result["tool_output"]["error"])
+        self.assertEqual(result["final_response"], "It timed out.")
+        print("PASS: Single call timed out.")
+
+    @patch('src.engine.nodes.client')
+    def test_react_loop_follow_up_and_cache(self, mock_client):
+        """Test follow-up tool steps, the per-run tool cache and the step budget"""
+        print("\nTesting ReAct Loop...")
+        
+        mock_client.route.return_value = {
+            "complexity": "complex",
+            "intent": "tool_use",
+            "tool": "run_command",
+            "args": {"command": "echo one"}
+        }
+        mock_client.HEAVY_MODEL = "llama3"
+        mock_client.chat.side_effect = [
+            '{"tool": "run_command", "args": {"command": "echo two"}}',
+            '```json\n{"tool": "run_command", "args": {"command": "echo one"}}\n```',
+            "Done."
+        ]
+        
+        graph = create_agent_graph(max_steps=3)
+        result = graph.invoke({"user_input": "one then two", "messages": []})
+        
+        self.assertEqual(result["final_response"], "Done.")
+        self.assertEqual(mock_client.route.call_count, 1)
+        self.assertEqual([s["cached"] for s in result["steps"]], [0, 0, 1])
+        self.assertTrue(all("tool_ms" in s and "synthesis_ms" in s for s in result["steps"]))
+        self.assertEqual({c.kwargs["model_override"] for c in mock_client.chat.call_args_list}, {"llama3"})
+        
+        last_prompt = mock_client.chat.call_args_list[-1][0][0]
+        system = [m["content"] for m in last_prompt if m["role"] == "system"][-1]
+        self.assertIn("No more tool calls", system)
+        self.assertIn("two", last_prompt[-3]["content"])
+        self.assertIn("one", last_prompt[-1]["content"])
+        print("PASS: Looped with cached repeat and stopped at the budget.")
+
+    @patch('src.engine.nodes.LOOP_BUDGET', 0)
+    @patch('src.engine.nodes.client')
+    def test_react_loop_wall_clock_budget(self, mock_client):
+        """Test that an exhausted wall-clock budget ends the loop after the first step"""
+        print("\nTesting ReAct Wall-Clock Budget...")
+        
+        mock_client.route.return_value = {
+            "complexity": "simple",
+            "intent": "tool_use",
+            "tool": "run_command",
+            "args": {"command": "echo one"}
+        }
+        mock_client.chat.return_value = "Only one step."
+        
+        graph = create_agent_graph(max_steps=5)
+        result = graph.invoke({"user_input": "one", "messages": []})
+        
+        self.assertEqual(result["final_response"], "Only one step.")
+        self.assertEqual(len(result["steps"]), 1)
+        self.assertNotIn("JSON", mock_client.chat.call_args[0][0][-2]["content"])
+        print("PASS: Loop ended on the wall-clock budget.")
+
+    @patch('src.engine.nodes.client')
+    def test_react_loop_streaming_holds_tool_calls(self, mock_client):
+        """Test that follow-up calls are not streamed as answer tokens"""
+        print("\nTesting ReAct Streaming...")
+        
+        mock_client.aroute = AsyncMock(return_value={
+            "complexity": "simple",
+            "intent": "tool_use",
+            "tool": "run_command",
+            "args": {"command": "echo one"}
+        })
+        replies = iter([['{"tool": "run_command", ', '"args": {"command": "echo two"}}'], ["Both ", "ran."]])
+        async def tokens(*args, **kwargs):
+            for token in next(replies):
+                yield token
+        mock_client.achat_stream = tokens
+        
+        graph = create_agent_graph(use_async=True, max_steps=2)
+        
+        async def run():
+            events, result = [], None
+            config = {"configurable": {"cancel_event": threading.Event()}}
+            async for mode, chunk in graph.astream({"user_input": "one then two", "messages": [], "stream": True},
+                                                   config=config, stream_mode=["custom", "values"]):
+                if mode == "custom":
+                    events.append(chunk)
+                else:
+                    result = chunk
+            return events, result
+        
+        events, result = asyncio.run(run())
+        tokens_out = [e["content"] for e in events if e["type"] == "token"]
+        self.assertEqual(tokens_out, ["Both ", "ran."])
+        self.assertEqual(result["final_response"], "Both ran.")
+        self.assertEqual(len(result["steps"]), 2)
+        print("PASS: Tool call held back, answer streamed.")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,76 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import unittest
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.memory import MemoryStore
+
+class TestMemoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = MemoryStore(os.path.join(self.tmp.name, "memory.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_wal_and_pooled_connection(self):
+        conn = self.store._conn()
+        self.assertIs(conn, self.store._conn())
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_save_messages_batch(self):
+        conv = self.store.create_conversation()
+        self.store.save_messages(conv, [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello", "metadata": {"model": "llama3"}}
+        ])
+        messages = {m["role"]: m for m in self.store.get_conversation_messages(conv)}
+        self.assertEqual(set(messages), {"user", "assistant"})
+        self.assertEqual(json.loads(messages["assistant"]["metadata"]), {"model": "llama3"})
+
+    def test_concurrent_writers(self):
+        conv = self.store.create_conversation()
+
+        def writer(n):
+            for i in range(20):
+                self.store.save_message(conv, "user", f"{n}-{i}")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(self.store.get_conversation_messages(conv, limit=100)), 80)
+
+    def test_schema_version_and_indexes(self):
+        from src.core.memory import SCHEMA_MIGRATIONS
+        conn = self.store._conn()
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], len(SCHEMA_MIGRATIONS))
+        
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT role FROM messages WHERE conversation_id = 1 ORDER BY id DESC LIMIT 5"
+        ))
+        self.assertIn("idx_messages_conversation", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        
+        # Re-opening does not re-run migrations
+        MemoryStore(self.store.db_path).close()
+
+    def test_ordering_within_same_second(self):
+        conv = self.store.create_conversation()
+        for i in range(5):
+            self.store.save_message(conv, "user", str(i))
+        contents = [m["content"] for m in self.store.get_conversation_messages(conv, limit=3)]
+        self.assertEqual(contents, ["2", "3", "4"])
+        self.assertEqual(self.store.get_or_create_conversation(), conv)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.llm import OllamaClient, ModelTimings
+from src.core.models import ModelManager
+from src.core.resources import ResourceStatus
+
+def make_client():
+    client = OllamaClient()
+    client.async_client = MagicMock()
+    client.async_client.generate = AsyncMock(side_effect=lambda model, **kwargs: {
+        "model": model, "load_duration": 2_000_000_000, "eval_duration": 1_000_000
+    })
+    return client
+
+def make_monitor(status):
+    monitor = MagicMock()
+    monitor.get_metrics.return_value.status = status
+    return monitor
+
+class TestModelManager(unittest.TestCase):
+
+    def test_warm_all_preloads_both_tiers(self):
+        client = make_client()
+        manager = ModelManager(client, monitor=make_monitor(ResourceStatus.HEALTHY))
+        results = asyncio.run(manager.warm_all())
+
+        self.assertEqual(results, {OllamaClient.LIGHT_MODEL: True, OllamaClient.HEAVY_MODEL: True})
+        for call in client.async_client.generate.call_args_list:
+            self.assertEqual(call.kwargs["keep_alive"], client.keep_alive)
+        timings = client.timings.snapshot()
+        self.assertEqual(timings[OllamaClient.HEAVY_MODEL]["cold_starts"], 1)
+
+    def test_heavy_warmup_skipped_when_critical(self):
+        client = make_client()
+        manager = ModelManager(client, monitor=make_monitor(ResourceStatus.CRITICAL))
+        results = asyncio.run(manager.warm_all())
+
+        self.assertTrue(results[OllamaClient.LIGHT_MODEL])
+        self.assertFalse(results[OllamaClient.HEAVY_MODEL])
+        warmed = [c.kwargs["model"] for c in client.async_client.generate.call_args_list]
+        self.assertEqual(warmed, [OllamaClient.LIGHT_MODEL])
+        self.assertEqual(manager.status()["models"][OllamaClient.HEAVY_MODEL]["skipped"], 1)
+
+    def test_chat_sends_keep_alive_and_records_timings(self):
+        client = OllamaClient()
+        client.client = MagicMock()
+        client.client.chat.return_value = {
+            "model": "llama3", "message": {"content": "hi"},
+            "load_duration": 1_000_000, "eval_duration": 50_000_000
+        }
+        client.chat([{"role": "user", "content": "hello"}], model_override="llama3")
+
+        self.assertEqual(client.client.chat.call_args.kwargs["keep_alive"], client.keep_alive)
+        stats = client.timings.snapshot()["llama3"]
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["cold_starts"], 0)
+        self.assertEqual(stats["avg_eval_ms"], 50.0)
+
+    def test_timings_ignore_missing_metadata(self):
+        timings = ModelTimings()
+        timings.record({"model": "llama3", "message": {"content": "x"}})
+        timings.record(MagicMock())
+        self.assertEqual(timings.snapshot(), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.engine.prerouter import PreRouter
+from src.tools.registry import ToolRegistry
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+from evaluate_router import DEFAULT_REPLAY, evaluate_prerouter, load_replay
+
+class TestPreRouter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.router = PreRouter(ToolRegistry().get_tool_names())
+
+    def test_obvious_intents(self):
+        cases = {
+            "hi": ("conversational", {}),
+            "list files in ~/proj": ("list_dir", {"path": "~/proj"}),
+            "run df -h": ("run_command", {"command": "df -h"}),
+            "read ~/.bashrc": ("read_file", {"file_path": "~/.bashrc"}),
+            "find *.py files in ~/proj": ("find_files", {"pattern": "*.py", "path": "~/proj"}),
+        }
+        for text, (label, args) in cases.items():
+            decision = self.router.route(text)
+            self.assertIsNotNone(decision, text)
+            self.assertEqual((decision.label, decision.args), (label, args), text)
+
+    def test_ambiguous_falls_through(self):
+        for text in ["hi, can you help me debug a memory leak in my flask app",
+                     "how much disk space is left",
+                     "create a file called hello.txt with hi in it",
+                     "run the tests",
+                     "please run the backup",
+                     "execute the plan we discussed",
+                     "find me a recipe",
+                     "kill time ideas",
+                     "date night ideas",
+                     "cat videos please",
+                     "top 10 movies of 2020"]:
+            self.assertIsNone(self.router.route(text), text)
+
+    def test_replay_set_has_no_misroutes(self):
+        report = evaluate_prerouter(self.router, load_replay(DEFAULT_REPLAY))
+        self.assertEqual(report["mistakes"], [])
+        self.assertGreater(report["coverage"], 0.5)
+
+    @patch('src.engine.nodes.client')
+    def test_classifier_skips_llm_on_fast_path(self, mock_client):
+        from src.engine.nodes import classifier_node
+        state = classifier_node({"user_input": "list files in /tmp", "messages": []})
+        self.assertEqual(state["selected_tool"], "list_dir")
+        self.assertEqual(state["tool_args"], {"path": "/tmp"})
+        mock_client.route.assert_not_called()
+        mock_client.assess_complexity.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
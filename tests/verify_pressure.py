@@ -0,0 +1,80 @@
+import sys
+import os
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.pressure import PressureController, PowerMode
+from src.core.resources import ResourceMonitor
+
+GB = 1024 ** 3
+
+def make_monitor():
+    monitor = MagicMock()
+    monitor.cpu_threshold = 85.0
+    monitor.mem_threshold = 90.0
+    monitor.interval = 2.0
+    monitor.trend.return_value = 0.0
+    monitor.smoothed.return_value = {"cpu": 20.0, "memory": 40.0, "swap_mb_s": 0.0, "temperature": 50.0}
+    return monitor
+
+@patch('psutil.virtual_memory', return_value=MagicMock(total=16 * GB))
+class TestPressureController(unittest.TestCase):
+
+    def set_signals(self, monitor, **values):
+        monitor.smoothed.return_value = {**monitor.smoothed.return_value, **values}
+
+    def test_hysteresis_between_enter_and_exit(self, _):
+        monitor = make_monitor()
+        controller = PressureController(monitor, min_dwell=0)
+
+        self.set_signals(monitor, cpu=90.0)
+        self.assertEqual(controller.evaluate(now=0), PowerMode.POWER_SAVE)
+        # Below the enter threshold but above exit: stay in power save
+        self.set_signals(monitor, cpu=78.0)
+        self.assertEqual(controller.evaluate(now=1), PowerMode.POWER_SAVE)
+        self.set_signals(monitor, cpu=60.0)
+        self.assertEqual(controller.evaluate(now=2), PowerMode.PERFORMANCE)
+        self.assertEqual(controller.transitions, 2)
+
+    def test_min_dwell_prevents_flapping(self, _):
+        monitor = make_monitor()
+        controller = PressureController(monitor, min_dwell=30)
+
+        self.set_signals(monitor, memory=95.0)
+        self.assertEqual(controller.evaluate(now=100), PowerMode.POWER_SAVE)
+        self.set_signals(monitor, memory=40.0)
+        self.assertEqual(controller.evaluate(now=110), PowerMode.POWER_SAVE)
+        self.assertEqual(controller.evaluate(now=131), PowerMode.PERFORMANCE)
+
+    def test_ollama_memory_and_temperature_trend(self, _):
+        monitor = make_monitor()
+        controller = PressureController(monitor, min_dwell=0)
+
+        controller.observe_ollama([{"size": 11 * GB, "size_vram": 0}])
+        self.assertEqual(controller.evaluate(now=0), PowerMode.POWER_SAVE)
+        self.assertEqual(controller.status()["reasons"], ["ollama_share"])
+
+        controller.observe_ollama([])
+        self.assertEqual(controller.evaluate(now=1), PowerMode.PERFORMANCE)
+
+        # Rising temperature only counts once the box is already warm
+        monitor.trend.return_value = 5.0
+        self.assertEqual(controller.evaluate(now=2), PowerMode.PERFORMANCE)
+        self.set_signals(monitor, temperature=80.0)
+        self.assertEqual(controller.evaluate(now=3), PowerMode.POWER_SAVE)
+
+    def test_lazy_mode_samples_an_unstarted_monitor(self, memory):
+        memory.return_value = MagicMock(total=16 * GB, percent=95.0)
+        with patch('psutil.cpu_percent', return_value=10.0), \
+                patch('src.core.resources.os.getloadavg', return_value=(0.5, 0.4, 0.3)), \
+                patch.object(ResourceMonitor, '_get_temperature', return_value=50.0):
+            # As in the REPL: nothing ever calls monitor.start()
+            controller = PressureController(ResourceMonitor(interval=60), min_dwell=0)
+            self.assertEqual(controller.mode, PowerMode.POWER_SAVE)
+        self.assertEqual(controller.status()["reasons"], ["memory"])
+
+if __name__ == "__main__":
+    unittest.main()
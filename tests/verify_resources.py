@@ -0,0 +1,83 @@
+import sys
+import os
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.resources import ResourceMonitor, ResourceStatus, MetricsRing
+
+class TestMetricsRing(unittest.TestCase):
+
+    def test_wraparound_keeps_newest(self):
+        ring = MetricsRing(capacity=3)
+        for i in range(5):
+            ring.append((i,) * len(MetricsRing.FIELDS))
+        self.assertEqual(ring.count, 3)
+        self.assertEqual(ring.latest()[0], 4)
+        self.assertEqual(list(ring.last(10)[:, 0]), [2, 3, 4])
+
+class TestResourceMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.cpu = [10.0]
+        patches = [
+            patch('psutil.cpu_percent', side_effect=lambda interval=None: self.cpu[0]),
+            patch('psutil.virtual_memory', return_value=MagicMock(percent=40.0)),
+            patch('src.core.resources.os.getloadavg', return_value=(0.5, 0.4, 0.3)),
+            patch.object(ResourceMonitor, '_get_temperature', return_value=50.0),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_first_cpu_delta_is_discarded(self):
+        # The first cpu_percent() call after another one covers a near-zero window and reads 100.0
+        self.cpu[0] = 100.0
+        monitor = ResourceMonitor(interval=60)
+        metrics = monitor.sample()
+        self.assertEqual(metrics.cpu_percent, 0.0)
+        self.assertEqual(metrics.status, ResourceStatus.HEALTHY)
+        self.assertNotIn("cpu", monitor.smoothed())
+
+        self.cpu[0] = 20.0
+        metrics = monitor.sample()
+        self.assertEqual(metrics.cpu_percent, 20.0)
+        self.assertEqual(monitor.smoothed()["cpu"], 20.0)
+
+    def test_single_spike_does_not_flip_status(self):
+        monitor = ResourceMonitor(interval=60, alpha=0.3)
+        monitor.sample()  # opens the CPU measurement window
+        monitor.sample()
+        self.cpu[0] = 99.0
+        metrics = monitor.sample()
+        self.assertEqual(metrics.cpu_percent, 99.0)
+        self.assertNotEqual(metrics.status, ResourceStatus.CRITICAL)
+
+        # Sustained load does
+        for _ in range(10):
+            metrics = monitor.sample()
+        self.assertEqual(metrics.status, ResourceStatus.CRITICAL)
+        self.assertGreater(monitor.smoothed()["cpu"], 85.0)
+
+    def test_reads_are_served_from_latest_sample(self):
+        monitor = ResourceMonitor(interval=60)
+        first = monitor.get_metrics()
+        self.cpu[0] = 70.0
+        self.assertIs(monitor.get_metrics(), first)
+        self.assertEqual(len(monitor.history()), 1)
+
+    def test_background_sampler(self):
+        monitor = ResourceMonitor(interval=0.01, history=5)
+        monitor.start()
+        time.sleep(0.2)
+        monitor.stop()
+        history = monitor.history(10)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[-1]["memory"], 40.0)
+        self.assertLess(history[0]["timestamp"], history[-1]["timestamp"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import sys
+import os
+import re
+import hashlib
+import tempfile
+import unittest
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.retrieval import VectorIndex, chunk_text
+from src.core.memory import MemoryStore
+
+class StubEmbedder:
+    """Deterministic bag-of-words embedder so the index runs without Ollama."""
+    DIM = 64
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        vectors = []
+        for text in texts:
+            vec = [0.0] * self.DIM
+            for word in re.findall(r"[a-z]+", text.lower()):
+                vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.DIM] += 1.0
+            vectors.append(vec)
+        return vectors
+
+class TestVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.kb_dir = os.path.join(self.tmp.name, "knowledge")
+        self.index_dir = os.path.join(self.tmp.name, "vectors")
+        os.makedirs(self.kb_dir)
+        self.write("backup.md", "Nightly backups run with restic to the NAS.")
+        self.write("docker.md", "Ollama runs inside a docker container on port 11434.")
+        self.memory = MemoryStore(os.path.join(self.tmp.name, "memory.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.kb_dir, name), "w") as f:
+            f.write(text)
+
+    def test_search_files_and_messages(self):
+        embedder = StubEmbedder()
+        index = VectorIndex(embedder, "stub", index_dir=self.index_dir, batch_size=2)
+        conv = self.memory.create_conversation()
+        self.memory.save_message(conv, "user", "my favourite editor is helix")
+
+        index.refresh([self.kb_dir], self.memory)
+        # Three chunks embedded in batches of two
+        self.assertEqual(embedder.calls, 2)
+
+        top = index.search("restic backups nightly", k=1)[0]
+        self.assertTrue(top["source"].endswith("backup.md"))
+        top = index.search("favourite editor", k=1)[0]
+        self.assertTrue(top["source"].startswith("message:"))
+
+    def test_incremental_refresh(self):
+        embedder = StubEmbedder()
+        index = VectorIndex(embedder, "stub", index_dir=self.index_dir)
+        index.refresh([self.kb_dir])
+        self.assertEqual(embedder.texts, 2)
+
+        # Reloaded from disk: nothing changed, nothing re-embedded
+        embedder = StubEmbedder()
+        index = VectorIndex(embedder, "stub", index_dir=self.index_dir)
+        index.refresh([self.kb_dir])
+        self.assertEqual(embedder.texts, 0)
+
+        # Only the modified file is re-embedded; the deleted one disappears
+        self.write("backup.md", "Backups moved to borg last week.")
+        os.remove(os.path.join(self.kb_dir, "docker.md"))
+        index.refresh([self.kb_dir])
+        self.assertEqual(embedder.texts, 1)
+        results = index.search("docker container port", k=5)
+        self.assertEqual(len(results), 1)
+        self.assertIn("borg", results[0]["text"])
+
+    def test_chunking(self):
+        text = "\n\n".join(["para %d " % i + "x" * 300 for i in range(5)])
+        chunks = chunk_text(text, max_chars=800)
+        self.assertTrue(all(len(c) <= 800 for c in chunks))
+        self.assertEqual(len(chunks), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.scheduler import ModelScheduler, Priority, SchedulerOverloaded
+from src.core.resources import ResourceStatus
+
+def make_monitor(status=ResourceStatus.HEALTHY):
+    monitor = MagicMock()
+    monitor.get_metrics.return_value.status = status
+    return monitor
+
+class TestModelScheduler(unittest.TestCase):
+
+    def test_routing_jumps_ahead_of_synthesis(self):
+        scheduler = ModelScheduler(limits={"light": 1}, max_wait=5, monitor=make_monitor())
+        order = []
+        holder = scheduler.acquire("light")
+
+        def worker(name, priority):
+            with scheduler.slot("light", priority):
+                order.append(name)
+
+        threads = [threading.Thread(target=worker, args=("synthesis", Priority.SYNTHESIS))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=worker, args=("routing", Priority.ROUTING)))
+        threads[1].start()
+        time.sleep(0.05)
+        self.assertEqual(scheduler.stats()["queue_depth"], 2)
+
+        scheduler.release(holder, 0.01)
+        for t in threads:
+            t.join()
+        self.assertEqual(order, ["routing", "synthesis"])
+
+    def test_timeout_downgrades_to_fallback(self):
+        scheduler = ModelScheduler(limits={"heavy": 1, "light": 1}, max_wait=0.1, monitor=make_monitor())
+        scheduler.acquire("heavy")
+        with scheduler.slot("heavy", Priority.SYNTHESIS, fallback="light") as granted:
+            self.assertEqual(granted, "light")
+        self.assertEqual(scheduler.stats()["downgraded"], 1)
+        self.assertEqual(scheduler.stats()["queue_depth"], 0)
+
+    def test_critical_pressure_downgrades_without_queueing(self):
+        scheduler = ModelScheduler(limits={"heavy": 1}, max_wait=10, monitor=make_monitor(ResourceStatus.CRITICAL))
+        scheduler.acquire("heavy")
+        start = time.monotonic()
+        self.assertEqual(scheduler.acquire("heavy", fallback="light"), "light")
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_full_queue_sheds(self):
+        scheduler = ModelScheduler(limits={"light": 1}, max_queue=0, monitor=make_monitor())
+        scheduler.acquire("light")
+        with self.assertRaises(SchedulerOverloaded):
+            scheduler.acquire("light")
+        self.assertEqual(scheduler.stats()["shed"], 1)
+
+    def test_async_slots_respect_limit(self):
+        scheduler = ModelScheduler(limits={"light": 2}, monitor=make_monitor())
+        peak = 0
+        active = 0
+
+        async def job():
+            nonlocal peak, active
+            async with scheduler.aslot("light"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+        async def main():
+            await asyncio.gather(*(job() for _ in range(6)))
+
+        asyncio.run(main())
+        stats = scheduler.stats()
+        self.assertEqual(peak, 2)
+        self.assertEqual(stats["admitted"], 6)
+        self.assertEqual(stats["models"]["light"]["active"], 0)
+        self.assertGreater(stats["wait_ms"]["p95"], 0)
+
+    def test_cancelled_async_waiter_gives_its_place_back(self):
+        scheduler = ModelScheduler(limits={"light": 1}, max_wait=5, monitor=make_monitor())
+        holder = scheduler.acquire("light")
+
+        async def main():
+            queued = asyncio.create_task(scheduler.aacquire("light"))
+            await asyncio.sleep(0.05)
+            self.assertEqual(scheduler.stats()["models"]["light"]["queued"], 1)
+            queued.cancel()  # e.g. a streaming client disconnected while queued
+            with self.assertRaises(asyncio.CancelledError):
+                await queued
+            # A waiter granted its slot just before the cancel lands hands it back too
+            granted = asyncio.create_task(scheduler.aacquire("light"))
+            await asyncio.sleep(0.05)
+            scheduler.release(holder, 0.01)
+            await asyncio.sleep(0)
+            granted.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await granted
+
+        asyncio.run(main())
+        lane = scheduler.stats()["models"]["light"]
+        self.assertEqual((lane["active"], lane["queued"]), (0, 0))
+        self.assertEqual(scheduler.acquire("light"), "light")
+
+if __name__ == "__main__":
+    unittest.main()
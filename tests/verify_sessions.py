@@ -0,0 +1,75 @@
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.memory import MemoryStore
+from src.core.sessions import SessionStore
+from src.interface import server
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.memory = MemoryStore(os.path.join(self.tmp.name, "memory.db"))
+
+    def tearDown(self):
+        self.memory.close()
+        self.tmp.cleanup()
+
+    def test_window_and_persistence(self):
+        store = SessionStore(self.memory, window=4)
+        for i in range(3):
+            store.record_turn("abc", f"q{i}", f"a{i}")
+        
+        self.assertEqual([m["content"] for m in store.history("abc")], ["q1", "a1", "q2", "a2"])
+        
+        # A fresh process rebuilds the same window from SQLite
+        cold = SessionStore(self.memory, window=4)
+        self.assertEqual(cold.history("abc"), store.history("abc"))
+        self.assertEqual(cold.stats()["misses"], 1)
+
+    def test_sessions_are_isolated(self):
+        store = SessionStore(self.memory)
+        store.record_turn("alice", "hi", "hello alice")
+        store.record_turn("bob", "hi", "hello bob")
+        self.assertNotEqual(store.get("alice").conversation_id, store.get("bob").conversation_id)
+        self.assertEqual(store.history("bob")[-1]["content"], "hello bob")
+
+    def test_lru_eviction(self):
+        store = SessionStore(self.memory, max_sessions=2)
+        store.get("a")
+        store.get("b")
+        store.get("a")
+        store.get("c")  # evicts "b", the least recently used
+        self.assertEqual(list(store._sessions), ["a", "c"])
+
+    def test_legacy_history_clients_share_one_conversation(self):
+        store = SessionStore(self.memory)
+        history = [{"role": "user", "content": "earlier"}, {"role": "assistant", "content": "reply"}]
+
+        with patch.object(server, "context", MagicMock(sessions=store)):
+            def turn(message):
+                request = server.ChatRequest(message=message, history=history)
+                session_id, conversation_id, messages = asyncio.run(server.load_session(request))
+                self.assertEqual(messages, history)
+                store.record_turn(session_id, message, "ok")
+                return session_id, conversation_id
+
+            first = turn("q1")
+            store.record_turn("modern", "hi", "hello")  # a session client in between
+            second = turn("q2")
+
+        self.assertEqual(first, second)
+        self.assertEqual([r["content"] for r in self.memory.get_conversation_messages(first[1], limit=10)],
+                         ["q1", "ok", "q2", "ok"])
+        # A cold store reloads the legacy session into the same conversation
+        self.assertEqual(SessionStore(self.memory).get(first[0]).conversation_id, first[1])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+import threading
+import unittest
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.tools.shell import ShellTool, BoundedOutput
+
+class TestBoundedOutput(unittest.TestCase):
+
+    def test_keeps_head_and_tail(self):
+        buf = BoundedOutput(max_bytes=10)
+        for chunk in (b"abc", b"defgh", b"ijklmnop", b"qrst"):
+            buf.write(chunk)
+        self.assertEqual(bytes(buf.head), b"abcde")
+        self.assertEqual(bytes(buf.tail), b"pqrst")
+        self.assertEqual(buf.omitted, 10)
+        self.assertIn("[10 bytes omitted]", buf.text())
+
+class TestShellTool(unittest.TestCase):
+
+    def test_small_output_unchanged(self):
+        result = ShellTool().run("echo hello")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["output"], "hello")
+        self.assertFalse(result["truncated"])
+
+    def test_large_output_is_capped(self):
+        tool = ShellTool(max_output_bytes=1000)
+        result = tool.run("python3 -c \"print('\\n'.join(str(i) for i in range(200000)))\"")
+        self.assertTrue(result["success"])
+        self.assertTrue(result["truncated"])
+        self.assertGreater(result["output_bytes"]["stdout"], 1_000_000)
+        self.assertLess(len(result["output"]), 1200)
+        self.assertTrue(result["output"].startswith("0\n1\n"))
+        self.assertTrue(result["output"].endswith("199999"))
+
+    def test_streams_partial_output(self):
+        chunks = []
+        result = ShellTool().run(
+            "python3 -c \"import sys; print('out'); print('err', file=sys.stderr)\"",
+            on_output=lambda stream, text: chunks.append((stream, text))
+        )
+        streamed = {name: "".join(text for s, text in chunks if s == name) for name in ("stdout", "stderr")}
+        self.assertEqual(streamed, {"stdout": "out\n", "stderr": "err\n"})
+        self.assertIn("Stderr: err", result["output"])
+
+    def test_cancel_kills_command(self):
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        start = time.monotonic()
+        result = ShellTool().run("python3 -c \"import time; time.sleep(30)\"", cancel=cancel)
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertTrue(result["cancelled"])
+        self.assertFalse(result["success"])
+
+    def test_timeout(self):
+        result = ShellTool(timeout=0.3).run("python3 -c \"import time; time.sleep(30)\"")
+        self.assertTrue(result["timed_out"])
+        self.assertIn("Command timed out.", result["output"])
+
+if __name__ == "__main__":
+    unittest.main()
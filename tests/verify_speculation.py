@@ -0,0 +1,138 @@
+import sys
+import os
+import time
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.llm import OllamaClient
+from src.core.scheduler import Priority, SchedulerOverloaded
+from src.engine.speculation import SpeculativePrefill
+from src.engine.graph import create_agent_graph
+
+class TestSpeculativePrefill(unittest.TestCase):
+
+    def _run(self, uses_tool, model, prefill_delay=0.2):
+        async def prefill(messages, model, preempt):
+            await asyncio.sleep(prefill_delay)
+            return {"prompt_tokens": 50, "prompt_eval_ms": 40.0}
+
+        speculator = SpeculativePrefill(prefill, model="llama3", enabled=True)
+
+        async def run():
+            speculation = speculator.start([{"role": "user", "content": "hi"}])
+            await asyncio.sleep(0.05)
+            speculator.resolve(speculation, uses_tool, model, 0.05)
+            await asyncio.sleep(0)
+            return speculation.task.cancelled()
+
+        return speculator, asyncio.run(run())
+
+    def test_hit_keeps_prefill_running(self):
+        speculator, cancelled = self._run(uses_tool=False, model="llama3")
+        self.assertFalse(cancelled)
+        stats = speculator.stats()
+        self.assertEqual((stats["hits"], stats["hit_rate"]), (1, 1.0))
+        self.assertEqual(stats["wasted_ms"], 0.0)
+
+    def test_tool_choice_cancels_prefill(self):
+        speculator, cancelled = self._run(uses_tool=True, model="llama3")
+        self.assertTrue(cancelled)
+        stats = speculator.stats()
+        self.assertEqual((stats["cancelled"], stats["hit_rate"]), (1, 0.0))
+        self.assertGreater(stats["wasted_ms"], 0)
+
+    def test_finished_miss_counts_evaluated_tokens(self):
+        speculator, _ = self._run(uses_tool=False, model="qwen2.5-coder:1.5b", prefill_delay=0)
+        stats = speculator.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual((stats["wasted_tokens"], stats["wasted_ms"]), (50, 40.0))
+
+    def test_power_save_and_forced_model_skip(self):
+        speculator = SpeculativePrefill(AsyncMock(), model="llama3", enabled=True)
+        self.assertTrue(speculator.applies({}))
+        self.assertFalse(speculator.applies({"power_mode": "power_save"}))
+        self.assertFalse(speculator.applies({"model_override": "llama3"}))
+
+    def test_client_prefill_skips_busy_model(self):
+        client = OllamaClient()
+        client.async_client.chat = AsyncMock(return_value={"prompt_eval_count": 12, "prompt_eval_duration": 3_000_000})
+        messages = [{"role": "user", "content": "hi"}]
+
+        self.assertEqual(asyncio.run(client.aprefill(messages, client.HEAVY_MODEL)),
+                         {"prompt_tokens": 12, "prompt_eval_ms": 3.0})
+        self.assertEqual(client.async_client.chat.call_args.kwargs["options"], {"num_predict": 1})
+
+        self.assertTrue(client.scheduler.try_acquire(client.HEAVY_MODEL, Priority.SYNTHESIS))
+        self.assertIsNone(asyncio.run(client.aprefill(messages, client.HEAVY_MODEL)))
+        self.assertEqual(client.async_client.chat.call_count, 1)
+
+    def test_prefill_yields_its_slot_to_a_real_request(self):
+        client = OllamaClient()
+        client.scheduler.limits[client.HEAVY_MODEL] = 1
+
+        async def slow_chat(**kwargs):
+            await asyncio.sleep(5)
+        client.async_client.chat = slow_chat
+        messages = [{"role": "user", "content": "hi"}]
+
+        async def run():
+            prefill = asyncio.create_task(client.aprefill(messages, client.HEAVY_MODEL))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            # A synthesis call queues, is not shed on the prefill's account, and gets the slot at once
+            async with client.scheduler.aslot(client.HEAVY_MODEL, Priority.SYNTHESIS):
+                waited = time.monotonic() - started
+            return await prefill, waited
+
+        result, waited = asyncio.run(run())
+        self.assertIsNone(result)
+        self.assertLess(waited, 0.5)
+        lane = client.scheduler.stats()["models"][client.HEAVY_MODEL]
+        self.assertEqual((lane["active"], lane["queued"]), (0, 0))
+
+    def test_confirmed_prefill_is_not_preempted(self):
+        client = OllamaClient()
+        client.scheduler.limits[client.HEAVY_MODEL] = 1
+        preempt = threading.Event()
+        self.assertTrue(client.scheduler.try_acquire(client.HEAVY_MODEL, Priority.BACKGROUND, preempt))
+        client.scheduler.keep(client.HEAVY_MODEL, preempt)
+        # Now an ordinary busy slot: another caller waits its turn instead of preempting it
+        client.scheduler.max_wait = 0.1
+        with self.assertRaises(SchedulerOverloaded):
+            client.scheduler.acquire(client.HEAVY_MODEL, Priority.SYNTHESIS)
+        self.assertFalse(preempt.is_set())
+        client.scheduler.release(client.HEAVY_MODEL, 0.01, preempt)
+
+@patch('src.engine.nodes.prerouter', None)
+class TestSpeculativeGraph(unittest.TestCase):
+
+    @patch('src.engine.nodes.speculator.enabled', True)
+    @patch('src.engine.nodes.speculator.monitor', None)  # don't let this box's load decide whether it runs
+    @patch('src.engine.nodes.client')
+    def test_prefill_matches_synthesis_prompt(self, mock_client):
+        mock_client.HEAVY_MODEL = OllamaClient.HEAVY_MODEL
+        mock_client.aprefill = AsyncMock(return_value={"prompt_tokens": 20, "prompt_eval_ms": 10.0})
+        mock_client.aroute = AsyncMock(return_value={
+            "complexity": "complex",
+            "intent": "conversational",
+            "tool": None,
+            "args": {}
+        })
+        mock_client.achat = AsyncMock(return_value="A long answer.")
+
+        graph = create_agent_graph(use_async=True)
+        messages = [{"role": "user", "content": "explain raft consensus"}]
+        result = asyncio.run(graph.ainvoke({"user_input": "explain raft consensus", "messages": messages}))
+
+        self.assertEqual(result["final_response"], "A long answer.")
+        prefilled, model, _ = mock_client.aprefill.call_args[0]
+        self.assertEqual(model, OllamaClient.HEAVY_MODEL)
+        self.assertEqual(prefilled, mock_client.achat.call_args[0][0])
+
+if __name__ == "__main__":
+    unittest.main()
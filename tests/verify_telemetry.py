@@ -0,0 +1,74 @@
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import telemetry
+from src.core.telemetry import MetricsRegistry, trace, record_ollama
+from src.engine.graph import create_agent_graph
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        hist = registry.histogram("demo_seconds", "Demo", ("model",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            hist.observe(value, model="llama3")
+        registry.gauge("demo_gauge", "Gauge", lambda: 7)
+
+        text = registry.render()
+        self.assertIn('demo_seconds_bucket{model="llama3",le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{model="llama3",le="1"} 3', text)
+        self.assertIn('demo_seconds_bucket{model="llama3",le="+Inf"} 4', text)
+        self.assertIn('demo_seconds_count{model="llama3"} 4', text)
+        self.assertIn('demo_seconds_sum{model="llama3"} 4.25', text)
+        self.assertIn("demo_gauge 7", text)
+
+    def test_record_ollama_fields(self):
+        before = telemetry.OLLAMA_TOKENS.value(model="test-model", direction="out")
+        with trace() as current:
+            entry = record_ollama("chat", {
+                "model": "test-model", "total_duration": 2_000_000_000, "load_duration": 500_000_000,
+                "prompt_eval_count": 40, "eval_count": 100, "eval_duration": 1_000_000_000
+            })
+        self.assertEqual(entry["tokens_per_s"], 100.0)
+        self.assertEqual((entry["ms"], entry["load_ms"]), (2000.0, 500.0))
+        self.assertEqual(current.spans, [entry])
+        self.assertEqual(telemetry.OLLAMA_TOKENS.value(model="test-model", direction="out") - before, 100)
+        # Mocked responses without numeric fields are ignored
+        self.assertIsNone(record_ollama("chat", {"model": "test-model"}))
+
+@patch('src.engine.nodes.prerouter', None)
+class TestGraphTracing(unittest.TestCase):
+
+    @patch('src.engine.nodes.client')
+    def test_request_breakdown_covers_nodes_and_tools(self, mock_client):
+        mock_client.aroute = AsyncMock(return_value={
+            "complexity": "simple",
+            "intent": "tool_use",
+            "tool": "run_command",
+            "args": {"command": "echo hi"}
+        })
+        mock_client.achat = AsyncMock(return_value="It printed hi.")
+        graph = create_agent_graph(use_async=True)
+        before = telemetry.SPAN_SECONDS.count(kind="tool", name="run_command")
+
+        async def run():
+            with trace() as current:
+                await graph.ainvoke({"user_input": "say hi", "messages": []})
+            return current.breakdown()
+
+        breakdown = asyncio.run(run())
+        names = [(s["kind"], s["name"]) for s in breakdown["spans"]]
+        for expected in [("node", "classifier"), ("tool", "run_command"), ("node", "tool"),
+                         ("node", "condenser"), ("node", "synthesizer")]:
+            self.assertIn(expected, names)
+        self.assertGreater(breakdown["by_kind"]["tool"], 0)
+        self.assertEqual(telemetry.SPAN_SECONDS.count(kind="tool", name="run_command") - before, 1)
+
+if __name__ == "__main__":
+    unittest.main()
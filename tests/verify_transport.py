@@ -0,0 +1,149 @@
+import sys
+import os
+import time
+import socket
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.fake_ollama import FakeOllama
+from src.core.llm import OllamaClient
+from src.core.transport import (CircuitBreaker, GuardedTransport, GuardedAsyncTransport, OllamaUnavailable,
+                                TransportConfig)
+
+def closed_port_url() -> str:
+    """A local URL nothing is listening on (connections are refused at once)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failures=2, cooldown=10, clock=lambda: self.now)
+
+    def test_opens_after_consecutive_failures_and_probes_after_cooldown(self):
+        self.breaker.before_call()
+        self.breaker.failure()
+        self.breaker.before_call()
+        self.breaker.success()  # a success resets the streak
+        for _ in range(2):
+            self.breaker.before_call()
+            self.breaker.failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(OllamaUnavailable) as raised:
+            self.breaker.before_call()
+        self.assertEqual(raised.exception.retry_after, 10)
+
+        # After the cooldown one probe goes through; others keep failing fast until it lands
+        self.now = 11
+        self.breaker.before_call()
+        with self.assertRaises(OllamaUnavailable):
+            self.breaker.before_call()
+        self.breaker.failure()
+        self.assertEqual((self.breaker.state, self.breaker.retry_after()), (CircuitBreaker.OPEN, 10))
+
+        self.now = 22
+        self.breaker.before_call()
+        self.breaker.success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.stats()["opened"], 2)
+
+class TestGuardedTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.config = TransportConfig(retries=2, backoff=0.01, breaker_failures=1)
+        self.breaker = CircuitBreaker(self.config.breaker_failures, cooldown=30)
+
+    def flaky(self, failures: int):
+        calls = []
+
+        def handler(request):
+            calls.append(request.extensions.get("timeout"))
+            if len(calls) <= failures:
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={"ok": True})
+        return handler, calls
+
+    def test_retries_connection_errors_with_backoff(self):
+        handler, calls = self.flaky(2)
+        transport = GuardedTransport(httpx.MockTransport(handler), self.config, self.breaker)
+        with patch('src.core.transport.time.sleep') as sleep, httpx.Client(transport=transport) as http:
+            self.assertEqual(http.get("http://ollama/api/ps").json(), {"ok": True})
+        self.assertEqual((len(calls), transport.retried), (3, 2))
+        self.assertTrue(all(0 <= c.args[0] <= 0.01 * 2 ** i for i, c in enumerate(sleep.call_args_list)))
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_exhausted_retries_open_the_breaker(self):
+        handler, calls = self.flaky(10)
+        transport = GuardedAsyncTransport(httpx.MockTransport(handler), self.config, self.breaker)
+
+        async def run():
+            async with httpx.AsyncClient(transport=transport) as http:
+                with self.assertRaises(httpx.ConnectError):
+                    await http.get("http://ollama/api/ps")
+                with self.assertRaises(OllamaUnavailable):
+                    await http.get("http://ollama/api/ps")
+
+        asyncio.run(run())
+        self.assertEqual(len(calls), 3)  # the second request never reached the network
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_read_timeouts_do_not_open_the_breaker(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("busy", request=request)
+        transport = GuardedTransport(httpx.MockTransport(handler), self.config, self.breaker)
+        with httpx.Client(transport=transport) as http:
+            for _ in range(3):
+                with self.assertRaises(httpx.ReadTimeout):
+                    http.get("http://ollama/api/chat")
+        self.assertEqual((len(calls), transport.retried), (3, 0))  # each reached Ollama, none retried
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+class TestOllamaClientTransport(unittest.TestCase):
+
+    def test_down_server_fails_fast_once_the_circuit_opens(self):
+        env = {"OLLAMA_HOST": closed_port_url(), "ANDY_OS_OLLAMA_RETRY_BACKOFF": "0.01",
+               "ANDY_OS_OLLAMA_BREAKER_FAILURES": "2"}
+        with patch.dict(os.environ, env):
+            client = OllamaClient()
+        messages = [{"role": "user", "content": "hi"}]
+        self.assertIsNone(client.route("hello there", ["run_command"]))
+        self.assertEqual(client.assess_complexity("hello there"), "simple")
+        self.assertEqual(client.transport_stats()["backends"][0]["breaker"]["state"], CircuitBreaker.OPEN)
+
+        started = time.monotonic()
+        with self.assertRaises(OllamaUnavailable):
+            client.chat(messages)
+        with self.assertRaises(OllamaUnavailable):
+            asyncio.run(client.achat(messages))
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertEqual(client.transport_stats()["retries"], 4)
+
+    def test_routing_read_timeout(self):
+        fake = FakeOllama(load_ms=1000, token_ms=1).start()
+        try:
+            env = {"OLLAMA_HOST": fake.url, "ANDY_OS_OLLAMA_ROUTE_TIMEOUT": "0.2"}
+            with patch.dict(os.environ, env):
+                client = OllamaClient()
+            started = time.monotonic()
+            # The model load outlasts the routing timeout, so the call gives up instead of hanging
+            self.assertIsNone(client.route("list the files", ["list_dir"]))
+            self.assertLess(time.monotonic() - started, 0.9)
+            # Synthesis keeps the long read timeout and waits the load out
+            reply = client.chat([{"role": "user", "content": "hi"}], model_override=client.LIGHT_MODEL)
+            self.assertNotIn("error", reply)
+        finally:
+            fake.stop()
+
+if __name__ == "__main__":
+    unittest.main()